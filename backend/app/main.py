@@ -1,6 +1,12 @@
+import sys
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import data, visualization
+
+# The shared data-access package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from data_access import close_async_clients
+from app.routers import data, files, visualization
 
 app = FastAPI(
     title="Financial Analysis System",
@@ -20,6 +26,12 @@ app.add_middleware(
 # Include routers
 app.include_router(data.router, prefix="/api/data", tags=["Data"])
 app.include_router(visualization.router, prefix="/api/visualization", tags=["Visualization"])
+app.include_router(files.router, prefix="/api/files", tags=["Files"])
+
+@app.on_event("shutdown")
+async def close_data_clients():
+    """Close pooled Supabase connections"""
+    await close_async_clients()
 
 @app.get("/")
 async def root():
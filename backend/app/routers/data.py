@@ -1,11 +1,16 @@
+import sys
+from pathlib import Path
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from typing import List, Dict, Any, Optional
 from src.data.data_processor import DataProcessor
+from src.data.content_store import ContentStore
 import pandas as pd
 import json
 import logging
-import os
-from tempfile import NamedTemporaryFile
+
+# The shared scratch-space package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from scratch_space import get_scratch_space
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -13,22 +18,13 @@ router = APIRouter()
 # Initialize data processor
 data_processor = DataProcessor()
 
+# Uploaded files, stored once per distinct content
+content_store = ContentStore()
+
 def validate_file_extension(filename: str, allowed_extensions: List[str]) -> bool:
     """Validate file extension"""
     return filename.lower().endswith(tuple(allowed_extensions))
 
-def save_upload_file_tmp(upload_file: UploadFile) -> str:
-    """Save uploaded file to temporary location"""
-    try:
-        suffix = os.path.splitext(upload_file.filename)[1]
-        with NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = upload_file.file.read()
-            tmp.write(content)
-            return tmp.name
-    except Exception as e:
-        logger.error(f"Error saving temporary file: {str(e)}")
-        raise
-
 @router.post("/upload")
 async def upload_data(
     file: UploadFile = File(...),
@@ -46,44 +42,39 @@ async def upload_data(
         allowed_extensions = ['.csv', '.xlsx', '.json']
         if not validate_file_extension(file.filename, allowed_extensions):
             raise ValueError(f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}")
+        if format_type not in ("csv", "xlsx", "json"):
+            raise ValueError(f"Unsupported format type: {format_type}")
         
-        # Save file temporarily
-        temp_file = await save_upload_file_tmp(file)
-        logger.info(f"Temporary file saved: {temp_file}")
+        # Store the upload; a file that was uploaded before only adds a record
+        stored = content_store.put_stream(file.file, file.filename)
+        logger.info(
+            f"Upload {stored['upload_id']} stored as {stored['digest']}"
+            f"{' (duplicate)' if stored['deduplicated'] else ''}"
+        )
         
+        # Process data based on format
         try:
-            # Process data based on format
-            if format_type == "xlsx":
-                # Convert XLSX to CSV first
-                logger.info("Converting XLSX to CSV...")
-                df = data_processor.import_data(temp_file, format_type="xlsx")
-            elif format_type == "csv":
-                df = data_processor.import_data(temp_file, format_type="csv")
-            elif format_type == "json":
-                df = data_processor.import_data(temp_file, format_type="json")
-            else:
-                raise ValueError(f"Unsupported format type: {format_type}")
-            
-            # Log successful processing
-            logger.info(f"Successfully processed {format_type} file: {file.filename}")
-            
-            return {
-                "message": "Data uploaded and processed successfully",
-                "original_file": file.filename,
-                "format_type": format_type,
-                "shape": df.shape,
-                "columns": df.columns.tolist(),
-                "preview": df.head().to_dict(orient="records"),
-                "cleaning_log": data_processor.get_cleaning_log()
-            }
-            
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_file)
-                logger.info(f"Temporary file removed: {temp_file}")
-            except Exception as e:
-                logger.warning(f"Error removing temporary file: {str(e)}")
+            df = data_processor.import_data(stored["path"], format_type=format_type)
+        except Exception:
+            # Uploads that cannot be processed are not kept
+            content_store.delete_upload(stored["upload_id"])
+            raise
+        
+        # Log successful processing
+        logger.info(f"Successfully processed {format_type} file: {file.filename}")
+        
+        return {
+            "message": "Data uploaded and processed successfully",
+            "original_file": file.filename,
+            "format_type": format_type,
+            "upload_id": stored["upload_id"],
+            "content_digest": stored["digest"],
+            "deduplicated": stored["deduplicated"],
+            "shape": df.shape,
+            "columns": df.columns.tolist(),
+            "preview": df.head().to_dict(orient="records"),
+            "cleaning_log": data_processor.get_cleaning_log()
+        }
         
     except Exception as e:
         logger.error(f"Error processing upload: {str(e)}")
@@ -220,6 +211,42 @@ async def get_cleaning_log() -> Dict[str, Any]:
         logger.error(f"Error retrieving cleaning log: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/storage-report")
+async def get_storage_report() -> Dict[str, Any]:
+    """
+    Get upload storage growth and the space saved by deduplication
+    """
+    try:
+        return content_store.storage_report()
+    except Exception as e:
+        logger.error(f"Error building storage report: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scratch-usage")
+async def get_scratch_usage() -> Dict[str, Any]:
+    """
+    Get disk usage of scratch jobs and cached intermediates
+    """
+    try:
+        return get_scratch_space().usage()
+    except Exception as e:
+        logger.error(f"Error reading scratch usage: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/uploads/{upload_id}")
+async def delete_upload(upload_id: int) -> Dict[str, Any]:
+    """
+    Delete a stored upload; its content is removed once no upload references it
+    """
+    try:
+        deleted = content_store.delete_upload(upload_id)
+    except Exception as e:
+        logger.error(f"Error deleting upload: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Upload {upload_id} not found")
+    return {"message": f"Upload {upload_id} deleted"}
+
 @router.get("/")
 async def get_available_data() -> Dict[str, List[str]]:
     """
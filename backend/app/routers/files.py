@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Dict, Optional
+from datetime import datetime
+import asyncio
+import logging
+
+# The shared data-access package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from data_access import DataAccessError, format_value, get_async_client
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+HISTORY_COLUMNS = ('id', 'file_name', 'file_type', 'upload_date')
+
+# Largest page list_files returns
+MAX_PAGE_SIZE = 200
+
+@router.get("/")
+async def list_files(
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor_date: Optional[datetime] = None,
+    cursor_id: Optional[int] = None,
+    name: Optional[str] = None,
+    file_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    List uploaded files, newest first, one keyset page at a time
+    
+    Args:
+        limit: Page size, at most MAX_PAGE_SIZE
+        cursor_date, cursor_id: upload_date and id of the last file on the previous page
+        name: Case-insensitive substring of the file name
+        file_type: Exact file type ('csv', 'xlsx')
+    """
+    try:
+        client = get_async_client()
+        
+        def filtered(query):
+            if name:
+                query = query.ilike('file_name', f"%{name}%")
+            if file_type:
+                query = query.eq('file_type', file_type)
+            return query
+        
+        page_query = filtered(client.table('file_uploads').select(*HISTORY_COLUMNS))
+        if cursor_date is not None and cursor_id is not None:
+            # Parsed by FastAPI and quoted here, so a cursor cannot add filters of its own
+            date, last_id = format_value(cursor_date.isoformat()), format_value(cursor_id)
+            page_query = page_query.or_(
+                f'upload_date.lt.{date},and(upload_date.eq.{date},id.lt.{last_id})'
+            )
+        page_query = page_query.order('upload_date', desc=True).order('id', desc=True).limit(limit + 1)
+        count_query = filtered(client.table('file_uploads').select('id', count='exact')).limit(1)
+        
+        # Both requests share the pooled connection and run concurrently
+        page, count = await asyncio.gather(page_query.execute(), count_query.execute())
+        
+        files = page.data[:limit]
+        next_cursor = None
+        if len(page.data) > limit and files:
+            next_cursor = {"cursor_date": files[-1]["upload_date"], "cursor_id": files[-1]["id"]}
+        
+        return {
+            "files": files,
+            "total": count.count,
+            "next_cursor": next_cursor
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DataAccessError as e:
+        logger.error(f"Error listing files: {str(e)}")
+        raise HTTPException(status_code=502, detail=str(e))
+
+@router.get("/{file_id}")
+async def get_file(file_id: str) -> Dict[str, Any]:
+    """
+    Get the metadata of one uploaded file
+    """
+    try:
+        result = await get_async_client().table('file_uploads').select(
+            *HISTORY_COLUMNS, 'checksum', 'content_id', 'manifest'
+        ).eq('id', file_id).limit(1).execute()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DataAccessError as e:
+        logger.error(f"Error retrieving file {file_id}: {str(e)}")
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    if not result.data:
+        raise HTTPException(status_code=404, detail=f"File {file_id} not found")
+    record = result.data[0]
+    manifest = record.pop('manifest') or {}
+    return {
+        **record,
+        "row_count": manifest.get('row_count'),
+        "columns": manifest.get('columns')
+    }
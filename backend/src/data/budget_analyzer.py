@@ -144,9 +144,9 @@ class BudgetAnalyzer:
             # Group by category columns if provided
             group_cols = category_columns or []
             
-            # Calculate YTD sums
+            # Calculate YTD sums (one bucket per calendar year)
             ytd_data = self.variance_data.groupby(
-                group_cols + [pd.Grouper(key=date_column, freq='YTD')]
+                group_cols + [pd.Grouper(key=date_column, freq='YS')]
             ).agg({
                 col: 'sum' for col in self.variance_data.columns
                 if any(col.endswith(suffix) 
@@ -0,0 +1,249 @@
+import hashlib
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def default_store_dir() -> Path:
+    """Store location, configurable through CONTENT_STORE_DIR"""
+    configured = os.getenv("CONTENT_STORE_DIR", "").strip()
+    if configured:
+        return Path(configured)
+    return Path(__file__).resolve().parents[3] / "data" / "content_store"
+
+
+class ContentStore:
+    """
+    Content-addressed store for uploaded files
+
+    Each distinct file body is kept once, named by its SHA-256 digest. Uploads
+    are metadata rows referencing a digest, so uploading a file that is
+    already stored costs a single insert.
+    """
+
+    def __init__(self, root_dir: Optional[Union[str, Path]] = None):
+        self.root_dir = Path(root_dir) if root_dir else default_store_dir()
+        self.blob_dir = self.root_dir / "blobs"
+        self.tmp_dir = self.root_dir / "tmp"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root_dir / "index.db"
+        self.operation_log = []
+        self._init_schema()
+
+    def log_operation(self, operation: str, details: Dict):
+        """Log a store operation"""
+        self.operation_log.append({
+            "timestamp": datetime.now().isoformat(),
+            "operation": operation,
+            "details": details
+        })
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_schema(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest TEXT PRIMARY KEY,
+                    size_bytes INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS uploads (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_name TEXT NOT NULL,
+                    digest TEXT NOT NULL REFERENCES blobs (digest),
+                    upload_date TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_digest ON uploads (digest)")
+
+    def blob_path(self, digest: str) -> Path:
+        """Location of a stored file body"""
+        return self.blob_dir / digest[:2] / digest
+
+    def put_stream(self, stream: BinaryIO, file_name: str) -> Dict:
+        """
+        Store an uploaded file, hashing it while it is copied to disk
+
+        Args:
+            stream: Readable binary file object
+            file_name: Original name of the upload
+
+        Returns:
+            Dictionary with upload_id, digest, size_bytes, path and whether
+            the content was already stored (deduplicated)
+        """
+        temp_path = self.tmp_dir / uuid.uuid4().hex
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with open(temp_path, "wb") as temp_file:
+                for block in iter(lambda: stream.read(READ_BLOCK_SIZE), b""):
+                    digest.update(block)
+                    temp_file.write(block)
+                    size += len(block)
+            digest = digest.hexdigest()
+            path = self.blob_path(digest)
+
+            with self._connect() as conn:
+                # Serialized with delete_upload so a shared body is never removed while referenced
+                conn.execute("BEGIN IMMEDIATE")
+                known = conn.execute(
+                    "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+                ).fetchone() is not None
+                deduplicated = known and path.exists()
+                if not deduplicated:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(temp_path, path)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO blobs (digest, size_bytes, created_at) VALUES (?, ?, ?)",
+                        (digest, size, datetime.now().isoformat())
+                    )
+                upload_id = conn.execute(
+                    "INSERT INTO uploads (file_name, digest, upload_date) VALUES (?, ?, ?)",
+                    (file_name, digest, datetime.now().isoformat())
+                ).lastrowid
+
+            self.log_operation("put", {
+                "upload_id": upload_id,
+                "file_name": file_name,
+                "digest": digest,
+                "size_bytes": size,
+                "deduplicated": deduplicated
+            })
+            return {
+                "upload_id": upload_id,
+                "digest": digest,
+                "size_bytes": size,
+                "path": str(path),
+                "deduplicated": deduplicated
+            }
+
+        except Exception as e:
+            logger.error(f"Error storing upload {file_name}: {str(e)}")
+            raise
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    def put_bytes(self, content: bytes, file_name: str) -> Dict:
+        """Store an in-memory file body; see put_stream"""
+        return self.put_stream(BytesIO(content), file_name)
+
+    def get_upload(self, upload_id: int) -> Optional[Dict]:
+        """Metadata and body location of an upload, or None if unknown"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT u.id, u.file_name, u.digest, u.upload_date, b.size_bytes "
+                "FROM uploads u JOIN blobs b ON b.digest = u.digest WHERE u.id = ?",
+                (upload_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {**dict(row), "path": str(self.blob_path(row["digest"]))}
+
+    def list_uploads(self) -> List[Dict]:
+        """All uploads, newest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT u.id, u.file_name, u.digest, u.upload_date, b.size_bytes "
+                "FROM uploads u JOIN blobs b ON b.digest = u.digest ORDER BY u.id DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete_upload(self, upload_id: int) -> bool:
+        """
+        Delete an upload record, and its file body once no upload references it
+
+        Returns:
+            True if the upload existed
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT digest FROM uploads WHERE id = ?", (upload_id,)
+                ).fetchone()
+                if row is None:
+                    return False
+                conn.execute("DELETE FROM uploads WHERE id = ?", (upload_id,))
+                references = conn.execute(
+                    "SELECT COUNT(*) FROM uploads WHERE digest = ?", (row["digest"],)
+                ).fetchone()[0]
+                if references == 0:
+                    conn.execute("DELETE FROM blobs WHERE digest = ?", (row["digest"],))
+                    self.blob_path(row["digest"]).unlink(missing_ok=True)
+
+            self.log_operation("delete", {
+                "upload_id": upload_id,
+                "digest": row["digest"],
+                "body_removed": references == 0
+            })
+            return True
+
+        except Exception as e:
+            logger.error(f"Error deleting upload {upload_id}: {str(e)}")
+            raise
+
+    def storage_report(self) -> Dict:
+        """
+        Logical vs stored bytes, overall and per upload month
+
+        Logical bytes count every upload at full size; stored bytes count each
+        distinct body once, in the month it was first uploaded.
+        """
+        with self._connect() as conn:
+            totals = conn.execute(
+                "SELECT COUNT(*) AS uploads, COUNT(DISTINCT u.digest) AS distinct_files, "
+                "COALESCE(SUM(b.size_bytes), 0) AS logical_bytes "
+                "FROM uploads u JOIN blobs b ON b.digest = u.digest"
+            ).fetchone()
+            stored = conn.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) FROM blobs"
+            ).fetchone()[0]
+            monthly = conn.execute(
+                "SELECT substr(u.upload_date, 1, 7) AS month, COUNT(*) AS uploads, "
+                "SUM(b.size_bytes) AS logical_bytes, "
+                "SUM(CASE WHEN u.id = first.id THEN b.size_bytes ELSE 0 END) AS stored_bytes "
+                "FROM uploads u JOIN blobs b ON b.digest = u.digest "
+                "JOIN (SELECT digest, MIN(id) AS id FROM uploads GROUP BY digest) first "
+                "ON first.digest = u.digest "
+                "GROUP BY month ORDER BY month"
+            ).fetchall()
+
+        return {
+            "uploads": totals["uploads"],
+            "distinct_files": totals["distinct_files"],
+            "logical_bytes": totals["logical_bytes"],
+            "stored_bytes": stored,
+            "saved_bytes": totals["logical_bytes"] - stored,
+            "monthly": [
+                {**dict(row), "saved_bytes": row["logical_bytes"] - row["stored_bytes"]}
+                for row in monthly
+            ]
+        }
+
+    def get_operation_log(self) -> List[Dict]:
+        """Get the store operation log"""
+        return self.operation_log
@@ -2,10 +2,17 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Union, Optional
 from datetime import datetime
+import hashlib
 import logging
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 import json
 import os
+import sys
+from pathlib import Path
+
+# The shared scratch-space package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from scratch_space import get_scratch_space
 
 logger = logging.getLogger(__name__)
 
@@ -28,19 +35,20 @@ class DataProcessor:
             "details": details
         })
     
-    def convert_xlsx_to_csv(self, xlsx_path: str) -> str:
+    def convert_xlsx_to_csv(self, xlsx_path: str, output_dir: Optional[str] = None) -> str:
         """
         Convert XLSX file to CSV format
         
         Args:
             xlsx_path: Path to the XLSX file
+            output_dir: Directory for the CSV, defaults to the XLSX file's directory
             
         Returns:
             Path to the generated CSV file
         """
         try:
             # Get directory and filename without extension
-            directory = os.path.dirname(xlsx_path)
+            directory = output_dir or os.path.dirname(xlsx_path)
             base_name = os.path.splitext(os.path.basename(xlsx_path))[0]
             
             # Read XLSX file
@@ -77,9 +85,8 @@ class DataProcessor:
             if format_type == "dataframe" and isinstance(data, pd.DataFrame):
                 df = data.copy()
             elif format_type == "xlsx" and isinstance(data, str):
-                # Convert XLSX to CSV first
-                csv_path = self.convert_xlsx_to_csv(data)
-                df = pd.read_csv(csv_path)
+                # Convert XLSX to CSV first, in scratch space
+                df = self._read_xlsx_via_csv(data)
             elif format_type == "csv" and isinstance(data, str):
                 df = pd.read_csv(data)
             elif format_type == "json" and isinstance(data, str):
@@ -104,6 +111,43 @@ class DataProcessor:
             logger.error(f"Error importing data: {str(e)}")
             raise
     
+    def _read_xlsx_via_csv(self, xlsx_path: str) -> pd.DataFrame:
+        """
+        Read an XLSX file through its CSV conversion
+
+        The conversion runs in a scratch job that is removed afterwards. The
+        CSV is kept as a reusable intermediate, keyed by the workbook's path,
+        size and modification time, so importing the same file again skips
+        the conversion.
+        """
+        scratch = get_scratch_space()
+        stat = os.stat(xlsx_path)
+        fingerprint = f"{os.path.abspath(xlsx_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        key = f"xlsx-{hashlib.sha1(fingerprint.encode()).hexdigest()}.csv"
+
+        cached_path = scratch.get_intermediate(key)
+        if cached_path:
+            try:
+                df = pd.read_csv(cached_path)
+                self.log_operation("convert_xlsx_to_csv", {
+                    "input_file": xlsx_path,
+                    "output_file": cached_path,
+                    "rows": df.shape[0],
+                    "columns": df.shape[1],
+                    "reused": True
+                })
+                return df
+            except FileNotFoundError:
+                # Evicted between the lookup and the read
+                pass
+
+        with scratch.job("import-xlsx") as job:
+            job.reserve(stat.st_size)
+            csv_path = self.convert_xlsx_to_csv(xlsx_path, output_dir=str(job.path))
+            df = pd.read_csv(csv_path)
+            scratch.put_intermediate(key, csv_path)
+        return df
+    
     def merge_datasets(self, other_data: pd.DataFrame, merge_on: Union[str, List[str]], 
                       how: str = "left") -> pd.DataFrame:
         """
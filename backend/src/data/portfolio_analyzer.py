@@ -0,0 +1,242 @@
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import logging
+import time
+import traceback
+from .budget_analyzer import BudgetAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+def _analyze_property(property_name: str,
+                      budget_data: Union[pd.DataFrame, str, Dict],
+                      actual_data: Union[pd.DataFrame, str, Dict],
+                      format_type: str,
+                      date_column: str,
+                      amount_columns: List[str],
+                      category_columns: Optional[List[str]],
+                      threshold_pct: float) -> Dict:
+    """
+    Run the full budget analysis for a single property.
+
+    Runs inside a worker process, so every failure is caught and returned
+    as part of the result instead of being raised.
+    """
+    timings = {}
+    start = time.perf_counter()
+    analyzer = BudgetAnalyzer()
+
+    try:
+        step_start = time.perf_counter()
+        analyzer.import_budget_data(budget_data, format_type)
+        analyzer.import_actual_data(actual_data, format_type)
+        timings["import_seconds"] = time.perf_counter() - step_start
+
+        step_start = time.perf_counter()
+        variance_data = analyzer.calculate_variances(
+            date_column, amount_columns, category_columns
+        )
+        timings["variance_seconds"] = time.perf_counter() - step_start
+
+        step_start = time.perf_counter()
+        significant_variances = analyzer.get_significant_variances(threshold_pct)
+        timings["significant_seconds"] = time.perf_counter() - step_start
+
+        step_start = time.perf_counter()
+        ytd_data = analyzer.calculate_ytd_performance(
+            date_column, amount_columns, category_columns
+        )
+        timings["ytd_seconds"] = time.perf_counter() - step_start
+
+        timings["total_seconds"] = time.perf_counter() - start
+        return {
+            "property": property_name,
+            "status": "success",
+            "variance_data": variance_data,
+            "significant_variances": significant_variances,
+            "ytd_data": ytd_data,
+            "timings": timings,
+            "analysis_log": analyzer.get_analysis_log()
+        }
+
+    except Exception as e:
+        timings["total_seconds"] = time.perf_counter() - start
+        return {
+            "property": property_name,
+            "status": "error",
+            "message": str(e),
+            "traceback": traceback.format_exc(),
+            "timings": timings,
+            "analysis_log": analyzer.get_analysis_log()
+        }
+
+
+class PortfolioAnalyzer:
+    """
+    Runs BudgetAnalyzer across many properties in a process pool and merges
+    the per-property results into portfolio-level frames
+    """
+
+    PROPERTY_COLUMN = "property"
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 progress_callback: Optional[Callable[[float, str], None]] = None):
+        """
+        Args:
+            max_workers: Number of worker processes. None uses the CPU count,
+                         1 runs every property in the current process.
+            progress_callback: Called with (progress, status) after each property
+        """
+        self.max_workers = max_workers
+        self.progress_callback = progress_callback
+        self.property_results = {}
+        self.variance_data = None
+        self.significant_variances = None
+        self.ytd_data = None
+        self.analysis_log = []
+
+    def log_analysis(self, operation: str, details: Dict):
+        """Log a portfolio analysis operation"""
+        self.analysis_log.append({
+            "timestamp": datetime.now().isoformat(),
+            "operation": operation,
+            "details": details
+        })
+
+    def _report_progress(self, completed: int, total: int, result: Dict):
+        """Forward per-property progress to the callback"""
+        status = "done" if result["status"] == "success" else "failed"
+        message = f"Property {result['property']} {status} ({completed}/{total})"
+        logger.info(message)
+        if self.progress_callback:
+            self.progress_callback(completed / total, message)
+
+    def run(self,
+            properties: Dict[str, Dict],
+            date_column: str,
+            amount_columns: List[str],
+            category_columns: Optional[List[str]] = None,
+            threshold_pct: float = 5.0,
+            format_type: str = "dataframe") -> pd.DataFrame:
+        """
+        Analyze every property and build the portfolio cube
+
+        Args:
+            properties: Mapping of property name to {"budget": ..., "actual": ...}.
+                        Each entry may also override "format_type".
+            date_column: Date column shared by all datasets
+            amount_columns: Amount columns to compare
+            category_columns: Optional category columns used for merging
+            threshold_pct: Threshold passed to get_significant_variances
+            format_type: Default input format for BudgetAnalyzer imports
+
+        Returns:
+            Portfolio variance cube with a leading property column
+        """
+        if not properties:
+            raise ValueError("No properties provided for portfolio analysis")
+
+        self.property_results = {}
+        total = len(properties)
+        jobs = [
+            (
+                name,
+                dataset["budget"],
+                dataset["actual"],
+                dataset.get("format_type", format_type),
+                date_column,
+                amount_columns,
+                category_columns,
+                threshold_pct
+            )
+            for name, dataset in properties.items()
+        ]
+
+        start = time.perf_counter()
+        if self.max_workers == 1:
+            for completed, job in enumerate(jobs, 1):
+                result = _analyze_property(*job)
+                self.property_results[result["property"]] = result
+                self._report_progress(completed, total, result)
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(_analyze_property, *job): job[0] for job in jobs}
+                for completed, future in enumerate(as_completed(futures), 1):
+                    name = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Worker crashed or the payload could not be pickled
+                        result = {
+                            "property": name,
+                            "status": "error",
+                            "message": str(e),
+                            "traceback": traceback.format_exc(),
+                            "timings": {},
+                            "analysis_log": []
+                        }
+                    self.property_results[name] = result
+                    self._report_progress(completed, total, result)
+
+        self._merge_results(list(properties))
+
+        failed = self.get_failed_properties()
+        self.log_analysis("run", {
+            "status": "success" if not failed else "partial",
+            "properties": total,
+            "failed": list(failed),
+            "elapsed_seconds": time.perf_counter() - start
+        })
+        return self.variance_data
+
+    def _merge_results(self, property_order: List[str]):
+        """Concatenate successful property results with property as a dimension"""
+        succeeded = [
+            name for name in property_order
+            if self.property_results[name]["status"] == "success"
+        ]
+
+        def combine(key: str) -> pd.DataFrame:
+            if not succeeded:
+                return pd.DataFrame()
+            combined = pd.concat(
+                [self.property_results[name][key] for name in succeeded],
+                keys=succeeded,
+                names=[self.PROPERTY_COLUMN, None]
+            )
+            return combined.reset_index(level=0).reset_index(drop=True)
+
+        self.variance_data = combine("variance_data")
+        self.significant_variances = combine("significant_variances")
+        self.ytd_data = combine("ytd_data")
+
+    def get_failed_properties(self) -> Dict[str, str]:
+        """Return error messages keyed by property for failed analyses"""
+        return {
+            name: result["message"]
+            for name, result in self.property_results.items()
+            if result["status"] == "error"
+        }
+
+    def get_timing_summary(self) -> pd.DataFrame:
+        """Return per-property status, row counts and step timings"""
+        rows = []
+        for name, result in self.property_results.items():
+            variance_data = result.get("variance_data")
+            rows.append({
+                self.PROPERTY_COLUMN: name,
+                "status": result["status"],
+                "rows": len(variance_data) if variance_data is not None else 0,
+                **result["timings"]
+            })
+        summary = pd.DataFrame(rows)
+        if not summary.empty and "total_seconds" in summary.columns:
+            summary = summary.sort_values("total_seconds", ascending=False)
+        return summary.reset_index(drop=True)
+
+    def get_analysis_log(self) -> List[Dict]:
+        """Return the portfolio operation log"""
+        return self.analysis_log
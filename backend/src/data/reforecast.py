@@ -0,0 +1,238 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Union
+from datetime import datetime
+import logging
+from .budget_analyzer import BudgetAnalyzer
+
+logger = logging.getLogger(__name__)
+
+class BudgetReforecaster:
+    """
+    Full-year reforecast module that works on top of BudgetAnalyzer
+
+    Budget and actual data are laid out as (line, month, measure) arrays so
+    every projection method is a handful of array operations, regardless of
+    how many GL lines are involved.
+    """
+
+    METHODS = ("budget", "run_rate", "trailing", "budget_ratio")
+    MONTHS = 12
+
+    def __init__(self, budget_analyzer: BudgetAnalyzer):
+        self.budget_analyzer = budget_analyzer
+        self.lines = None
+        self.budget_grid = None
+        self.actual_grid = None
+        self.elapsed_months = None
+        self.fiscal_year = None
+        self.amount_columns = []
+        self.reforecast_log = []
+
+    def log_operation(self, operation: str, details: Dict):
+        """Log a reforecast operation"""
+        self.reforecast_log.append({
+            "timestamp": datetime.now().isoformat(),
+            "operation": operation,
+            "details": details
+        })
+
+    def _fiscal_position(self, dates: pd.Series, start_month: int):
+        """Return (fiscal year, month index within fiscal year) arrays"""
+        months = dates.dt.month.to_numpy()
+        years = dates.dt.year.to_numpy()
+        month_idx = (months - start_month) % self.MONTHS
+        fiscal_years = np.where(months >= start_month, years, years - 1)
+        return fiscal_years, month_idx
+
+    def _build_grid(self, data: pd.DataFrame, line_index: pd.MultiIndex,
+                    line_columns: List[str], date_column: str,
+                    start_month: int) -> np.ndarray:
+        """Scatter one dataset into a (lines, months, measures) array"""
+        dates = pd.to_datetime(data[date_column])
+        fiscal_years, month_idx = self._fiscal_position(dates, start_month)
+        in_year = fiscal_years == self.fiscal_year
+
+        line_codes = line_index.get_indexer(
+            pd.MultiIndex.from_frame(data[line_columns])
+        )
+        keep = in_year & (line_codes >= 0)
+        flat_idx = line_codes[keep] * self.MONTHS + month_idx[keep]
+        size = len(line_index) * self.MONTHS
+
+        grid = np.empty((len(line_index), self.MONTHS, len(self.amount_columns)))
+        for m, col in enumerate(self.amount_columns):
+            values = pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=float)[keep]
+            values = np.nan_to_num(values)
+            grid[:, :, m] = np.bincount(flat_idx, weights=values, minlength=size).reshape(
+                len(line_index), self.MONTHS
+            )
+        return grid
+
+    def prepare(self,
+                date_column: str,
+                amount_columns: List[str],
+                category_columns: Optional[List[str]] = None,
+                as_of: Optional[Union[str, datetime]] = None,
+                fiscal_year_start_month: int = 1) -> "BudgetReforecaster":
+        """
+        Lay out budget and actual data as arrays for the fiscal year of `as_of`
+
+        Args:
+            date_column: Date column shared by budget and actual data
+            amount_columns: Measures to reforecast
+            category_columns: Columns identifying a GL line
+            as_of: Last closed month. Defaults to the latest actual date.
+            fiscal_year_start_month: First calendar month of the fiscal year
+        """
+        budget_data = self.budget_analyzer.budget_data
+        actual_data = self.budget_analyzer.actual_data
+        if budget_data is None or actual_data is None:
+            raise ValueError("Both budget and actual data must be imported first")
+        if self.budget_analyzer.variance_data is None:
+            raise ValueError("Variance data not calculated yet")
+
+        line_columns = list(category_columns or [])
+        self.amount_columns = list(amount_columns)
+
+        actual_dates = pd.to_datetime(actual_data[date_column])
+        as_of = pd.Timestamp(as_of) if as_of is not None else actual_dates.max()
+        as_of_year, as_of_idx = self._fiscal_position(
+            pd.Series([as_of]), fiscal_year_start_month
+        )
+        self.fiscal_year = int(as_of_year[0])
+        self.elapsed_months = int(as_of_idx[0]) + 1
+
+        # Union of GL lines found in either dataset
+        if line_columns:
+            lines = pd.concat(
+                [budget_data[line_columns], actual_data[line_columns]]
+            ).drop_duplicates()
+            line_index = pd.MultiIndex.from_frame(lines)
+        else:
+            # No categories: the whole dataset is a single line
+            budget_data = budget_data.assign(_line=0)
+            actual_data = actual_data.assign(_line=0)
+            line_columns = ["_line"]
+            line_index = pd.MultiIndex.from_arrays([[0]], names=["_line"])
+
+        self.lines = line_index
+        self.budget_grid = self._build_grid(
+            budget_data, line_index, line_columns, date_column, fiscal_year_start_month
+        )
+        self.actual_grid = self._build_grid(
+            actual_data, line_index, line_columns, date_column, fiscal_year_start_month
+        )
+        # Months after as_of are not closed yet, even if rows exist for them
+        self.actual_grid[:, self.elapsed_months:, :] = 0.0
+
+        self.log_operation("prepare", {
+            "fiscal_year": self.fiscal_year,
+            "elapsed_months": self.elapsed_months,
+            "lines": len(line_index),
+            "measures": self.amount_columns
+        })
+        return self
+
+    def project_months(self, method: str, trailing_months: int = 3) -> np.ndarray:
+        """
+        Return a (lines, months, measures) array with actuals for closed months
+        and the method's projection for the remaining months
+        """
+        if self.budget_grid is None:
+            raise ValueError("Reforecast data not prepared yet")
+        if method not in self.METHODS:
+            raise ValueError(f"Unsupported reforecast method: {method}")
+
+        elapsed = self.elapsed_months
+        closed = self.actual_grid[:, :elapsed, :]
+        open_budget = self.budget_grid[:, elapsed:, :]
+        remaining = self.MONTHS - elapsed
+
+        if method == "budget":
+            projected = open_budget
+        elif method == "run_rate":
+            monthly = closed.sum(axis=1, keepdims=True) / elapsed
+            projected = np.repeat(monthly, remaining, axis=1)
+        elif method == "trailing":
+            window = closed[:, max(elapsed - trailing_months, 0):, :]
+            monthly = window.mean(axis=1, keepdims=True)
+            projected = np.repeat(monthly, remaining, axis=1)
+        else:  # budget_ratio
+            actual_ytd = closed.sum(axis=1, keepdims=True)
+            budget_ytd = self.budget_grid[:, :elapsed, :].sum(axis=1, keepdims=True)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where(budget_ytd != 0, actual_ytd / budget_ytd, 1.0)
+            projected = open_budget * ratio
+
+        return np.concatenate([closed, projected], axis=1)
+
+    def reforecast(self,
+                   methods: Optional[List[str]] = None,
+                   trailing_months: int = 3) -> pd.DataFrame:
+        """
+        Compute full-year reforecasts for every GL line and measure
+
+        Args:
+            methods: Projection methods to run side by side. Defaults to all.
+                     'budget': actuals to date plus the remaining budget
+                     'run_rate': actuals to date extended at the YTD monthly average
+                     'trailing': actuals to date extended at the trailing-N-month average
+                     'budget_ratio': remaining budget scaled by the YTD actual/budget ratio
+            trailing_months: Window for the 'trailing' method
+
+        Returns:
+            One row per GL line with full-year budget, actual YTD and, per method,
+            the reforecast and its variance to the full-year budget
+        """
+        methods = list(methods or self.METHODS)
+        if self.budget_grid is None:
+            raise ValueError("Reforecast data not prepared yet")
+
+        elapsed = self.elapsed_months
+        result = self.lines.to_frame(index=False)
+        if "_line" in result.columns:
+            result = result.drop(columns="_line")
+
+        fy_budget = self.budget_grid.sum(axis=1)
+        actual_ytd = self.actual_grid[:, :elapsed, :].sum(axis=1)
+        budget_ytd = self.budget_grid[:, :elapsed, :].sum(axis=1)
+        forecasts = {
+            method: self.project_months(method, trailing_months).sum(axis=1)
+            for method in methods
+        }
+
+        columns = {}
+        for m, col in enumerate(self.amount_columns):
+            columns[f"{col}_fy_budget"] = fy_budget[:, m]
+            columns[f"{col}_budget_ytd"] = budget_ytd[:, m]
+            columns[f"{col}_actual_ytd"] = actual_ytd[:, m]
+            for method, forecast in forecasts.items():
+                columns[f"{col}_reforecast_{method}"] = forecast[:, m]
+                columns[f"{col}_reforecast_{method}_variance"] = forecast[:, m] - fy_budget[:, m]
+        result = pd.concat([result, pd.DataFrame(columns)], axis=1)
+
+        self.log_operation("reforecast", {
+            "methods": methods,
+            "trailing_months": trailing_months,
+            "lines": len(result)
+        })
+        return result
+
+    def get_monthly_projection(self, method: str, trailing_months: int = 3) -> pd.DataFrame:
+        """Return the month-by-month projection for one method in long format"""
+        grid = self.project_months(method, trailing_months)
+        lines = self.lines.to_frame(index=False)
+        if "_line" in lines.columns:
+            lines = lines.drop(columns="_line")
+
+        result = lines.loc[lines.index.repeat(self.MONTHS)].reset_index(drop=True)
+        result["fiscal_month"] = np.tile(np.arange(1, self.MONTHS + 1), len(self.lines))
+        result["is_actual"] = result["fiscal_month"] <= self.elapsed_months
+        for m, col in enumerate(self.amount_columns):
+            result[col] = grid[:, :, m].reshape(-1)
+        return result
+
+    def get_reforecast_log(self) -> List[Dict]:
+        """Return the reforecast operation log"""
+        return self.reforecast_log
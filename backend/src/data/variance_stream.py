@@ -0,0 +1,184 @@
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+class VarianceStream:
+    """
+    Incremental budget vs. actual engine for streaming actual feeds
+
+    Keeps running budget/actual totals per cell (date plus category columns)
+    so each batch of appended actual rows only touches the cells it affects.
+    Alerts use the same rule as BudgetAnalyzer.get_significant_variances:
+    a cell is significant when abs(variance_pct) >= threshold_pct.
+    """
+
+    def __init__(self,
+                 date_column: str,
+                 amount_columns: List[str],
+                 category_columns: Optional[List[str]] = None,
+                 threshold_pct: float = 5.0,
+                 alert_callback: Optional[Callable[[Dict], None]] = None):
+        self.date_column = date_column
+        self.amount_columns = list(amount_columns)
+        self.category_columns = list(category_columns or [])
+        self.key_columns = [date_column] + self.category_columns
+        self.threshold_pct = threshold_pct
+        self.alert_callback = alert_callback
+
+        self.cell_index = {}
+        self.cell_keys = []
+        self.budget = None
+        self.actual = None
+        self.flagged = None
+        self.received = None
+        self.unbudgeted_rows = 0
+        self.alerts = []
+        self.stream_log = []
+
+    def log_operation(self, operation: str, details: Dict):
+        """Log a streaming operation"""
+        self.stream_log.append({
+            "timestamp": datetime.now().isoformat(),
+            "operation": operation,
+            "details": details
+        })
+
+    def _aggregate(self, data: pd.DataFrame, row_counts: bool = False):
+        """
+        Sum amount columns per cell for a batch of rows
+
+        Args:
+            data: Rows to aggregate
+            row_counts: Also return the number of input rows in each cell
+        """
+        data = data.copy()
+        data[self.date_column] = pd.to_datetime(data[self.date_column])
+        for col in self.amount_columns:
+            data[col] = pd.to_numeric(data[col], errors='coerce').fillna(0.0)
+        groups = data.groupby(self.key_columns, sort=False)
+        grouped = groups[self.amount_columns].sum()
+        if row_counts:
+            return grouped, groups.size().reindex(grouped.index).to_numpy()
+        return grouped
+
+    @staticmethod
+    def _as_key(key) -> tuple:
+        return key if isinstance(key, tuple) else (key,)
+
+    def load_budget(self, budget_data: pd.DataFrame) -> int:
+        """
+        Initialize cell state from budget data
+
+        Returns:
+            Number of budget cells tracked
+        """
+        grouped = self._aggregate(budget_data)
+        self.cell_keys = [self._as_key(key) for key in grouped.index]
+        self.cell_index = {key: idx for idx, key in enumerate(self.cell_keys)}
+        self.budget = grouped.to_numpy(dtype=float)
+        self.actual = np.zeros_like(self.budget)
+        self.flagged = np.zeros(self.budget.shape, dtype=bool)
+        self.received = np.zeros(len(self.cell_keys), dtype=bool)
+        self.unbudgeted_rows = 0
+        self.alerts = []
+
+        self.log_operation("load_budget", {"cells": len(self.cell_keys)})
+        return len(self.cell_keys)
+
+    def _variance_pct(self, idx: np.ndarray) -> np.ndarray:
+        """Variance percentage for the given cells, rounded like calculate_variances"""
+        variance = self.actual[idx] - self.budget[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.round(variance / np.abs(self.budget[idx]) * 100, 2)
+
+    def append_actuals(self, actual_rows: pd.DataFrame) -> List[Dict]:
+        """
+        Apply a batch of new actual rows and return the alerts it triggered
+
+        Cost is proportional to the number of new rows. Rows for cells that
+        have no budget are counted but ignored, as the batch merge drops them.
+        """
+        if self.budget is None:
+            raise ValueError("Budget data must be loaded first")
+        if actual_rows.empty:
+            return []
+
+        grouped, rows_per_cell = self._aggregate(actual_rows, row_counts=True)
+        positions = np.array(
+            [self.cell_index.get(self._as_key(key), -1) for key in grouped.index],
+            dtype=int
+        )
+        known = positions >= 0
+        self.unbudgeted_rows += int(rows_per_cell[~known].sum())
+
+        idx = positions[known]
+        if len(idx) == 0:
+            return []
+        self.actual[idx] += grouped.to_numpy(dtype=float)[known]
+        self.received[idx] = True
+
+        pct = self._variance_pct(idx)
+        significant = np.abs(pct) >= self.threshold_pct
+        changed = significant != self.flagged[idx]
+        self.flagged[idx] = significant
+
+        new_alerts = []
+        timestamp = datetime.now().isoformat()
+        for row, col in zip(*np.nonzero(changed)):
+            cell = idx[row]
+            alert = dict(zip(self.key_columns, self.cell_keys[cell]))
+            alert.update({
+                "measure": self.amount_columns[col],
+                "type": "breach" if significant[row, col] else "cleared",
+                "budget": self.budget[cell, col],
+                "actual": self.actual[cell, col],
+                "variance": self.actual[cell, col] - self.budget[cell, col],
+                "variance_pct": pct[row, col],
+                "threshold": self.threshold_pct,
+                "timestamp": timestamp
+            })
+            new_alerts.append(alert)
+            if self.alert_callback:
+                self.alert_callback(alert)
+
+        self.alerts.extend(new_alerts)
+        self.log_operation("append_actuals", {
+            "rows": len(actual_rows),
+            "cells_updated": len(idx),
+            "alerts": len(new_alerts)
+        })
+        return new_alerts
+
+    def _cells_frame(self, idx: np.ndarray) -> pd.DataFrame:
+        """Build a calculate_variances-shaped frame for the given cells"""
+        result = pd.DataFrame([self.cell_keys[i] for i in idx], columns=self.key_columns)
+        pct = self._variance_pct(idx)
+        for m, col in enumerate(self.amount_columns):
+            result[f"{col}_budget"] = self.budget[idx, m]
+            result[f"{col}_actual"] = self.actual[idx, m]
+            result[f"{col}_variance"] = self.actual[idx, m] - self.budget[idx, m]
+            result[f"{col}_variance_pct"] = pct[:, m]
+        return result
+
+    def get_variance_data(self) -> pd.DataFrame:
+        """
+        Return cells that have received actuals, with the same columns as
+        calculate_variances
+        """
+        if self.budget is None:
+            raise ValueError("Budget data must be loaded first")
+        return self._cells_frame(np.flatnonzero(self.received))
+
+    def get_significant_variances(self) -> pd.DataFrame:
+        """Return cells currently at or above the threshold"""
+        if self.budget is None:
+            raise ValueError("Budget data must be loaded first")
+        return self._cells_frame(np.flatnonzero(self.flagged.any(axis=1)))
+
+    def get_alerts(self) -> List[Dict]:
+        """Return every alert emitted so far"""
+        return self.alerts
@@ -0,0 +1,115 @@
+import copy
+import itertools
+from types import SimpleNamespace
+
+class StubSupabase:
+    """
+    In-memory stand-in for the subset of the Supabase client the frontend uses
+
+    Supports table(name).select / insert / update / delete with eq, in_ and
+    order filters. fail(table, operation, times) makes the next `times`
+    matching requests raise, or every one when times is None.
+    before_execute(table, operation), if set, runs before each request.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.requests = []
+        self._failures = {}
+        self._ids = itertools.count(1)
+        self.before_execute = None
+
+    def table(self, name: str):
+        return StubQuery(self, name)
+
+    def fail(self, table: str, operation: str, times=None):
+        self._failures[(table, operation)] = times
+
+    def recover(self, table: str, operation: str):
+        self._failures.pop((table, operation), None)
+
+    def rows(self, table: str):
+        return self.tables.setdefault(table, [])
+
+    def _check_failure(self, table: str, operation: str):
+        key = (table, operation)
+        if key not in self._failures:
+            return
+        remaining = self._failures[key]
+        if remaining is not None:
+            if remaining <= 1:
+                del self._failures[key]
+            else:
+                self._failures[key] = remaining - 1
+        raise ConnectionError(f"Stub failure: {operation} on {table}")
+
+class StubQuery:
+    def __init__(self, stub: StubSupabase, table: str):
+        self.stub = stub
+        self.table = table
+        self.operation = 'select'
+        self.columns = None
+        self.values = None
+        self.filters = []
+        self.ordering = []
+
+    def select(self, *columns, **kwargs):
+        self.operation = 'select'
+        self.columns = [col for col in columns if col != '*'] or None
+        return self
+
+    def insert(self, values):
+        self.operation = 'insert'
+        self.values = values if isinstance(values, list) else [values]
+        return self
+
+    def update(self, values):
+        self.operation = 'update'
+        self.values = values
+        return self
+
+    def delete(self):
+        self.operation = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def _matching(self):
+        return [row for row in self.stub.rows(self.table) if all(f(row) for f in self.filters)]
+
+    def execute(self):
+        self.stub.requests.append((self.table, self.operation))
+        if self.stub.before_execute:
+            self.stub.before_execute(self.table, self.operation)
+        self.stub._check_failure(self.table, self.operation)
+        rows = self.stub.rows(self.table)
+
+        if self.operation == 'insert':
+            inserted = [{'id': next(self.stub._ids), **copy.deepcopy(values)} for values in self.values]
+            rows.extend(inserted)
+            return SimpleNamespace(data=copy.deepcopy(inserted))
+
+        matching = self._matching()
+        if self.operation == 'update':
+            for row in matching:
+                row.update(copy.deepcopy(self.values))
+        elif self.operation == 'delete':
+            removed = {id(row) for row in matching}
+            self.stub.tables[self.table] = [row for row in rows if id(row) not in removed]
+        else:
+            for column, desc in reversed(self.ordering):
+                matching = sorted(matching, key=lambda row: row.get(column), reverse=desc)
+            if self.columns:
+                matching = [{col: row.get(col) for col in self.columns} for row in matching]
+        return SimpleNamespace(data=copy.deepcopy(matching))
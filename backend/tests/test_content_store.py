@@ -0,0 +1,39 @@
+import pytest
+import os
+from src.data.content_store import ContentStore
+
+@pytest.fixture
+def store(tmp_path):
+    return ContentStore(tmp_path / "store")
+
+def test_duplicate_upload_reuses_body(store):
+    first = store.put_bytes(b"period,amount\n2024-01-01,100\n", "budget.csv")
+    second = store.put_bytes(b"period,amount\n2024-01-01,100\n", "budget (1).csv")
+    other = store.put_bytes(b"period,amount\n2024-01-01,90\n", "actual.csv")
+
+    assert not first["deduplicated"]
+    assert second["deduplicated"]
+    assert second["digest"] == first["digest"]
+    assert second["upload_id"] != first["upload_id"]
+    assert other["digest"] != first["digest"]
+    assert len(list(store.blob_dir.rglob("*"))) == 4  # two prefix dirs, two bodies
+
+    report = store.storage_report()
+    assert report["uploads"] == 3
+    assert report["distinct_files"] == 2
+    assert report["saved_bytes"] == first["size_bytes"]
+    assert sum(month["saved_bytes"] for month in report["monthly"]) == first["size_bytes"]
+
+def test_body_removed_with_last_reference(store):
+    first = store.put_bytes(b"a,b\n1,2\n", "one.csv")
+    second = store.put_bytes(b"a,b\n1,2\n", "two.csv")
+
+    assert store.delete_upload(first["upload_id"])
+    assert os.path.exists(second["path"])
+    assert store.get_upload(second["upload_id"])["file_name"] == "two.csv"
+
+    assert store.delete_upload(second["upload_id"])
+    assert not os.path.exists(second["path"])
+    assert store.get_upload(second["upload_id"]) is None
+    assert not store.delete_upload(second["upload_id"])
+    assert store.storage_report()["stored_bytes"] == 0
@@ -0,0 +1,138 @@
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+import httpx
+
+# The shared data-access package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from data_access import (
+    AsyncDataClient, DataAccessError, format_value, is_valid_supabase_key, is_valid_supabase_url
+)
+from data_access.sync import SyncDataClient, get_sync_client, run_sync, verify_credentials
+import data_access.client as client_module
+
+def make_client(handler):
+    return AsyncDataClient(
+        "https://example.supabase.co", "anon.key.value", transport=httpx.MockTransport(handler)
+    )
+
+def test_query_builder_maps_to_postgrest():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[{"id": 1}], headers={"content-range": "0-0/42"})
+
+    async def run():
+        client = make_client(handler)
+        result = await client.table("file_uploads").select("id", "file_name", count="exact").eq(
+            "file_type", "csv"
+        ).in_("id", [1, "a,b"]).order("upload_date", desc=True).order("id").range(10, 19).execute()
+        await client.aclose()
+        return result
+
+    result = asyncio.run(run())
+    assert result.data == [{"id": 1}]
+    assert result.count == 42
+
+    request = requests[0]
+    assert request.url.path == "/rest/v1/file_uploads"
+    params = dict(request.url.params)
+    assert params["select"] == "id,file_name"
+    assert params["file_type"] == "eq.csv"
+    assert params["id"] == 'in.(1,"a,b")'
+    assert params["order"] == "upload_date.desc,id.asc"
+    assert (params["offset"], params["limit"]) == ("10", "10")
+    assert request.headers["prefer"] == "count=exact"
+    assert request.headers["apikey"] == "anon.key.value"
+
+def test_filter_values_are_quoted():
+    assert format_value(42) == "42"
+    assert format_value(None) == "null"
+    assert format_value("2024-05-01T10:00:00+00:00") == '"2024-05-01T10:00:00+00:00"'
+    # A crafted value stays one quoted value instead of closing the group
+    assert format_value('x"),id.gt.(0') == '"x\\"),id.gt.(0"'
+
+def test_concurrent_identical_reads_are_coalesced():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=[{"id": 1}])
+
+    async def run():
+        client = make_client(handler)
+        query = lambda: client.table("file_uploads").select("id").eq("id", 1).execute()
+        results = await asyncio.gather(query(), query(), query())
+        # Writes are never shared
+        await asyncio.gather(
+            client.table("file_uploads").insert({"id": 2}).execute(),
+            client.table("file_uploads").insert({"id": 2}).execute()
+        )
+        await client.aclose()
+        return client, results
+
+    client, results = asyncio.run(run())
+    assert [r.data for r in results] == [[{"id": 1}]] * 3
+    assert client.requests_sent == 3
+    assert client.requests_coalesced == 2
+
+def test_errors_raise_data_access_error():
+    def handler(request):
+        return httpx.Response(401, json={"message": "Invalid API key"})
+
+    async def run():
+        client = make_client(handler)
+        try:
+            await client.table("file_uploads").select("id").execute()
+        finally:
+            await client.aclose()
+
+    with pytest.raises(DataAccessError) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 401
+    assert str(error.value) == "Invalid API key"
+
+def test_sync_wrapper_runs_on_background_loop():
+    def handler(request):
+        return httpx.Response(201, json=[{"id": 7, "file_name": "a.csv"}])
+
+    async def create():
+        return make_client(handler)
+
+    client = SyncDataClient(run_sync(create()))
+    result = client.table("file_uploads").insert({"file_name": "a.csv"}).execute()
+    assert result.data[0]["id"] == 7
+    run_sync(client.async_client.aclose())
+
+def test_credential_format_checks():
+    assert is_valid_supabase_url("https://abcd1234.supabase.co")
+    assert is_valid_supabase_url("https://supabase.internal.example.com")
+    assert is_valid_supabase_url("http://10.0.0.5:8000/")
+    assert not is_valid_supabase_url("abcd1234.supabase.co")
+    assert not is_valid_supabase_url("ftp://abcd1234.supabase.co")
+    assert not is_valid_supabase_url("https://")
+    assert is_valid_supabase_key("eyJhbGciOi.eyJpc3Mi.c2lnbmF0dXJl")
+    assert not is_valid_supabase_key("not a key")
+
+def test_failed_verification_evicts_pooled_clients(monkeypatch):
+    def handler(request):
+        return httpx.Response(401, json={"message": "Invalid API key"})
+
+    monkeypatch.setattr(client_module, "AsyncDataClient", lambda url, key: AsyncDataClient(
+        url, key, transport=httpx.MockTransport(handler)
+    ))
+    url, key = "https://supabase.internal.example.com", "anon.key.value"
+    stale = get_sync_client(url, key)
+
+    assert not verify_credentials(url, key)
+    fresh = get_sync_client(url, key)
+    assert fresh is not stale
+    assert fresh.async_client is not stale.async_client
+    # Clients held from before the check keep working on a fresh connection
+    for client in (fresh, stale):
+        with pytest.raises(DataAccessError) as error:
+            client.table("file_uploads").select("id").execute()
+        assert error.value.status_code == 401
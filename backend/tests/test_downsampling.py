@@ -0,0 +1,77 @@
+import pytest
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Chart downsampling is part of the frontend's components package
+sys.path.append(str(Path(__file__).resolve().parents[2] / "frontend"))
+from components.visualization.downsampling import downsample_frame, lttb_indices, minmax_indices
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    x = np.arange(10_000, dtype=float)
+    y = np.cumsum(rng.normal(size=len(x)))
+    return x, y
+
+@pytest.mark.parametrize("n_out", [3, 4, 5, 100, 999])
+def test_lttb_keeps_ends_within_budget(series, n_out):
+    x, y = series
+    kept = lttb_indices(x, y, n_out)
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+    assert len(kept) <= n_out
+    assert np.all(np.diff(kept) > 0)
+
+@pytest.mark.parametrize("n_out", [4, 5, 100, 999])
+def test_minmax_keeps_ends_and_extremes_within_budget(series, n_out):
+    _, y = series
+    kept = minmax_indices(y, n_out)
+    assert kept[0] == 0 and kept[-1] == len(y) - 1
+    assert len(kept) <= n_out
+    assert np.argmin(y) in kept and np.argmax(y) in kept
+
+def test_inputs_within_the_limit_are_unchanged(series):
+    x, y = series
+    short_x, short_y = x[:50], y[:50]
+    assert np.array_equal(lttb_indices(short_x, short_y, 50), np.arange(50))
+    assert np.array_equal(minmax_indices(short_y, 80), np.arange(50))
+    # Budgets too small to bucket keep everything
+    assert np.array_equal(lttb_indices(short_x, short_y, 2), np.arange(50))
+    assert np.array_equal(minmax_indices(short_y, 3), np.arange(50))
+
+    data = pd.DataFrame({"x": short_x, "y": short_y})
+    assert downsample_frame(data, "x", ["y"], max_points=50) is data
+    assert downsample_frame(data, "x", ["y"], max_points=None) is data
+
+def test_short_and_empty_series():
+    assert len(lttb_indices(np.array([]), np.array([]), 10)) == 0
+    assert np.array_equal(lttb_indices(np.array([0.0, 1.0]), np.array([5.0, 6.0]), 10), [0, 1])
+    assert np.array_equal(minmax_indices(np.array([1.0]), 10), [0])
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_frame_with_missing_values(series, method):
+    x, y = series
+    data = pd.DataFrame({
+        "period": pd.date_range("2000-01-01", periods=len(x), freq="h"),
+        "budget": y,
+        "actual": np.where(np.arange(len(x)) % 7 == 0, np.nan, -y)
+    })
+    result = downsample_frame(data, "period", ["budget", "actual"], max_points=400, method=method)
+    assert len(result) <= 400
+    assert result["period"].is_monotonic_increasing
+    assert result.index[0] == 0 and result.index[-1] == len(data) - 1
+
+def test_window_gets_the_detail_budget(series):
+    x, y = series
+    data = pd.DataFrame({"x": x, "y": y})
+    result = downsample_frame(data, "x", ["y"], max_points=400, window=(1000.0, 1999.0))
+    inside = result["x"].between(1000.0, 1999.0)
+    # The window is still capped at max_points; the rest gets a quarter of it
+    assert 300 < inside.sum() <= 400
+    assert (~inside).sum() <= 100
+
+def test_unknown_method_is_rejected(series):
+    x, y = series
+    with pytest.raises(ValueError):
+        downsample_frame(pd.DataFrame({"x": x, "y": y}), "x", ["y"], max_points=100, method="mean")
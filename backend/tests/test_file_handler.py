@@ -0,0 +1,87 @@
+import pytest
+import sys
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+
+# The shared scratch-space package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scratch_space import ScratchSpace
+
+# File conversion is part of the frontend's utils package
+sys.path.append(str(Path(__file__).resolve().parents[2] / "frontend"))
+from utils.file_handler import convert_csv_file, convert_csv_file_streaming, convert_to_csv, detect_header_row
+
+@pytest.fixture
+def job(tmp_path):
+    return ScratchSpace(tmp_path / "scratch").job("convert")
+
+def convert_sheet(tmp_path, job, rows):
+    path = tmp_path / "budget.xlsx"
+    pd.DataFrame(rows).to_excel(path, header=False, index=False)
+    output_path, _ = convert_to_csv(str(path), "budget.xlsx", sheet_name="Sheet1",
+                                    scratch_job=job, output_format="parquet")
+    return pd.read_parquet(output_path)
+
+def test_year_header_over_amounts(tmp_path, job):
+    df = convert_sheet(tmp_path, job, [
+        ["Account", 2023, 2024, 2025],
+        ["Rent", 100.0, 110.0, 120.0],
+        ["Fees", 10.0, 11.0, 12.0],
+    ])
+    assert list(df.columns) == ["Account", "2023", "2024", "2025"]
+    assert df["Account"].tolist() == ["Rent", "Fees"]
+    assert pd.api.types.is_numeric_dtype(df["2024"])
+
+def test_month_header_over_amounts(tmp_path, job):
+    df = convert_sheet(tmp_path, job, [
+        ["Account", datetime(2024, 1, 1), datetime(2024, 2, 1)],
+        ["Rent", 100.0, 110.0],
+        ["Fees", 10.0, 11.0],
+    ])
+    assert len(df) == 2
+    assert df["Account"].tolist() == ["Rent", "Fees"]
+    assert all(pd.api.types.is_numeric_dtype(df[col]) for col in df.columns[1:])
+
+def test_header_with_blank_cell_keeps_first_record(tmp_path, job):
+    df = convert_sheet(tmp_path, job, [
+        ["Account", "Description", None, "Property"],
+        ["4000", "Rent income", "Recurring", "Main St"],
+        ["4100", "Fee income", "One-off", "Oak Ave"],
+    ])
+    assert list(df.columns) == ["Account", "Description", "Unnamed: 2", "Property"]
+    assert df["Account"].tolist() == ["4000", "4100"]
+
+def test_title_rows_are_skipped(tmp_path, job):
+    df = convert_sheet(tmp_path, job, [
+        ["Operating budget 2024", None, None],
+        ["Prepared by finance", None, None],
+        [None, None, None],
+        ["Account", "Jan", "Feb"],
+        ["Rent", 100.0, 110.0],
+    ])
+    assert list(df.columns) == ["Account", "Jan", "Feb"]
+    assert df["Account"].tolist() == ["Rent"]
+
+def test_detect_header_row_without_filled_rows():
+    assert detect_header_row(pd.DataFrame([[None, None]])) is None
+    assert detect_header_row(pd.DataFrame([[1.0, 2.0], [3.0, 4.0]])) == 0
+
+def test_csv_output_does_not_depend_on_streaming(tmp_path):
+    source = tmp_path / "ledger.csv"
+    source.write_text(
+        " Account ,Amount,Empty,Note\n"
+        "007,1.50,,first\n"
+        ",,,\n"
+        "010,2,,\n"
+        "011,-3.250,,\"quoted, note\"\n"
+    )
+    in_memory = convert_csv_file(str(source), str(tmp_path), "in_memory", lambda *args: None)
+    streamed = convert_csv_file_streaming(str(source), str(tmp_path), "streamed", lambda *args: None,
+                                          chunk_rows=2)
+
+    assert Path(in_memory[0]).read_bytes() == Path(streamed[0]).read_bytes()
+    df = pd.read_csv(streamed[0], dtype=str)
+    assert list(df.columns) == ["Account", "Amount", "Note"]
+    assert df["Account"].tolist() == ["007", "010", "011"]
+    assert df["Amount"].tolist() == ["1.50", "2", "-3.250"]
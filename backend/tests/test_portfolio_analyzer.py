@@ -0,0 +1,67 @@
+import pytest
+import pandas as pd
+from src.data.portfolio_analyzer import PortfolioAnalyzer
+
+def make_property_data(scale: float):
+    periods = pd.date_range('2024-01-01', periods=3, freq='MS')
+    budget = pd.DataFrame({
+        'period': list(periods) * 2,
+        'gl_account': ['Revenue'] * 3 + ['Payroll'] * 3,
+        'amount': [100.0, 100.0, 100.0, 50.0, 50.0, 50.0]
+    })
+    actual = budget.copy()
+    actual['amount'] = actual['amount'] * scale
+    return {'budget': budget, 'actual': actual}
+
+@pytest.fixture
+def properties():
+    return {
+        'Blanco': make_property_data(1.10),
+        'Rio': make_property_data(1.01),
+        # Missing the merge column, so this property must fail in isolation
+        'Broken': {
+            'budget': pd.DataFrame({'amount': [1.0]}),
+            'actual': pd.DataFrame({'amount': [1.0]})
+        }
+    }
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_portfolio_run_merges_properties(properties, max_workers):
+    progress = []
+    analyzer = PortfolioAnalyzer(
+        max_workers=max_workers,
+        progress_callback=lambda p, m: progress.append((p, m))
+    )
+
+    cube = analyzer.run(properties, 'period', ['amount'], ['gl_account'], threshold_pct=5.0)
+
+    # Property is a dimension of the merged cube
+    assert list(cube.columns[:1]) == ['property']
+    assert set(cube['property']) == {'Blanco', 'Rio'}
+    assert len(cube) == 12
+
+    # Only Blanco exceeds the 5% threshold
+    assert set(analyzer.significant_variances['property']) == {'Blanco'}
+    assert len(analyzer.significant_variances) == 6
+
+    # YTD rolls each property up to one row per GL account and year
+    ytd = analyzer.ytd_data
+    assert len(ytd) == 4
+    blanco_revenue = ytd[(ytd['property'] == 'Blanco') & (ytd['gl_account'] == 'Revenue')]
+    assert blanco_revenue['amount_ytd_pct'].iloc[0] == 10.0
+
+    # Failures are isolated and reported
+    assert list(analyzer.get_failed_properties()) == ['Broken']
+    assert len(progress) == 3
+    assert progress[-1][0] == 1.0
+
+    summary = analyzer.get_timing_summary()
+    assert set(summary['property']) == {'Blanco', 'Rio', 'Broken'}
+    assert summary.set_index('property').loc['Blanco', 'rows'] == 6
+    assert (summary['total_seconds'] >= 0).all()
+
+    assert analyzer.get_analysis_log()[-1]['details']['status'] == 'partial'
+
+def test_portfolio_run_requires_properties():
+    with pytest.raises(ValueError):
+        PortfolioAnalyzer(max_workers=1).run({}, 'period', ['amount'])
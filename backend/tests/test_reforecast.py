@@ -0,0 +1,68 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.data.budget_analyzer import BudgetAnalyzer
+from src.data.reforecast import BudgetReforecaster
+
+@pytest.fixture
+def budget_analyzer():
+    months = pd.date_range('2024-01-01', periods=12, freq='MS')
+    budget = pd.DataFrame({
+        'period': list(months) * 2,
+        'gl_account': ['Revenue'] * 12 + ['Payroll'] * 12,
+        'amount': [100.0] * 12 + [50.0] * 12
+    })
+    # Actuals closed through June
+    closed = months[:6]
+    actual = pd.DataFrame({
+        'period': list(closed) * 2,
+        'gl_account': ['Revenue'] * 6 + ['Payroll'] * 6,
+        'amount': [110.0, 110.0, 110.0, 120.0, 120.0, 120.0] + [50.0] * 6
+    })
+
+    analyzer = BudgetAnalyzer()
+    analyzer.import_budget_data(budget)
+    analyzer.import_actual_data(actual)
+    analyzer.calculate_variances('period', ['amount'], ['gl_account'])
+    return analyzer
+
+def test_reforecast_methods(budget_analyzer):
+    reforecaster = BudgetReforecaster(budget_analyzer)
+    reforecaster.prepare('period', ['amount'], ['gl_account'])
+    result = reforecaster.reforecast(trailing_months=3).set_index('gl_account')
+
+    revenue = result.loc['Revenue']
+    assert revenue['amount_fy_budget'] == 1200.0
+    assert revenue['amount_actual_ytd'] == 690.0
+    assert revenue['amount_reforecast_budget'] == 690.0 + 600.0
+    assert revenue['amount_reforecast_run_rate'] == 690.0 + 115.0 * 6
+    assert revenue['amount_reforecast_trailing'] == 690.0 + 120.0 * 6
+    assert revenue['amount_reforecast_budget_ratio'] == pytest.approx(690.0 + 600.0 * 1.15)
+    assert revenue['amount_reforecast_budget_variance'] == 90.0
+
+    # On-budget line reforecasts to budget under every method
+    payroll = result.loc['Payroll']
+    for method in BudgetReforecaster.METHODS:
+        assert payroll[f'amount_reforecast_{method}'] == 600.0
+
+def test_reforecast_as_of_and_monthly_projection(budget_analyzer):
+    reforecaster = BudgetReforecaster(budget_analyzer)
+    reforecaster.prepare('period', ['amount'], ['gl_account'], as_of='2024-03-31')
+    assert reforecaster.elapsed_months == 3
+
+    monthly = reforecaster.get_monthly_projection('run_rate')
+    revenue = monthly[monthly['gl_account'] == 'Revenue']
+    assert len(revenue) == 12
+    assert revenue['is_actual'].sum() == 3
+    assert np.allclose(revenue['amount'].to_numpy(), 110.0)
+
+def test_reforecast_requires_variances():
+    analyzer = BudgetAnalyzer()
+    with pytest.raises(ValueError):
+        BudgetReforecaster(analyzer).prepare('period', ['amount'])
+
+def test_reforecast_rejects_unknown_method(budget_analyzer):
+    reforecaster = BudgetReforecaster(budget_analyzer)
+    reforecaster.prepare('period', ['amount'], ['gl_account'])
+    with pytest.raises(ValueError):
+        reforecaster.reforecast(methods=['straight_line'])
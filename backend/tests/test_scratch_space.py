@@ -0,0 +1,78 @@
+import pytest
+import os
+import sys
+import time
+from pathlib import Path
+
+# The shared scratch-space package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scratch_space import ScratchQuotaExceeded, ScratchSpace
+
+MB = 1024 * 1024
+
+@pytest.fixture
+def space(tmp_path):
+    return ScratchSpace(tmp_path / "scratch", quota_mb=4, job_quota_mb=2, cache_mb=4)
+
+def write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+def test_job_removed_with_last_reference(space):
+    job = space.job("convert")
+    write(job.file("out.csv"), 1000)
+    job.acquire()
+
+    job.release()
+    assert job.path.exists()
+    report = space.usage()
+    assert report["jobs"][0]["name"] == "convert"
+    assert report["jobs"][0]["bytes"] == 1000
+
+    job.release()
+    assert not job.path.exists()
+    assert space.usage()["jobs"] == []
+
+def test_job_quota(space):
+    with space.job("big") as job:
+        write(job.file("part"), MB)
+        job.reserve(MB // 2)
+        with pytest.raises(ScratchQuotaExceeded):
+            job.reserve(MB + 1)
+
+def test_cache_evicts_large_stale_entries_first(tmp_path):
+    space = ScratchSpace(tmp_path / "scratch", cache_mb=2)
+    now = time.time()
+    for name, size, age in [("old-big", 400 * 1024, 3600), ("old-small", 10 * 1024, 3600),
+                            ("recent-1", 400 * 1024, 0), ("recent-2", 400 * 1024, 0), ("recent-3", 400 * 1024, 0)]:
+        source = tmp_path / name
+        write(source, size)
+        cached = space.put_intermediate(name, source)
+        os.utime(cached, (now - age, now - age))
+
+    # 1610 KB cached plus 450 KB incoming exceeds the 2048 KB limit
+    write(tmp_path / "incoming", 450 * 1024)
+    assert space.put_intermediate("incoming", tmp_path / "incoming") is not None
+
+    assert space.get_intermediate("old-big") is None
+    for name in ("old-small", "recent-1", "recent-2", "recent-3", "incoming"):
+        assert space.get_intermediate(name) is not None
+
+    # Anything over a quarter of the cache is not kept
+    write(tmp_path / "huge", 600 * 1024)
+    assert space.put_intermediate("huge", tmp_path / "huge") is None
+
+def test_sweep_removes_only_stale_unheld_jobs(tmp_path):
+    space = ScratchSpace(tmp_path / "scratch", job_ttl_hours=1)
+    held = space.job("held")
+    detached = space.job("detached", detached=True)
+    orphan = space.jobs_dir / "left-by-crashed-process"
+    orphan.mkdir()
+    stale = time.time() - 7200
+    for path in (held.path, detached.path, orphan):
+        os.utime(path, (stale, stale))
+
+    assert space.sweep() == 2
+    assert held.path.exists()
+    assert not detached.path.exists()
+    assert not orphan.exists()
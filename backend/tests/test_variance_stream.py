@@ -0,0 +1,89 @@
+import pytest
+import pandas as pd
+from src.data.budget_analyzer import BudgetAnalyzer
+from src.data.variance_stream import VarianceStream
+
+@pytest.fixture
+def budget_data():
+    return pd.DataFrame({
+        'period': ['2024-01-01', '2024-01-01', '2024-02-01'],
+        'gl_account': ['Revenue', 'Payroll', 'Revenue'],
+        'amount': [100.0, 50.0, 100.0]
+    })
+
+@pytest.fixture
+def stream(budget_data):
+    stream = VarianceStream('period', ['amount'], ['gl_account'], threshold_pct=5.0)
+    stream.load_budget(budget_data)
+    return stream
+
+def test_alerts_on_threshold_crossing(stream):
+    received = []
+    stream.alert_callback = received.append
+
+    # Daily feed: Revenue January builds up to 98, under the threshold
+    alerts = stream.append_actuals(pd.DataFrame({
+        'period': ['2024-01-01', '2024-01-01'],
+        'gl_account': ['Revenue', 'Revenue'],
+        'amount': [60.0, 38.0]
+    }))
+    assert alerts == []
+
+    # Next feed pushes it to 108 (8% over budget)
+    alerts = stream.append_actuals(pd.DataFrame({
+        'period': ['2024-01-01'],
+        'gl_account': ['Revenue'],
+        'amount': [10.0]
+    }))
+    assert len(alerts) == 1
+    assert alerts[0]['type'] == 'breach'
+    assert alerts[0]['gl_account'] == 'Revenue'
+    assert alerts[0]['variance_pct'] == 8.0
+    assert received == alerts
+
+    # A correcting entry clears it again
+    alerts = stream.append_actuals(pd.DataFrame({
+        'period': ['2024-01-01'],
+        'gl_account': ['Revenue'],
+        'amount': [-6.0]
+    }))
+    assert [a['type'] for a in alerts] == ['cleared']
+    assert len(stream.get_alerts()) == 2
+
+def test_unbudgeted_rows_are_ignored(stream):
+    alerts = stream.append_actuals(pd.DataFrame({
+        'period': ['2024-03-01', '2024-03-01', '2024-01-01'],
+        'gl_account': ['Revenue', 'Revenue', 'Marketing'],
+        'amount': [500.0, 20.0, 5.0]
+    }))
+    assert alerts == []
+    # Input rows, not cells: two rows share the March Revenue cell
+    assert stream.unbudgeted_rows == 3
+    assert stream.get_variance_data().empty
+
+def test_matches_batch_analysis(budget_data, stream):
+    actual = pd.DataFrame({
+        'period': ['2024-01-01', '2024-01-01', '2024-02-01'],
+        'gl_account': ['Revenue', 'Payroll', 'Revenue'],
+        'amount': [103.0, 60.0, 90.0]
+    })
+    for _, row in actual.iterrows():
+        stream.append_actuals(row.to_frame().T)
+
+    analyzer = BudgetAnalyzer()
+    analyzer.import_budget_data(budget_data)
+    analyzer.import_actual_data(actual)
+    analyzer.calculate_variances('period', ['amount'], ['gl_account'])
+    batch = analyzer.get_significant_variances(5.0)
+
+    streamed = stream.get_significant_variances()
+    key = ['period', 'gl_account']
+    assert (
+        streamed.sort_values(key)[key + ['amount_variance_pct']].values.tolist()
+        == batch.sort_values(key)[key + ['amount_variance_pct']].values.tolist()
+    )
+
+def test_append_requires_budget():
+    stream = VarianceStream('period', ['amount'])
+    with pytest.raises(ValueError):
+        stream.append_actuals(pd.DataFrame({'period': ['2024-01-01'], 'amount': [1.0]}))
@@ -0,0 +1,82 @@
+import sys
+import zipfile
+from pathlib import Path
+
+# Workbook inspection is part of the frontend's utils package
+sys.path.append(str(Path(__file__).resolve().parents[2] / "frontend"))
+from utils.workbook import open_workbook
+
+MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+DOC_RELS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+def save_workbook(path, strings, rows):
+    """
+    Minimal .xlsx with one sheet, a shared string table and one bold style
+
+    rows hold the raw <c> elements of each row, e.g. '<c r="A2" s="1"/>'
+    for a styled blank cell and '<c r="B2" t="s"><v>0</v></c>' for the
+    first shared string.
+    """
+    sheet_data = "".join(f'<row r="{number}">{cells}</row>' for number, cells in enumerate(rows, start=1))
+    shared = "".join(f"<si><t>{text}</t></si>" for text in strings)
+    parts = {
+        "[Content_Types].xml": (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/></Types>'
+        ),
+        "_rels/.rels": (
+            f'<Relationships xmlns="{RELS}"><Relationship Id="rId1" '
+            f'Type="{DOC_RELS}/officeDocument" Target="xl/workbook.xml"/></Relationships>'
+        ),
+        "xl/workbook.xml": (
+            f'<workbook xmlns="{MAIN}" xmlns:r="{DOC_RELS}"><sheets>'
+            '<sheet name="Data" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            f'<Relationships xmlns="{RELS}">'
+            f'<Relationship Id="rId1" Type="{DOC_RELS}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{DOC_RELS}/sharedStrings" Target="sharedStrings.xml"/>'
+            f'<Relationship Id="rId3" Type="{DOC_RELS}/styles" Target="styles.xml"/></Relationships>'
+        ),
+        "xl/worksheets/sheet1.xml": f'<worksheet xmlns="{MAIN}"><sheetData>{sheet_data}</sheetData></worksheet>',
+        "xl/sharedStrings.xml": f'<sst xmlns="{MAIN}" count="{len(strings)}">{shared}</sst>',
+        "xl/styles.xml": (
+            f'<styleSheet xmlns="{MAIN}"><fonts count="2"><font/><font><b/></font></fonts>'
+            '<cellXfs count="2"><xf numFmtId="0" fontId="0"/><xf numFmtId="0" fontId="1"/></cellXfs></styleSheet>'
+        ),
+    }
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, xml in parts.items():
+            zf.writestr(name, xml)
+    return path
+
+def fingerprint(path):
+    with open_workbook(str(path)) as workbook:
+        return workbook.sheet_fingerprint("Data")
+
+def test_fingerprint_ignores_shared_string_numbering(tmp_path):
+    # Same cells, but the shared string table lists the strings in another order
+    first = save_workbook(tmp_path / "first.xlsx", ["Account", "Rent"], [
+        '<c r="A1" t="s"><v>0</v></c>',
+        '<c r="A2" s="1"/><c r="B2" t="s"><v>1</v></c>',
+    ])
+    second = save_workbook(tmp_path / "second.xlsx", ["Rent", "Account"], [
+        '<c r="A1" t="s"><v>1</v></c>',
+        '<c r="A2" s="1"/><c r="B2" t="s"><v>0</v></c>',
+    ])
+    assert fingerprint(first) == fingerprint(second)
+
+def test_fingerprint_sees_values_after_blank_cells(tmp_path):
+    rows = ['<c r="A1" t="s"><v>0</v></c>', '<c r="A2" s="1"/><c r="B2"><v>{}</v></c>']
+    before = save_workbook(tmp_path / "before.xlsx", ["Account"], [rows[0], rows[1].format(100)])
+    after = save_workbook(tmp_path / "after.xlsx", ["Account"], [rows[0], rows[1].format(250)])
+    assert fingerprint(before) != fingerprint(after)
+
+def test_fingerprint_sees_styled_blank_cells(tmp_path):
+    plain = save_workbook(tmp_path / "plain.xlsx", ["Account"], ['<c r="A1" t="s"><v>0</v></c>'])
+    styled = save_workbook(tmp_path / "styled.xlsx", ["Account"], [
+        '<c r="A1" t="s"><v>0</v></c>', '<c r="A2" s="1"/>'
+    ])
+    assert fingerprint(plain) != fingerprint(styled)
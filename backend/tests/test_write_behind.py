@@ -0,0 +1,156 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+from supabase_stub import StubSupabase
+
+# The write-behind queue is part of the frontend's utils package
+sys.path.append(str(Path(__file__).resolve().parents[2] / "frontend"))
+from utils.storage import LocalStorageBackend, dataset_checksum, make_arrow_safe
+from utils.write_behind import WriteBehindQueue, delete_remote_file, find_remote_content
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorageBackend(tmp_path / "store")
+
+@pytest.fixture
+def stub():
+    return StubSupabase()
+
+def frame(value):
+    return pd.DataFrame({"period": ["2024-01-01", "2024-02-01"], "amount": [value, value * 2]})
+
+def save(storage, value, name=None):
+    return storage.save_file(frame(value), name or f"file-{value}.csv", "csv", pending_sync=True)
+
+def test_uploads_in_batches(storage, stub):
+    ids = [save(storage, value) for value in range(5)]
+    queue = WriteBehindQueue(stub, storage, batch_size=2)
+
+    assert queue.run_once() == 2
+    assert stub.requests.count(("file_uploads", "insert")) == 1
+    assert len(stub.rows("file_uploads")) == 2
+
+    assert queue.flush()
+    assert stub.requests.count(("file_uploads", "insert")) == 3
+    assert storage.sync_summary()["synced"] == 5
+    assert set(storage.remote_id_map()) == set(ids)
+
+def test_backoff_grows_and_gives_up(storage, stub):
+    queue = WriteBehindQueue(stub, storage, max_retries=3, base_delay=2.0, max_delay=5.0)
+    for attempts, delay in [(1, 2.0), (2, 4.0)]:
+        wait = queue._backoff(attempts) - time.time()
+        assert delay * 0.5 - 0.1 <= wait <= delay + 0.1
+    assert queue._backoff(3) is None
+
+    # Capped at max_delay
+    queue.max_retries = 10
+    assert queue._backoff(8) - time.time() <= 5.0 + 0.1
+
+def test_failed_after_max_retries(storage, stub):
+    save(storage, 1)
+    stub.fail("file_uploads", "insert")
+    queue = WriteBehindQueue(stub, storage, max_retries=3, base_delay=0.0)
+
+    for _ in range(3):
+        assert queue.run_once() == 1
+    summary = storage.sync_summary()
+    assert summary["failed"] == 1
+    assert summary["pending"] == 0
+    assert "Stub failure" in summary["last_error"]
+    # Given up: nothing is claimed until retried manually
+    assert queue.run_once() == 0
+
+    stub.recover("file_uploads", "insert")
+    assert queue.retry_failed() == 1
+    assert queue.flush()
+    assert storage.sync_summary()["synced"] == 1
+
+def test_summary_shows_latest_error(storage):
+    retrying, given_up = save(storage, 1), save(storage, 2)
+    storage.mark_sync_failed(retrying, "older error", time.time() + 60)
+    storage.mark_sync_failed(given_up, "latest error", None)
+    assert storage.sync_summary()["last_error"] == "latest error"
+
+def test_failed_chunks_are_retried_without_leftovers(storage, stub):
+    save(storage, 1)
+    stub.fail("file_chunks", "insert", times=1)
+    queue = WriteBehindQueue(stub, storage, base_delay=0.0)
+
+    queue.run_once()
+    assert storage.sync_summary()["pending"] == 1
+    assert stub.rows("file_uploads") == []
+
+    queue.run_once()
+    assert storage.sync_summary()["synced"] == 1
+    assert len(stub.rows("file_uploads")) == 1
+
+def test_remote_ids_are_reconciled(storage, stub):
+    kept = save(storage, 1)
+    queue = WriteBehindQueue(stub, storage)
+    assert queue.flush()
+
+    remote_id = storage.remote_id_map()[kept]
+    assert storage.find_by_remote_id(remote_id) == kept
+    assert [row["id"] for row in stub.rows("file_uploads")] == [int(remote_id)]
+
+    # Deleted locally while its upload is in flight: the remote copy is removed too
+    dropped = save(storage, 2)
+    stub.before_execute = lambda table, operation: (
+        storage.delete_file(dropped) if (table, operation) == ("file_chunks", "insert") else None
+    )
+    queue.run_once()
+    assert dropped not in storage.remote_id_map()
+    assert [row["id"] for row in stub.rows("file_uploads")] == [int(remote_id)]
+    assert {chunk["file_id"] for chunk in stub.rows("file_chunks")} == {int(remote_id)}
+
+def test_duplicate_content_is_uploaded_once(storage, stub):
+    first = save(storage, 1, "budget.csv")
+    second = save(storage, 1, "budget (1).csv")
+    queue = WriteBehindQueue(stub, storage)
+    assert queue.flush()
+
+    remote = storage.remote_id_map()
+    owner, duplicate = int(remote[first]), int(remote[second])
+    uploads = {row["id"]: row for row in stub.rows("file_uploads")}
+    assert uploads[owner]["content_id"] is None
+    assert uploads[duplicate]["content_id"] == owner
+    chunk_count = len(stub.rows("file_chunks"))
+    assert {chunk["file_id"] for chunk in stub.rows("file_chunks")} == {owner}
+
+    # A later upload of the same content references the existing chunks
+    third = save(storage, 1, "budget (2).csv")
+    assert queue.flush()
+    assert len(stub.rows("file_chunks")) == chunk_count
+    assert {row["id"]: row for row in stub.rows("file_uploads")}[
+        int(storage.remote_id_map()[third])
+    ]["content_id"] == owner
+
+def test_records_with_unfinished_chunks_are_not_referenced(storage, stub):
+    # Another client's upload of the same content, chunks still being written
+    data = frame(1)
+    checksum = dataset_checksum(make_arrow_safe(data))
+    stub.table("file_uploads").insert({"manifest": {"columns": ["period", "amount"]}, "checksum": checksum}).execute()
+    assert find_remote_content(stub, [checksum]) == {}
+
+    local_id = storage.save_file(data, "budget.csv", "csv", pending_sync=True)
+    assert WriteBehindQueue(stub, storage).flush()
+    remote_id = int(storage.remote_id_map()[local_id])
+    uploaded = {row["id"]: row for row in stub.rows("file_uploads")}[remote_id]
+    assert uploaded["content_id"] is None
+    assert uploaded["chunks_complete"]
+    assert find_remote_content(stub, [checksum])[checksum]["id"] == remote_id
+
+def test_deleted_owner_hands_chunks_to_duplicate(storage, stub):
+    first = save(storage, 1, "budget.csv")
+    second = save(storage, 1, "budget (1).csv")
+    assert WriteBehindQueue(stub, storage).flush()
+    remote = storage.remote_id_map()
+    owner, duplicate = int(remote[first]), int(remote[second])
+
+    delete_remote_file(stub, owner)
+    heir = stub.rows("file_uploads")[0]
+    assert heir["id"] == duplicate
+    assert heir["content_id"] is None and heir["chunks_complete"]
+    assert {chunk["file_id"] for chunk in stub.rows("file_chunks")} == {duplicate}
@@ -0,0 +1,33 @@
+"""
+Shared data-access layer for the backend and frontend
+
+Async code (FastAPI) uses get_async_client; blocking code (Streamlit) uses
+get_sync_client. Both expose the supabase-style table() query builder.
+"""
+from data_access.client import (
+    AsyncDataClient,
+    DataAccessError,
+    close_async_clients,
+    get_async_client,
+    is_valid_supabase_key,
+    is_valid_supabase_url,
+    verify_credentials
+)
+from data_access.query import QueryResult, TableQuery, format_value
+from data_access.sync import SyncDataClient, get_sync_client, run_sync
+
+__all__ = [
+    'AsyncDataClient',
+    'DataAccessError',
+    'QueryResult',
+    'SyncDataClient',
+    'TableQuery',
+    'close_async_clients',
+    'format_value',
+    'get_async_client',
+    'get_sync_client',
+    'is_valid_supabase_key',
+    'is_valid_supabase_url',
+    'run_sync',
+    'verify_credentials'
+]
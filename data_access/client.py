@@ -0,0 +1,206 @@
+"""
+Async PostgREST client with a pooled HTTP connection and request coalescing
+"""
+import asyncio
+import os
+import re
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+import httpx
+from data_access.query import QueryResult, TableQuery
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_CONNECTIONS = 20
+
+_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$|^sb_(publishable|secret)_[A-Za-z0-9_-]+$')
+
+class DataAccessError(Exception):
+    """A request to the data API failed"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, details: Optional[Dict] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details or {}
+
+def is_valid_supabase_url(url: str) -> bool:
+    """Project URLs are http(s) URLs: https://<project>.supabase.co or a self-hosted server"""
+    url = url.strip()
+    parsed = urlparse(url)
+    return (parsed.scheme in ('http', 'https') and bool(parsed.hostname)
+            and not parsed.query and not parsed.fragment and not any(c.isspace() for c in url))
+
+def is_valid_supabase_key(key: str) -> bool:
+    """API keys are JWTs (anon/service role) or sb_publishable_/sb_secret_ keys"""
+    return bool(_KEY_PATTERN.match(key.strip()))
+
+def _timeout() -> httpx.Timeout:
+    total = float(os.getenv('DATA_ACCESS_TIMEOUT', DEFAULT_TIMEOUT))
+    return httpx.Timeout(total, connect=min(total, 5.0))
+
+def _parse_count(content_range: Optional[str]) -> Optional[int]:
+    """Total from a Content-Range header such as '0-24/3573' or '*/0'"""
+    if not content_range or '/' not in content_range:
+        return None
+    total = content_range.rsplit('/', 1)[1]
+    return int(total) if total.isdigit() else None
+
+class AsyncDataClient:
+    """
+    Client for one Supabase project's REST API
+
+    All requests share one pooled httpx.AsyncClient. Identical reads issued
+    while one is already in flight wait for that request instead of sending
+    their own. Instances are bound to the event loop they were created on;
+    use get_async_client to reuse them.
+    """
+
+    def __init__(self,
+                 url: str,
+                 key: str,
+                 timeout: Optional[httpx.Timeout] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url.strip().rstrip('/')
+        self.key = key.strip()
+        self._http = httpx.AsyncClient(
+            base_url=f"{self.url}/rest/v1/",
+            headers={
+                'apikey': self.key,
+                'Authorization': f"Bearer {self.key}",
+                'Content-Type': 'application/json'
+            },
+            timeout=timeout or _timeout(),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.requests_sent = 0
+        self.requests_coalesced = 0
+
+    def table(self, name: str) -> TableQuery:
+        return TableQuery(self, name)
+
+    async def execute(self, request: Dict) -> QueryResult:
+        """Send a built query, sharing the response of an identical read in flight"""
+        if request['method'] != 'GET':
+            return await self._send(request)
+
+        key = (
+            request['path'],
+            tuple(request['params']),
+            tuple(sorted(request['headers'].items()))
+        )
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.requests_coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._send(request)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved for requests nobody joined
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _send(self, request: Dict) -> QueryResult:
+        self.requests_sent += 1
+        try:
+            response = await self._http.request(
+                request['method'],
+                request['path'],
+                params=request['params'],
+                headers=request['headers'],
+                json=request['json']
+            )
+        except httpx.TimeoutException as e:
+            raise DataAccessError(f"Request to {request['path']} timed out") from e
+        except httpx.HTTPError as e:
+            raise DataAccessError(f"Request to {request['path']} failed: {str(e)}") from e
+
+        if response.status_code >= 400:
+            try:
+                details = response.json()
+            except ValueError:
+                details = {'message': response.text}
+            raise DataAccessError(
+                details.get('message') or f"HTTP {response.status_code}",
+                response.status_code,
+                details
+            )
+
+        data = response.json() if response.content else None
+        return QueryResult(data, _parse_count(response.headers.get('content-range')))
+
+    @property
+    def closed(self) -> bool:
+        return self._http.is_closed
+
+    async def aclose(self):
+        await self._http.aclose()
+
+# Clients are bound to an event loop; one per project and loop
+_clients: Dict[Tuple, AsyncDataClient] = {}
+
+def get_async_client(url: Optional[str] = None, key: Optional[str] = None) -> AsyncDataClient:
+    """
+    Shared client for a project on the running event loop
+
+    Defaults to SUPABASE_URL / SUPABASE_KEY from the environment.
+    """
+    url = (url or os.getenv('SUPABASE_URL', '')).strip().rstrip('/')
+    key = (key or os.getenv('SUPABASE_KEY', '')).strip()
+    if not url or not key:
+        raise ValueError("Supabase credentials not found in environment variables")
+
+    loop = asyncio.get_running_loop()
+    cache_key = (url, key, id(loop))
+    client = _clients.get(cache_key)
+    if client is None:
+        client = AsyncDataClient(url, key)
+        _clients[cache_key] = client
+    return client
+
+def _evict_client(url: str, key: str):
+    """Remove a project's client on the running loop from the pool, without closing it"""
+    _clients.pop((url, key, id(asyncio.get_running_loop())), None)
+
+async def close_async_clients():
+    """Close the clients bound to the running event loop, e.g. on app shutdown"""
+    loop_id = id(asyncio.get_running_loop())
+    for cache_key in [k for k in _clients if k[2] == loop_id]:
+        await _clients.pop(cache_key).aclose()
+
+async def verify_credentials(url: str, key: str) -> bool:
+    """
+    Check credentials with a one-row read
+
+    Raises:
+        ValueError: If the URL or key is malformed
+    """
+    if not is_valid_supabase_url(url):
+        raise ValueError("Invalid Supabase URL format")
+    if not is_valid_supabase_key(key):
+        raise ValueError("Invalid Supabase key format")
+    client = get_async_client(url, key)
+    try:
+        await client.table('file_uploads').select('id').limit(1).execute()
+        return True
+    except DataAccessError as e:
+        logger.error(f"Credential verification failed: {str(e)}")
+        # Keep the pool for working credentials only
+        _evict_client(client.url, client.key)
+        await client.aclose()
+        return False
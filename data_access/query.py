@@ -0,0 +1,142 @@
+"""
+Query builder for PostgREST tables
+
+Mirrors the subset of the supabase-py builder the application uses, so code
+written against `client.table(...)...execute()` works unchanged.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Characters that must be quoted inside PostgREST filter values
+_RESERVED = set(',.:()"\\ ')
+
+@dataclass
+class QueryResult:
+    data: Any
+    count: Optional[int] = None
+
+def format_value(value: Any) -> str:
+    """A filter value as PostgREST expects it, quoted when it holds reserved characters"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    text = str(value)
+    if any(char in _RESERVED for char in text):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+class TableQuery:
+    """A single request against one table, built by chaining filters"""
+
+    def __init__(self, client, table: str):
+        self._client = client
+        self._table = table
+        self._method = 'GET'
+        self._params: List[Tuple[str, str]] = []
+        self._headers: Dict[str, str] = {}
+        self._body: Optional[Union[Dict, List[Dict]]] = None
+        self._order: List[str] = []
+
+    # Operations
+
+    def select(self, *columns: str, count: Optional[str] = None) -> 'TableQuery':
+        self._method = 'GET'
+        self._params.append(('select', ','.join(column.strip() for column in columns) or '*'))
+        if count:
+            self._headers['Prefer'] = f"count={count}"
+        return self
+
+    def insert(self, rows: Union[Dict, List[Dict]]) -> 'TableQuery':
+        self._method = 'POST'
+        self._body = rows
+        self._headers['Prefer'] = 'return=representation'
+        return self
+
+    def update(self, values: Dict) -> 'TableQuery':
+        self._method = 'PATCH'
+        self._body = values
+        self._headers['Prefer'] = 'return=representation'
+        return self
+
+    def delete(self) -> 'TableQuery':
+        self._method = 'DELETE'
+        self._headers['Prefer'] = 'return=representation'
+        return self
+
+    # Filters
+
+    def _filter(self, column: str, operator: str, value: Any) -> 'TableQuery':
+        self._params.append((column, f"{operator}.{format_value(value)}"))
+        return self
+
+    def eq(self, column: str, value: Any) -> 'TableQuery':
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> 'TableQuery':
+        return self._filter(column, 'neq', value)
+
+    def lt(self, column: str, value: Any) -> 'TableQuery':
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> 'TableQuery':
+        return self._filter(column, 'lte', value)
+
+    def gt(self, column: str, value: Any) -> 'TableQuery':
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> 'TableQuery':
+        return self._filter(column, 'gte', value)
+
+    def ilike(self, column: str, pattern: str) -> 'TableQuery':
+        return self._filter(column, 'ilike', pattern)
+
+    def is_(self, column: str, value: Any) -> 'TableQuery':
+        # is.null / is.true: the value is a keyword, never quoted
+        self._params.append((column, f"is.{'null' if value in (None, 'null') else str(value).lower()}"))
+        return self
+
+    def in_(self, column: str, values: List[Any]) -> 'TableQuery':
+        self._params.append((column, f"in.({','.join(format_value(value) for value in values)})"))
+        return self
+
+    def or_(self, filters: str) -> 'TableQuery':
+        """Raw PostgREST or-filter, e.g. 'a.lt.1,and(a.eq.1,b.lt.2)'"""
+        self._params.append(('or', f"({filters})"))
+        return self
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False) -> 'TableQuery':
+        self._order.append(f"{column}.{'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, count: int) -> 'TableQuery':
+        self._params.append(('limit', str(count)))
+        return self
+
+    def range(self, start: int, end: int) -> 'TableQuery':
+        """Inclusive row range, as in supabase-py"""
+        self._params.append(('offset', str(start)))
+        self._params.append(('limit', str(end - start + 1)))
+        return self
+
+    def single(self) -> 'TableQuery':
+        self._headers['Accept'] = 'application/vnd.pgrst.object+json'
+        return self
+
+    def build(self) -> Dict:
+        """Method, path, params, headers and body of the request"""
+        params = list(self._params)
+        if self._order:
+            params.append(('order', ','.join(self._order)))
+        return {
+            'method': self._method,
+            'path': self._table,
+            'params': params,
+            'headers': dict(self._headers),
+            'json': self._body
+        }
+
+    async def execute(self) -> QueryResult:
+        return await self._client.execute(self.build())
@@ -0,0 +1,86 @@
+"""
+Blocking wrappers for callers without an event loop, such as Streamlit scripts
+
+Every sync client in the process runs its requests on one background event
+loop, so all sessions share the pooled connections and in-flight reads of the
+underlying AsyncDataClient.
+"""
+import asyncio
+import threading
+from typing import Awaitable, Dict, Optional, Tuple, TypeVar
+from data_access.client import (
+    AsyncDataClient, get_async_client, verify_credentials as async_verify_credentials
+)
+from data_access.query import QueryResult, TableQuery
+
+T = TypeVar('T')
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='data-access', daemon=True).start()
+        return _loop
+
+def run_sync(coroutine: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the shared background loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coroutine, _background_loop()).result(timeout)
+
+class SyncTableQuery(TableQuery):
+    """TableQuery whose execute() blocks until the response arrives"""
+
+    def execute(self) -> QueryResult:
+        return run_sync(self._client.execute(self.build()))
+
+class SyncDataClient:
+    """Blocking facade over an AsyncDataClient living on the background loop"""
+
+    def __init__(self, async_client: AsyncDataClient):
+        self.async_client = async_client
+        self.url = async_client.url
+
+    def table(self, name: str) -> SyncTableQuery:
+        if self.async_client.closed:
+            # Closed by a failed verify_credentials; rebind to the pooled client
+            self.async_client = get_sync_client(self.async_client.url, self.async_client.key).async_client
+        return SyncTableQuery(self.async_client, name)
+
+    def stats(self) -> Dict:
+        return {
+            'requests_sent': self.async_client.requests_sent,
+            'requests_coalesced': self.async_client.requests_coalesced
+        }
+
+_sync_clients: Dict[Tuple[str, str], SyncDataClient] = {}
+
+def get_sync_client(url: Optional[str] = None, key: Optional[str] = None) -> SyncDataClient:
+    """Shared blocking client for a project; see get_async_client"""
+
+    async def create():
+        return get_async_client(url, key)
+
+    async_client = run_sync(create())
+    cache_key = (async_client.url, async_client.key)
+    with _loop_lock:
+        client = _sync_clients.get(cache_key)
+        if client is None or client.async_client is not async_client:
+            client = SyncDataClient(async_client)
+            _sync_clients[cache_key] = client
+        return client
+
+def verify_credentials(url: str, key: str) -> bool:
+    """
+    Blocking form of data_access.client.verify_credentials
+
+    A failed check closes the project's pooled client, so its sync wrapper
+    is evicted too; the next get_sync_client call builds a fresh pair.
+    """
+    valid = run_sync(async_verify_credentials(url, key))
+    if not valid:
+        with _loop_lock:
+            _sync_clients.pop((url.strip().rstrip('/'), key.strip()), None)
+    return valid
@@ -2,14 +2,20 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 import numpy as np
-from utils.file_handler import convert_to_csv, clean_dataframe, get_excel_sheets
+from utils.file_handler import clean_dataframe
+from utils.columnar import export_csv_bytes
+from utils.parse_cache import cached_csv_frame, cached_sheet_conversion, cached_workbook_sheets, upload_hash
 from utils.database import DatabaseManager
+from components.data_table import FrameSource, StoredFileSource, render_data_table
 import os
 import time
 import io
+from functools import partial
+from packaging.version import Version
 
-# Clear cache to ensure we get fresh instance
-st.cache_resource.clear()
+# download_button accepts a callable for data, run on click, from Streamlit
+# 1.52; older releases need the bytes up front
+DEFERRED_DOWNLOADS = Version(st.__version__) >= Version("1.52.0")
 
 # Initialize database manager
 @st.cache_resource
@@ -29,9 +35,17 @@ st.set_page_config(
 
 # Initialize database and show connection status
 db = get_db_manager()
+
+def save_upload_once(df: pd.DataFrame, upload_key: str, file_name: str, file_type: str) -> str:
+    """Save an upload the first time it is processed; reruns (paging, sorting) reuse its ID"""
+    saved_uploads = st.session_state.setdefault('saved_uploads', {})
+    if upload_key not in saved_uploads:
+        saved_uploads[upload_key] = db.save_uploaded_file(df, file_name, file_type)
+    return saved_uploads[upload_key]
+
 with st.sidebar:
     if not db.client:
-        st.warning("⚠️ Running in offline mode. Data will be stored in session only.")
+        st.warning("⚠️ Running in offline mode. Data will be stored locally only.")
         st.info("Configure database in Settings page to enable cloud storage.")
 
 # Apply dark theme styling
@@ -155,43 +169,55 @@ with upload_tab:
                 try:
                     # Get list of sheets
                     update_progress(0.1, "Reading Excel file structure...")
-                    sheets = get_excel_sheets(uploaded_file)
+                    content_hash = upload_hash(uploaded_file)
+                    sheet_info = {
+                        sheet['name']: sheet
+                        for sheet in cached_workbook_sheets(content_hash, uploaded_file.getvalue())
+                    }
+                    sheets = list(sheet_info)
                     add_debug_message(f"Found sheets: {', '.join(sheets)}")
                     
-                    # Sheet selection
+                    def describe_sheet(name: str) -> str:
+                        info = sheet_info[name]
+                        if info['rows'] is None:
+                            return name
+                        return f"{name} ({info['rows']:,} rows × {info['columns']:,} columns)"
+                    
+                    # Sheet selection, labelled with sizes read from the workbook metadata
                     selected_sheet = st.selectbox(
                         "Select Sheet",
                         sheets,
                         key='sheet_selector',
+                        format_func=describe_sheet,
                         help="Select a sheet to process"
                     )
+                    header = [str(value) for value in sheet_info[selected_sheet]['header'] if value is not None]
+                    if header:
+                        st.caption(f"First row: {', '.join(header[:12])}{' …' if len(header) > 12 else ''}")
                     
                     add_debug_message(f"Selected sheet: {selected_sheet}")
                     
                     try:
-                        # Convert selected sheet to CSV
+                        # Convert selected sheet to CSV; parsed sheets are cached by
+                        # content hash, so revisiting a sheet is instant
                         add_debug_message(f"Starting conversion of sheet: {selected_sheet}")
-                        csv_path, csv_filename = convert_to_csv(
-                            uploaded_file, 
-                            uploaded_file.name, 
-                            sheet_name=selected_sheet,
-                            progress_callback=update_progress
+                        df, csv_filename = cached_sheet_conversion(
+                            content_hash,
+                            uploaded_file.name,
+                            selected_sheet,
+                            uploaded_file.getvalue(),
+                            _progress_callback=update_progress
                         )
+                        update_progress(1.0, "Conversion complete")
                         
                         add_debug_message(f"Sheet converted successfully to: {csv_filename}")
                         
                         try:
-                            # Read and display the data
-                            add_debug_message("Reading converted CSV file...")
-                            df = pd.read_csv(csv_path)
                             add_debug_message(f"CSV loaded successfully. Shape: {df.shape}")
                             
                             # Save to database
-                            file_id = db.save_uploaded_file(
-                                df,
-                                uploaded_file.name,
-                                'xlsx'
-                            )
+                            upload_key = f"{uploaded_file.name}:{content_hash}:{selected_sheet}"
+                            file_id = save_upload_once(df, upload_key, uploaded_file.name, 'xlsx')
                             st.success(f"File uploaded and saved successfully! ID: {file_id}")
                             
                             # Display data info
@@ -223,22 +249,17 @@ with upload_tab:
 
                             with col1:
                                 st.subheader("Data Table")
-                                st.dataframe(df)
+                                render_data_table(FrameSource(df, upload_key), key="upload_table")
                                 
-                                # Provide download link for converted CSV
-                                with open(csv_path, 'rb') as f:
-                                    st.download_button(
-                                        label=f"Download {selected_sheet or 'data'} as CSV",
-                                        data=f,
-                                        file_name=csv_filename,
-                                        mime='text/csv'
-                                    )
-                                
-                                # Clean up temporary file
-                                try:
-                                    os.remove(csv_path)
-                                except:
-                                    pass
+                                # Provide download link for converted CSV; where supported
+                                # the CSV is only generated when the button is clicked
+                                csv_data = partial(export_csv_bytes, df)
+                                st.download_button(
+                                    label=f"Download {selected_sheet or 'data'} as CSV",
+                                    data=csv_data if DEFERRED_DOWNLOADS else csv_data(),
+                                    file_name=csv_filename,
+                                    mime='text/csv'
+                                )
 
                             with col2:
                                 st.subheader("Visualization")
@@ -273,19 +294,17 @@ with upload_tab:
                     
             else:  # CSV file
                 try:
-                    # Read CSV directly
-                    df = pd.read_csv(uploaded_file)
+                    # Read CSV directly; parsed once per distinct content
+                    content_hash = upload_hash(uploaded_file)
+                    df = cached_csv_frame(content_hash, uploaded_file.getvalue())
                     
                     # Save to database
-                    file_id = db.save_uploaded_file(
-                        df,
-                        uploaded_file.name,
-                        'csv'
-                    )
+                    upload_key = f"{uploaded_file.name}:{content_hash}"
+                    file_id = save_upload_once(df, upload_key, uploaded_file.name, 'csv')
                     st.success(f"File uploaded and saved successfully! ID: {file_id}")
                     
                     # Display data
-                    st.dataframe(df)
+                    render_data_table(FrameSource(df, upload_key), key="upload_table")
                     
                 except Exception as e:
                     st.error(f"Error processing CSV file: {str(e)}")
@@ -306,38 +325,82 @@ with upload_tab:
 with history_tab:
     st.subheader("Previously Uploaded Files")
     
-    # Get file history
-    file_history = db.get_file_history()
+    # Filters; changing any of them starts again from the first page
+    filter_col1, filter_col2, filter_col3 = st.columns([3, 1, 1])
+    with filter_col1:
+        name_filter = st.text_input("Filter by name", key="history_name_filter").strip()
+    with filter_col2:
+        type_choice = st.selectbox("Type", ["All", "csv", "xlsx"], key="history_type_filter")
+    with filter_col3:
+        page_size = st.selectbox("Per page", [10, 20, 50], index=1, key="history_page_size")
+    file_type = None if type_choice == "All" else type_choice
+    
+    history_filters = (name_filter, file_type, page_size)
+    if st.session_state.get('history_filters') != history_filters:
+        st.session_state.history_filters = history_filters
+        # Cursors of the pages visited so far; the last one is the current page
+        st.session_state.history_cursors = [None]
+    
+    # Only the current page of metadata is fetched
+    file_history, next_cursor = db.get_history_page(
+        page_size, st.session_state.history_cursors[-1], name_filter, file_type
+    )
     
     if not file_history.empty:
+        page_number = len(st.session_state.history_cursors)
+        total_files = db.count_files(name_filter, file_type)
+        st.caption(f"Page {page_number} of {max(1, -(-total_files // page_size))} ({total_files} files)")
+        
         # Display file history with actions
-        for _, row in file_history.iterrows():
-            with st.expander(f"{row['file_name']} - {row['upload_date']}"):
+        for row in file_history.itertuples(index=False):
+            with st.expander(f"{row.file_name} - {row.upload_date}"):
                 col1, col2, col3 = st.columns([3, 1, 1])
                 
                 with col1:
-                    st.text(f"Type: {row['file_type']}")
+                    st.text(f"Type: {row.file_type}")
                 
                 with col2:
-                    if st.button("Load", key=f"load_{row['id']}"):
-                        # Load file data
-                        df = db.get_file_data(row['id'])
-                        if df is not None:
-                            st.session_state.current_data = df
-                            st.success("File loaded successfully!")
-                            st.dataframe(df)
-                        else:
-                            st.error("Error loading file data")
+                    if st.button("Load", key=f"load_{row.id}"):
+                        # Rows are fetched a page at a time by the table below
+                        st.session_state.current_file_id = row.id
                 
                 with col3:
-                    if st.button("Delete", key=f"delete_{row['id']}"):
-                        if db.delete_file(row['id']):
+                    if st.button("Delete", key=f"delete_{row.id}"):
+                        if db.delete_file(row.id):
+                            if st.session_state.get('current_file_id') == row.id:
+                                st.session_state.current_file_id = None
                             st.success("File deleted successfully!")
                             st.rerun()
                         else:
                             st.error("Error deleting file")
+        
+        prev_col, _, next_col = st.columns([1, 3, 1])
+        with prev_col:
+            if st.button("← Newer", key="history_prev", disabled=page_number == 1):
+                st.session_state.history_cursors.pop()
+                st.rerun()
+        with next_col:
+            if st.button("Older →", key="history_next", disabled=next_cursor is None):
+                st.session_state.history_cursors.append(next_cursor)
+                st.rerun()
+    elif len(st.session_state.history_cursors) > 1:
+        # The page emptied out, e.g. after deleting its last file
+        st.session_state.history_cursors.pop()
+        st.rerun()
+    elif name_filter or file_type:
+        st.info("No files match the current filters.")
     else:
         st.info("No files have been uploaded yet.")
+    
+    # Loaded file, kept across reruns so the table can be paged and sorted
+    current_file_id = st.session_state.get('current_file_id')
+    if current_file_id is not None:
+        st.markdown("---")
+        st.subheader("Loaded File")
+        try:
+            render_data_table(StoredFileSource(db, current_file_id), key="history_table")
+        except Exception as e:
+            st.error(f"Error loading file data: {str(e)}")
 
 # Status/feedback area
 st.markdown("---")
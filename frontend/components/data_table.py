@@ -0,0 +1,211 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import math
+import operator
+import re
+from typing import List, Optional, Sequence
+from utils.storage import ROW_GROUP_SIZE
+
+PAGE_SIZES = [50, 100, 500, 1000]
+
+# Ranges at most this many times the page size are read as one block
+_CONTIGUOUS_READ_FACTOR = 20
+
+_COMPARISON = re.compile(r'^\s*(>=|<=|!=|>|<|=)\s*(-?[\d,]*\.?\d+)\s*$')
+_OPERATORS = {
+    '>=': operator.ge, '<=': operator.le, '!=': operator.ne,
+    '>': operator.gt, '<': operator.lt, '=': operator.eq
+}
+
+class FrameSource:
+    """Table source over a DataFrame held on the server"""
+
+    def __init__(self, df: pd.DataFrame, source_key: str):
+        self.df = df
+        self.key = source_key
+        self.row_count = len(df)
+        self.columns = [str(col) for col in df.columns]
+
+    def read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        return self.df.iloc[start:stop]
+
+    def read_columns(self, columns: List[str]) -> pd.DataFrame:
+        return self.df[columns]
+
+    def read_positions(self, positions: np.ndarray) -> pd.DataFrame:
+        return self.df.iloc[positions]
+
+class StoredFileSource:
+    """
+    Table source over a saved dataset
+
+    Unsorted pages are read as row ranges and sorting or filtering only reads
+    the columns involved, so a large file never has to be loaded to show a page.
+    """
+
+    def __init__(self, db, file_id: str):
+        self.db = db
+        self.file_id = file_id
+        self.key = f"file:{file_id}"
+        info = db.get_file_info(file_id)
+        if info is None:
+            raise ValueError(f"File {file_id} not found")
+        self.row_count = info['row_count']
+        self.columns = info['columns']
+
+    def read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        return self.db.get_file_data(self.file_id, rows=(start, stop))
+
+    def read_columns(self, columns: List[str]) -> pd.DataFrame:
+        return self.db.get_file_data(self.file_id, columns=columns)
+
+    def read_positions(self, positions: np.ndarray) -> pd.DataFrame:
+        if len(positions) == 0:
+            return self.read_rows(0, 0)
+        low, high = int(positions.min()), int(positions.max()) + 1
+        if high - low <= _CONTIGUOUS_READ_FACTOR * len(positions):
+            # Nearby rows (e.g. a sort that follows file order): read just that block
+            return self.read_rows(low, high).iloc[positions - low]
+
+        # Scattered rows: read only the row groups that hold them, merging adjacent groups
+        order = np.argsort(positions, kind='stable')
+        ordered = positions[order]
+        groups = np.unique(ordered // ROW_GROUP_SIZE)
+        breaks = np.flatnonzero(np.diff(groups) > 1) + 1
+        parts = []
+        for run in np.split(groups, breaks):
+            start = int(run[0]) * ROW_GROUP_SIZE
+            stop = min((int(run[-1]) + 1) * ROW_GROUP_SIZE, self.row_count)
+            wanted = ordered[(ordered >= start) & (ordered < stop)]
+            parts.append(self.read_rows(start, stop).iloc[wanted - start])
+        # Back to the requested (sorted/filtered) order
+        return pd.concat(parts).iloc[np.argsort(order)]
+
+def filter_mask(values: pd.Series, expression: str) -> np.ndarray:
+    """
+    Rows of a column matching a filter expression
+
+    Numeric columns accept comparisons such as '>= 1000' or '=0'; anything
+    else is a case-insensitive substring match.
+    """
+    match = _COMPARISON.match(expression)
+    if match and pd.api.types.is_numeric_dtype(values):
+        threshold = float(match.group(2).replace(',', ''))
+        return _OPERATORS[match.group(1)](values, threshold).fillna(False).to_numpy()
+    return values.astype(str).str.contains(expression, case=False, regex=False, na=False).to_numpy()
+
+def sign_styles(window: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """
+    CSS for a page of rows: numbers in columns red below zero, green above
+
+    Computed a column at a time, for use with Styler.apply(axis=None).
+    """
+    styles = pd.DataFrame('', index=window.index, columns=window.columns)
+    for col in columns:
+        if col in window.columns and pd.api.types.is_numeric_dtype(window[col]):
+            values = window[col].to_numpy(dtype=float, na_value=np.nan)
+            styles[col] = np.select([values < 0, values > 0], ['color: red', 'color: green'], 'color: white')
+    return styles
+
+def style_page(window: pd.DataFrame, signed_columns: Sequence[str] = (), float_format: Optional[str] = None):
+    """Page of rows with sign colours and float formatting, or the page itself if neither applies"""
+    if not signed_columns and not float_format:
+        return window
+    styled = window.style
+    if signed_columns:
+        styled = styled.apply(sign_styles, axis=None, columns=list(signed_columns))
+    if float_format:
+        styled = styled.format({col: float_format for col in window.select_dtypes(include=['float64']).columns})
+    return styled
+
+def view_positions(source, sort_column: Optional[str], ascending: bool,
+                   filter_column: Optional[str], filter_text: str) -> Optional[np.ndarray]:
+    """
+    Row positions of the filtered and sorted view, or None for the unchanged source
+    """
+    if not sort_column and not (filter_column and filter_text):
+        return None
+    columns = list(dict.fromkeys(col for col in (sort_column, filter_column) if col))
+    frame = source.read_columns(columns)
+
+    positions = np.arange(len(frame))
+    if filter_column and filter_text:
+        positions = np.flatnonzero(filter_mask(frame[filter_column], filter_text))
+    if sort_column:
+        values = frame[sort_column].iloc[positions].reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        positions = positions[order]
+    return positions
+
+def render_data_table(source, key: str, height: int = 400, default_page_size: int = 100,
+                      signed_columns: Sequence[str] = (), float_format: Optional[str] = None):
+    """
+    Render one page of a table source with server-side sort, filter and paging
+
+    Only the visible page is sent to the browser. The sorted/filtered row
+    positions are cached in the session, so moving between pages only reads
+    that page's rows. Styling is likewise applied to the visible page only.
+
+    Args:
+        source: FrameSource or StoredFileSource
+        key: Unique widget key prefix for this table
+        height: Table height in pixels
+        default_page_size: Initial rows per page
+        signed_columns: Columns whose values are coloured by sign
+        float_format: Format string for float columns, e.g. "{:,.2f}"
+    """
+    columns = source.columns
+    col1, col2, col3, col4, col5 = st.columns([2, 1, 2, 2, 1])
+    with col1:
+        sort_column = st.selectbox("Sort by", [None] + columns, key=f"{key}_sort",
+                                   format_func=lambda col: "(file order)" if col is None else col)
+    with col2:
+        ascending = st.selectbox("Order", ["Ascending", "Descending"], key=f"{key}_order") == "Ascending"
+    with col3:
+        filter_column = st.selectbox("Filter column", [None] + columns, key=f"{key}_filter_column",
+                                     format_func=lambda col: "(no filter)" if col is None else col)
+    with col4:
+        filter_text = st.text_input("Filter", key=f"{key}_filter_text",
+                                    placeholder="text, or >= 1000 for numbers").strip()
+    with col5:
+        page_size = st.selectbox("Rows", PAGE_SIZES, key=f"{key}_page_size",
+                                 index=PAGE_SIZES.index(default_page_size) if default_page_size in PAGE_SIZES else 1)
+
+    # Recompute the view only when the source or the sort/filter changes
+    signature = (source.key, sort_column, ascending, filter_column, filter_text if filter_column else '')
+    view_key = f"{key}_view"
+    cached = st.session_state.get(view_key)
+    if cached is None or cached['signature'] != signature:
+        try:
+            positions = view_positions(source, sort_column, ascending, filter_column, filter_text)
+        except Exception as e:
+            st.warning(f"Could not apply sort/filter: {str(e)}")
+            positions = None
+        cached = {'signature': signature, 'positions': positions}
+        st.session_state[view_key] = cached
+        st.session_state[f"{key}_page"] = 1
+    positions = cached['positions']
+
+    total = source.row_count if positions is None else len(positions)
+    pages = max(1, math.ceil(total / page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+    if positions is None:
+        window = source.read_rows(start, stop)
+        window.index = pd.RangeIndex(start, stop)
+    else:
+        window = source.read_positions(positions[start:stop])
+        # Keep the original row numbers visible in sorted/filtered views
+        window.index = positions[start:stop]
+
+    st.dataframe(style_page(window, signed_columns, float_format), height=height, use_container_width=True)
+    caption = f"Rows {start + 1 if total else 0:,}–{stop:,} of {total:,}"
+    if total != source.row_count:
+        caption += f" (filtered from {source.row_count:,})"
+    st.caption(caption)
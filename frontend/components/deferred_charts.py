@@ -0,0 +1,75 @@
+import streamlit as st
+import plotly.graph_objects as go
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Hashable, Tuple
+import logging
+from utils.analysis_cache import AnalysisCache
+
+logger = logging.getLogger(__name__)
+
+# Figures built at the same time while a view renders
+CHART_WORKERS = 4
+
+class DeferredCharts:
+    """
+    Charts that are laid out immediately and built in the background
+
+    Each add() reserves the chart's place on the page with a placeholder and
+    starts building the figure on a worker thread, so the rest of the view
+    renders without waiting for it. Leaving the with block fills the
+    placeholders as their figures finish. Figures are memoized in the
+    session's AnalysisCache, so revisiting a view shows them straight away.
+
+    Example:
+        with DeferredCharts(cache) as charts:
+            for col in amount_cols:
+                st.subheader(col)
+                charts.add(f"trend:{col}", key, lambda col=col: build(col))
+    """
+
+    def __init__(self, cache: AnalysisCache, max_workers: int = CHART_WORKERS):
+        self.cache = cache
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending: Dict[Future, Tuple] = {}
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self
+
+    def add(self, stage: str, key: Hashable, build: Callable[[], go.Figure]):
+        """
+        Place a chart here, built by build unless it is already cached
+
+        Args:
+            stage: Cache stage name of this chart, unique within the page
+            key: Everything the figure depends on
+            build: Creates the figure; runs on a worker thread and must not
+                call Streamlit
+        """
+        placeholder = st.empty()
+        figure = self.cache.get(stage, key)
+        if figure is not None:
+            placeholder.plotly_chart(figure, use_container_width=True)
+            return
+        placeholder.info("Building chart...")
+        self._pending[self._executor.submit(build)] = (placeholder, stage, key)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                # Show each figure as soon as it is ready, whatever its position
+                for future in as_completed(self._pending):
+                    placeholder, stage, key = self._pending[future]
+                    try:
+                        figure = future.result()
+                    except Exception as e:
+                        logger.error(f"Error building chart '{stage}': {str(e)}")
+                        placeholder.warning(f"Could not build chart: {str(e)}")
+                        continue
+                    self.cache.put(stage, key, figure)
+                    placeholder.plotly_chart(figure, use_container_width=True)
+        finally:
+            self._executor.shutdown(wait=exc_type is None, cancel_futures=True)
+            self._pending.clear()
+        return False
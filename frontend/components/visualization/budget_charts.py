@@ -1,9 +1,11 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
+from components.data_table import FrameSource, render_data_table
+from components.visualization.downsampling import DEFAULT_MAX_POINTS, downsample_frame
 
 class BudgetVisualization:
     """
@@ -63,8 +65,15 @@ class BudgetVisualization:
                                     date_column: str,
                                     budget_column: str,
                                     actual_column: str,
-                                    title: str = "Budget vs. Actual Trend") -> go.Figure:
-        """Create a line chart comparing budget to actual over time"""
+                                    title: str = "Budget vs. Actual Trend",
+                                    max_points: Optional[int] = DEFAULT_MAX_POINTS,
+                                    window: Optional[Tuple] = None) -> go.Figure:
+        """
+        Create a line chart comparing budget to actual over time
+
+        Series longer than max_points are downsampled after the cumulative
+        totals are computed; window is an x range drawn at full resolution.
+        """
         
         # Sort data by date
         data = data.sort_values(date_column)
@@ -81,6 +90,15 @@ class BudgetVisualization:
         agg_data['variance'] = agg_data[actual_column] - agg_data[budget_column]
         agg_data['cumulative_variance'] = agg_data['cumulative_actual'] - agg_data['cumulative_budget']
         
+        # Cap the points sent to the browser
+        agg_data = downsample_frame(
+            agg_data,
+            date_column,
+            [budget_column, actual_column, 'variance', 'cumulative_budget', 'cumulative_actual'],
+            max_points,
+            window
+        )
+        
         fig = go.Figure()
         
         # Add monthly bars for variance
@@ -156,7 +174,8 @@ class BudgetVisualization:
                     ])
                 ),
                 rangeslider=dict(visible=True),
-                type="date"
+                type="date",
+                range=list(window) if window else None
             )
         )
         
@@ -237,25 +256,16 @@ class BudgetVisualization:
                 delta_color="inverse"
             )
             
-        # Variance table
+        # Variance table, paged and sorted on the server
         if not significant_variances.empty:
-            # Format variance data with custom styling
-            def style_negative_values(val):
-                """Style negative values in red, positive in green"""
-                if isinstance(val, (int, float)):
-                    color = 'red' if val < 0 else 'green' if val > 0 else 'white'
-                    return f'color: {color}'
-                return ''
-
-            # Apply styling to variance column
-            styled_variances = significant_variances.style.applymap(
-                style_negative_values,
-                subset=[variance_column]
-            ).format({
-                col: "{:,.2f}" for col in significant_variances.select_dtypes(include=['float64']).columns
-            })
-            
-            st.dataframe(styled_variances, height=400)
+            # Key the table by its contents so a new threshold or upload resets the view
+            content_hash = int(pd.util.hash_pandas_object(significant_variances).sum())
+            render_data_table(
+                FrameSource(significant_variances, f"variances:{variance_column}:{content_hash}"),
+                key=f"variance_table_{variance_column}",
+                signed_columns=[variance_column],
+                float_format="{:,.2f}"
+            )
         else:
             st.info("No significant variances found.")
             
@@ -0,0 +1,160 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+from typing import List, Optional, Tuple
+
+# Width charts are assumed to render at; the server never learns the real one
+CHART_WIDTH_PX = int(os.getenv('CHART_WIDTH_PX', 1200))
+
+# Points per pixel column: enough for a min and a max in each
+POINTS_PER_PIXEL = 2
+
+def max_points_for_width(width_px: int = CHART_WIDTH_PX) -> int:
+    """Points a trace can show at width_px without visible loss"""
+    return width_px * POINTS_PER_PIXEL
+
+DEFAULT_MAX_POINTS = max_points_for_width()
+
+# Share of the point budget spent on the series outside a zoom window
+_CONTEXT_SHARE = 4
+
+def _numeric(values: pd.Series) -> np.ndarray:
+    """Values as floats for area/extreme calculations: datetimes as ns, others by position"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=float)
+    if pd.api.types.is_numeric_dtype(values):
+        return np.nan_to_num(values.to_numpy(dtype=float, na_value=np.nan))
+    return np.arange(len(values), dtype=float)
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions kept by Largest-Triangle-Three-Buckets
+
+    Keeps the first and last points and, from each of n_out - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. x must be sorted.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_stop = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions of the minimum and maximum of each of n_out / 2 - 1 equal buckets
+
+    Keeps every peak and trough, which suits bars and filled areas better
+    than LTTB. With the first and last points, at most n_out positions are
+    returned.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_out // 2).astype(int)
+    selected = [0, n - 1]
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop > start:
+            selected.append(start + int(np.argmin(y[start:stop])))
+            selected.append(start + int(np.argmax(y[start:stop])))
+    return np.unique(selected)
+
+def _select(x: np.ndarray, ys: List[np.ndarray], max_points: int, method: str) -> np.ndarray:
+    """Union of the positions kept for each y series, sharing max_points between them"""
+    per_series = max(max_points // max(len(ys), 1), 4)
+    if method == 'minmax':
+        picks = [minmax_indices(y, per_series) for y in ys]
+    elif method == 'lttb':
+        picks = [lttb_indices(x, y, per_series) for y in ys]
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return np.unique(np.concatenate(picks)) if picks else np.arange(len(x))
+
+def downsample_frame(data: pd.DataFrame,
+                     x_column: str,
+                     y_columns: List[str],
+                     max_points: Optional[int] = DEFAULT_MAX_POINTS,
+                     window: Optional[Tuple] = None,
+                     method: str = 'lttb') -> pd.DataFrame:
+    """
+    Rows of data to plot, capped at about max_points
+
+    Every y column keeps its own shape: the rows kept are the union of the
+    rows selected for each column, so traces drawn from the result share
+    their x values. Series that already fit are returned unchanged.
+
+    Args:
+        data: Series to plot, one row per x value
+        x_column: Column plotted on the x axis
+        y_columns: Columns plotted as traces
+        max_points: Point budget; None disables downsampling
+        window: Optional (start, end) x range shown in more detail: it gets
+            the whole max_points budget, so it is only drawn in full when it
+            fits. Rows outside it are kept as coarse context for the
+            rangeslider, with a quarter of the budget.
+        method: 'lttb' for lines, 'minmax' for bars and filled areas
+    """
+    if max_points is None or len(data) <= max_points:
+        return data
+    if not data[x_column].is_monotonic_increasing:
+        data = data.sort_values(x_column, kind='stable')
+
+    def select(part: pd.DataFrame, budget: int) -> np.ndarray:
+        if len(part) <= budget:
+            return np.arange(len(part))
+        x = _numeric(part[x_column])
+        return _select(x, [_numeric(part[col]) for col in y_columns], budget, method)
+
+    if window is None:
+        return data.iloc[select(data, max_points)]
+
+    inside = data[x_column].between(*window).to_numpy()
+    detail = data[inside]
+    context = data[~inside]
+    kept = [
+        detail.iloc[select(detail, max_points)],
+        context.iloc[select(context, max_points // _CONTEXT_SHARE)]
+    ]
+    return pd.concat(kept).sort_values(x_column, kind='stable')
+
+def select_zoom_window(label: str,
+                       x: pd.Series,
+                       key: str,
+                       max_points: Optional[int] = DEFAULT_MAX_POINTS) -> Optional[Tuple]:
+    """
+    Range slider choosing the x range charts show in more detail
+
+    Plotly zooms in the browser and Streamlit is not told about it, so
+    zooming past the downsampled detail is chosen here instead. Nothing is
+    rendered when the series already fits the point budget.
+
+    Returns:
+        (start, end) when narrower than the full range, else None
+    """
+    x = x.dropna()
+    if max_points is None or x.nunique() <= max_points:
+        return None
+    low, high = x.min(), x.max()
+    if isinstance(low, pd.Timestamp):
+        low, high = low.to_pydatetime(), high.to_pydatetime()
+    start, end = st.slider(label, min_value=low, max_value=high, value=(low, high), key=key,
+                           help="Charts are simplified to fit the screen; this range is drawn in more detail")
+    if (start, end) == (low, high):
+        return None
+    return start, end
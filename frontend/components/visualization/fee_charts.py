@@ -1,9 +1,10 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
+from components.visualization.downsampling import DEFAULT_MAX_POINTS, downsample_frame
 
 class FeeVisualization:
     """
@@ -107,8 +108,24 @@ class FeeVisualization:
                              date_column: str,
                              base_fee_column: str,
                              incentive_fee_column: str,
-                             title: str = "Fee Composition Trend") -> go.Figure:
-        """Create a stacked area chart showing fee composition over time"""
+                             title: str = "Fee Composition Trend",
+                             max_points: Optional[int] = DEFAULT_MAX_POINTS,
+                             window: Optional[Tuple] = None) -> go.Figure:
+        """
+        Create a stacked area chart showing fee composition over time
+
+        Long series keep each bucket's extremes so the areas keep their
+        peaks; window is an x range drawn at full resolution.
+        """
+        
+        data = downsample_frame(
+            data,
+            date_column,
+            [base_fee_column, incentive_fee_column],
+            max_points,
+            window,
+            method='minmax'
+        )
         
         fig = go.Figure()
         
@@ -141,6 +158,8 @@ class FeeVisualization:
             height=400,
             hovermode="x unified"
         )
+        if window:
+            fig.update_xaxes(range=list(window))
         
         return fig
         
@@ -1,9 +1,10 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
+from components.visualization.downsampling import DEFAULT_MAX_POINTS, downsample_frame, select_zoom_window
 
 class NOIVisualization:
     """
@@ -24,13 +25,21 @@ class NOIVisualization:
                            date_column: str,
                            noi_column: str,
                            property_column: str,
-                           title: str = "Monthly NOI Trends") -> go.Figure:
-        """Create a line chart showing monthly NOI trends by property"""
+                           title: str = "Monthly NOI Trends",
+                           max_points: Optional[int] = DEFAULT_MAX_POINTS,
+                           window: Optional[Tuple] = None) -> go.Figure:
+        """
+        Create a line chart showing monthly NOI trends by property
+
+        Each property's series is capped at max_points; window is an x range
+        drawn at full resolution.
+        """
         
         fig = go.Figure()
         
         for property_name in data[property_column].unique():
             property_data = data[data[property_column] == property_name]
+            property_data = downsample_frame(property_data, date_column, [noi_column], max_points, window)
             
             fig.add_trace(go.Scatter(
                 x=property_data[date_column],
@@ -51,6 +60,8 @@ class NOIVisualization:
             hovermode="x unified",
             height=400
         )
+        if window:
+            fig.update_xaxes(range=list(window))
         
         return fig
         
@@ -204,12 +215,14 @@ class NOIVisualization:
                 )
                 
         # Add comparison charts
+        window = select_zoom_window("Detail range", data[date_column], key="noi_trend_window")
         st.plotly_chart(
             self.create_monthly_trend(
                 data,
                 date_column,
                 noi_column,
-                property_column
+                property_column,
+                window=window
             ),
             use_container_width=True
         )
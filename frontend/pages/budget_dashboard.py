@@ -1,60 +1,106 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from functools import partial
+from components.data_table import FrameSource, render_data_table
+from components.deferred_charts import DeferredCharts
 from components.visualization.budget_charts import BudgetVisualization
+from components.visualization.downsampling import select_zoom_window
+from utils.analysis_cache import get_analysis_cache
+from utils.parse_cache import upload_hash
+from utils.sheet_partitions import read_sheet_partition
+from utils.workbook import open_workbook
+
+ANALYSIS_VIEWS = ["Overview", "Variance Analysis", "Trend Analysis", "YTD Performance"]
 
 def process_excel_file(file, file_type: str = "budget"):
     """Process Excel file with multiple sheets"""
-    # Read all sheets
-    xl = pd.ExcelFile(file)
-    
-    # Initialize empty list to store processed data
-    processed_data = []
-    
-    # Process each sheet
-    for sheet_name in xl.sheet_names:
-        try:
-            # Skip sheets that don't look like monthly data
-            if sheet_name.lower() in ['instructions', 'reference', 'template']:
-                continue
-                
-            # Read the sheet
-            df = pd.read_excel(file, sheet_name=sheet_name)
-            
-            # Try to extract date from sheet name or look for date column
+    # Open the workbook once; every sheet read below reuses this handle
+    with open_workbook(file) as workbook:
+        # Initialize empty list to store processed data
+        processed_data = []
+        reused_sheets = 0
+        
+        # Process each sheet
+        for sheet_name in workbook.sheet_names:
             try:
-                # First try to parse sheet name as date
-                sheet_date = pd.to_datetime(sheet_name)
-            except:
-                # If sheet name isn't a date, look for a date column
-                date_cols = df.columns[df.columns.str.contains('date|month|period', case=False)]
-                if len(date_cols) > 0:
-                    sheet_date = pd.to_datetime(df[date_cols[0]].iloc[0])
-                else:
-                    st.warning(f"Could not determine date for sheet: {sheet_name}. Skipping.")
+                # Skip sheets that don't look like monthly data
+                if sheet_name.lower() in ['instructions', 'reference', 'template']:
                     continue
-            
-            # Add period column if it doesn't exist
-            if 'period' not in df.columns:
-                df['period'] = sheet_date
-            
-            # Add sheet name for reference
-            df['sheet_name'] = sheet_name
-            df['data_type'] = file_type
-            
-            processed_data.append(df)
-            
-        except Exception as e:
-            st.warning(f"Error processing sheet {sheet_name}: {str(e)}")
-            continue
-    
-    if not processed_data:
-        st.error("No valid data sheets found in the file.")
-        return None
-    
-    # Combine all sheets
-    combined_data = pd.concat(processed_data, ignore_index=True)
-    return combined_data
+                
+                # Skip empty sheets using their dimensions, without reading them
+                if workbook.sheet_info(sheet_name)['rows'] == 0:
+                    continue
+                    
+                # Read the sheet; unchanged sheets come from the partition cache
+                df, reused = read_sheet_partition(workbook, sheet_name)
+                reused_sheets += reused
+                
+                # Try to extract date from sheet name or look for date column
+                try:
+                    # First try to parse sheet name as date
+                    sheet_date = pd.to_datetime(sheet_name)
+                except:
+                    # If sheet name isn't a date, look for a date column
+                    date_cols = df.columns[df.columns.str.contains('date|month|period', case=False)]
+                    if len(date_cols) > 0:
+                        sheet_date = pd.to_datetime(df[date_cols[0]].iloc[0])
+                    else:
+                        st.warning(f"Could not determine date for sheet: {sheet_name}. Skipping.")
+                        continue
+                
+                # Add period column if it doesn't exist
+                if 'period' not in df.columns:
+                    df['period'] = sheet_date
+                
+                # Add sheet name for reference
+                df['sheet_name'] = sheet_name
+                df['data_type'] = file_type
+                
+                processed_data.append(df)
+                
+            except Exception as e:
+                st.warning(f"Error processing sheet {sheet_name}: {str(e)}")
+                continue
+        
+        if reused_sheets:
+            st.caption(f"{file_type.title()} workbook: {reused_sheets} unchanged sheet(s) reused, "
+                       f"{len(workbook.sheet_names) - reused_sheets} parsed")
+        
+        if not processed_data:
+            st.error("No valid data sheets found in the file.")
+            return None
+        
+        # Combine all sheets
+        combined_data = pd.concat(processed_data, ignore_index=True)
+        return combined_data
+
+def merge_budget_actual(budget_data: pd.DataFrame, actual_data: pd.DataFrame,
+                        date_col: str, category_col: str) -> pd.DataFrame:
+    """Budget and actual rows side by side per period and category"""
+    # Ensure date format consistency, without modifying the cached frames
+    budget_data = budget_data.assign(**{date_col: pd.to_datetime(budget_data[date_col])})
+    actual_data = actual_data.assign(**{date_col: pd.to_datetime(actual_data[date_col])})
+    return pd.merge(
+        budget_data,
+        actual_data,
+        on=[date_col, category_col],
+        suffixes=('_budget', '_actual')
+    )
+
+def add_variance_columns(merged_data: pd.DataFrame, amount_cols) -> pd.DataFrame:
+    """Merged data with an actual minus budget <col>_variance column per amount column"""
+    return merged_data.assign(**{
+        f"{col}_variance": merged_data[f"{col}_actual"] - merged_data[f"{col}_budget"]
+        for col in amount_cols
+    })
+
+def ytd_by_category(merged_data: pd.DataFrame, category_col: str) -> pd.DataFrame:
+    """Year-to-date budget, actual and variance totals per category"""
+    return merged_data.groupby(category_col).agg({
+        col: 'sum' for col in merged_data.columns
+        if col.endswith(('_budget', '_actual', '_variance'))
+    }).reset_index()
 
 def render_budget_dashboard():
     st.title("Budget Analysis Dashboard")
@@ -104,11 +150,21 @@ def render_budget_dashboard():
             
     if budget_file is not None and actual_file is not None:
         try:
+            # Each stage of the analysis is cached for the session, keyed by the
+            # workbook hashes and the settings it depends on
+            cache = get_analysis_cache("budget_analysis")
+            budget_hash = upload_hash(budget_file)
+            actual_hash = upload_hash(actual_file)
+            
             # Process both files
             with st.spinner("Processing budget data..."):
-                budget_data = process_excel_file(budget_file, "budget")
+                budget_data = cache.get_or_compute(
+                    "budget_data", budget_hash, lambda: process_excel_file(budget_file, "budget")
+                )
             with st.spinner("Processing actual data..."):
-                actual_data = process_excel_file(actual_file, "actual")
+                actual_data = cache.get_or_compute(
+                    "actual_data", actual_hash, lambda: process_excel_file(actual_file, "actual")
+                )
             
             if budget_data is None or actual_data is None:
                 st.error("Please ensure both files contain valid monthly data sheets.")
@@ -154,61 +210,71 @@ def render_budget_dashboard():
                     key="amount_columns"
                 )
                 
+            # Once requested, the analysis stays up across reruns (threshold,
+            # column changes) until different workbooks are uploaded
+            workbooks_key = (budget_hash, actual_hash)
             if st.button("Generate Analysis"):
-                # Ensure date format consistency
-                budget_data[date_col] = pd.to_datetime(budget_data[date_col])
-                actual_data[date_col] = pd.to_datetime(actual_data[date_col])
+                st.session_state.budget_analysis_requested = workbooks_key
                 
-                # Calculate variances
-                merged_data = pd.merge(
-                    budget_data,
-                    actual_data,
-                    on=[date_col, category_col],
-                    suffixes=('_budget', '_actual')
+            if st.session_state.get("budget_analysis_requested") == workbooks_key:
+                merge_key = (budget_hash, actual_hash, date_col, category_col)
+                variance_key = merge_key + (tuple(amount_cols),)
+                merged_data = cache.get_or_compute(
+                    "merged",
+                    merge_key,
+                    lambda: merge_budget_actual(budget_data, actual_data, date_col, category_col)
+                )
+                merged_data = cache.get_or_compute(
+                    "variances", variance_key, lambda: add_variance_columns(merged_data, amount_cols)
                 )
                 
-                # Create tabs for different views
-                tab1, tab2, tab3, tab4 = st.tabs([
-                    "Overview",
-                    "Variance Analysis",
-                    "Trend Analysis",
-                    "YTD Performance"
-                ])
+                # Only the selected view is computed and rendered; its charts
+                # are built in the background and memoized for the session
+                view = st.radio(
+                    "View",
+                    ANALYSIS_VIEWS,
+                    horizontal=True,
+                    key="budget_analysis_view",
+                    label_visibility="collapsed"
+                )
                 
-                with tab1:
+                if view == "Overview":
                     st.subheader("Budget vs. Actual Overview")
                     
-                    # Summary metrics
-                    for col in amount_cols:
-                        budget_col = f"{col}_budget"
-                        actual_col = f"{col}_actual"
-                        variance_col = f"{col}_variance"
-                        
-                        merged_data[variance_col] = (
-                            merged_data[actual_col] - merged_data[budget_col]
-                        )
-                        
-                        # Render YTD summary
-                        viz.render_ytd_summary(
-                            merged_data,
-                            budget_col,
-                            actual_col,
-                            variance_col
-                        )
-                        
-                        # Render trend chart
-                        st.plotly_chart(
-                            viz.create_budget_vs_actual_chart(
+                    # Long series are downsampled; this range is drawn in full
+                    window = select_zoom_window("Detail range", merged_data[date_col], key="budget_trend_window")
+                    
+                    with DeferredCharts(cache) as charts:
+                        # Summary metrics
+                        for col in amount_cols:
+                            budget_col = f"{col}_budget"
+                            actual_col = f"{col}_actual"
+                            variance_col = f"{col}_variance"
+                            
+                            # Render YTD summary
+                            viz.render_ytd_summary(
                                 merged_data,
-                                date_col,
                                 budget_col,
                                 actual_col,
-                                title=f"{col} - Budget vs. Actual Trend"
-                            ),
-                            use_container_width=True
-                        )
+                                variance_col
+                            )
+                            
+                            # Render trend chart
+                            charts.add(
+                                f"trend:{col}",
+                                merge_key + (col, window),
+                                partial(
+                                    viz.create_budget_vs_actual_chart,
+                                    merged_data,
+                                    date_col,
+                                    budget_col,
+                                    actual_col,
+                                    title=f"{col} - Budget vs. Actual Trend",
+                                    window=window
+                                )
+                            )
                         
-                with tab2:
+                elif view == "Variance Analysis":
                     st.subheader("Variance Analysis")
                     
                     # Variance threshold control
@@ -220,74 +286,68 @@ def render_budget_dashboard():
                         step=0.5
                     )
                     
-                    for col in amount_cols:
-                        variance_col = f"{col}_variance"
-                        
-                        # Render variance summary
-                        viz.render_variance_summary(
-                            merged_data,
-                            variance_col,
-                            threshold
-                        )
-                        
-                        # Render waterfall chart
-                        st.plotly_chart(
-                            viz.create_variance_waterfall(
+                    with DeferredCharts(cache) as charts:
+                        for col in amount_cols:
+                            variance_col = f"{col}_variance"
+                            
+                            # Render variance summary
+                            viz.render_variance_summary(
                                 merged_data,
-                                category_col,
-                                f"{col}_budget",
-                                f"{col}_actual",
-                                title=f"{col} - Variance Breakdown"
-                            ),
-                            use_container_width=True
-                        )
+                                variance_col,
+                                threshold
+                            )
+                            
+                            # Render waterfall chart
+                            charts.add(
+                                f"waterfall:{col}",
+                                merge_key + (col,),
+                                partial(
+                                    viz.create_variance_waterfall,
+                                    merged_data,
+                                    category_col,
+                                    f"{col}_budget",
+                                    f"{col}_actual",
+                                    title=f"{col} - Variance Breakdown"
+                                )
+                            )
                         
-                with tab3:
+                elif view == "Trend Analysis":
                     st.subheader("Trend Analysis")
                     
-                    for col in amount_cols:
-                        variance_col = f"{col}_variance"
-                        
-                        # Render heatmap
-                        st.plotly_chart(
-                            viz.create_variance_heatmap(
-                                merged_data,
-                                category_col,
-                                date_col,
-                                variance_col,
-                                title=f"{col} - Variance Heatmap"
-                            ),
-                            use_container_width=True
-                        )
+                    with DeferredCharts(cache) as charts:
+                        for col in amount_cols:
+                            variance_col = f"{col}_variance"
+                            
+                            # Render heatmap
+                            charts.add(
+                                f"heatmap:{col}",
+                                merge_key + (col,),
+                                partial(
+                                    viz.create_variance_heatmap,
+                                    merged_data,
+                                    category_col,
+                                    date_col,
+                                    variance_col,
+                                    title=f"{col} - Variance Heatmap"
+                                )
+                            )
                         
-                with tab4:
+                else:
                     st.subheader("YTD Performance")
                     
                     # Group by category
-                    ytd_data = merged_data.groupby(category_col).agg({
-                        col: 'sum' for col in merged_data.columns
-                        if col.endswith(('_budget', '_actual', '_variance'))
-                    }).reset_index()
+                    ytd_data = cache.get_or_compute(
+                        "ytd", variance_key, lambda: ytd_by_category(merged_data, category_col)
+                    )
                     
-                    # Format YTD data with custom styling
-                    def style_negative_values(val):
-                        """Style negative values in red, positive in green"""
-                        if isinstance(val, (int, float)):
-                            color = 'red' if val < 0 else 'green' if val > 0 else 'white'
-                            return f'color: {color}'
-                        return ''
-
-                    # Apply styling to variance columns
+                    # Display YTD data, styling only the visible page
                     variance_cols = [col for col in ytd_data.columns if col.endswith('_variance')]
-                    styled_ytd = ytd_data.style.applymap(
-                        style_negative_values,
-                        subset=variance_cols
-                    ).format({
-                        col: "{:,.2f}" for col in ytd_data.select_dtypes(include=['float64']).columns
-                    })
-                    
-                    # Display YTD data
-                    st.dataframe(styled_ytd, height=400)
+                    render_data_table(
+                        FrameSource(ytd_data, f"ytd:{variance_key}"),
+                        key="ytd_table",
+                        signed_columns=variance_cols,
+                        float_format="{:,.2f}"
+                    )
                     
         except Exception as e:
             st.error(f"Error processing data: {str(e)}")
@@ -1,7 +1,14 @@
+import sys
+from pathlib import Path
 import streamlit as st
+import pandas as pd
 import time
 from utils.database import DatabaseManager
 
+# The shared scratch-space package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scratch_space import get_scratch_space
+
 # Set page config
 st.set_page_config(
     page_title="Database Settings - Financial Analysis System",
@@ -77,4 +84,91 @@ if st.button("Verify Credentials"):
         except Exception as e:
             st.error(f"❌ Verification error: {str(e)}")
     else:
-        st.warning("⚠️ Please enter both URL and key") 
\ No newline at end of file
+        st.warning("⚠️ Please enter both URL and key") 
+# Write-behind queue section
+st.markdown("---")
+st.header("Upload Sync Queue")
+st.write("Uploads are saved locally first and sent to Supabase in the background.")
+
+sync_status = db.get_sync_status()
+if sync_status is None:
+    st.info("Background sync is inactive. Configure Supabase to enable cloud uploads.")
+else:
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Pending", sync_status['pending'] + sync_status['syncing'])
+    col2.metric("Failed", sync_status['failed'])
+    col3.metric("Synced", sync_status['synced'])
+    col4.metric("Worker", "Running" if sync_status['worker_running'] else "Stopped")
+    
+    if sync_status['oldest_pending']:
+        st.write(f"- Oldest pending upload: {sync_status['oldest_pending']}")
+    if sync_status['last_success_at']:
+        st.write(f"- Last successful upload: {sync_status['last_success_at']}")
+    if sync_status['last_error']:
+        st.warning(f"Last sync error: {sync_status['last_error']}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Sync Now"):
+            db.write_queue.notify()
+            st.success("✅ Sync requested")
+    with col2:
+        if st.button("Retry Failed Uploads", disabled=sync_status['failed'] == 0):
+            count = db.write_queue.retry_failed()
+            st.success(f"✅ {count} upload(s) queued for retry")
+
+# Dataset cache section
+st.header("Downloaded Dataset Cache")
+st.write("Files downloaded from Supabase are kept on local disk and reused while their checksum is unchanged.")
+
+cache_stats = db.dataset_cache.stats()
+col1, col2, col3 = st.columns(3)
+col1.metric("Cached Files", cache_stats['cached_datasets'])
+col2.metric(
+    "Disk Used",
+    f"{cache_stats['cache_bytes'] / 1024 / 1024:.1f} MB",
+    help=f"Limit: {cache_stats['max_bytes'] / 1024 / 1024:.0f} MB (DATASET_CACHE_MB)"
+)
+col3.metric("Cache Hits", cache_stats['hits'])
+
+# Scratch space section
+st.header("Scratch Space")
+st.write("Conversions write intermediate files to per-job folders that are removed when the job finishes.")
+
+scratch_usage = get_scratch_space().usage()
+col1, col2, col3 = st.columns(3)
+col1.metric("Active Jobs", len(scratch_usage['jobs']))
+col2.metric(
+    "Disk Used",
+    f"{scratch_usage['total_bytes'] / 1024 / 1024:.1f} MB",
+    help=f"Quota: {scratch_usage['quota_bytes'] / 1024 / 1024:.0f} MB (SCRATCH_QUOTA_MB)"
+)
+col3.metric("Cached Intermediates", scratch_usage['cache_entries'],
+            help=f"{scratch_usage['cache_bytes'] / 1024 / 1024:.1f} MB")
+if scratch_usage['jobs']:
+    jobs = pd.DataFrame(scratch_usage['jobs'])
+    jobs['MB'] = jobs['bytes'] / 1024 / 1024
+    st.dataframe(jobs[['job', 'name', 'refs', 'files', 'MB']], use_container_width=True)
+
+# Storage growth section
+st.header("Storage Growth")
+st.write("Identical uploads are stored once; later copies only add a history record.")
+
+storage_report = db.get_storage_report()
+local_report = storage_report['local']
+if local_report is not None:
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Uploads", local_report['uploads'], help=f"{local_report['distinct_datasets']} distinct datasets")
+    col2.metric("Stored", f"{local_report['stored_bytes'] / 1024 / 1024:.1f} MB")
+    col3.metric("Saved by Deduplication", f"{local_report['saved_bytes'] / 1024 / 1024:.1f} MB")
+    
+    monthly = local_report['monthly']
+    if not monthly.empty:
+        growth = monthly.set_index('month')[['stored_bytes', 'saved_bytes']] / 1024 / 1024
+        st.bar_chart(growth.rename(columns={'stored_bytes': 'Stored (MB)', 'saved_bytes': 'Saved (MB)'}))
+if storage_report['remote'] is not None:
+    remote_report = storage_report['remote']
+    st.write(
+        f"- Supabase: {remote_report['records']} upload records sharing "
+        f"{remote_report['stored_payloads']} stored payloads"
+    )
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 from components.visualization.fee_charts import FeeVisualization
+from components.visualization.downsampling import select_zoom_window
 import numpy as np
 
 def load_fee_data():
@@ -70,12 +71,14 @@ def fee_dashboard():
     ])
     
     with tab1:
+        window = select_zoom_window("Detail range", filtered_data['Date'], key="fee_trend_window")
         st.plotly_chart(
             fee_viz.create_fee_trend_chart(
                 filtered_data,
                 'Date',
                 'Base_Fee',
-                'Incentive_Fee'
+                'Incentive_Fee',
+                window=window
             ),
             use_container_width=True
         )
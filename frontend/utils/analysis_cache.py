@@ -0,0 +1,74 @@
+import streamlit as st
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+class AnalysisCache:
+    """
+    Results of each stage of an analysis, kept for the session
+
+    Every stage holds its latest result together with the key it was
+    computed for: the hashes of its inputs and the settings it depends on.
+    A rerun whose key is unchanged reuses the result, so changing a setting
+    only recomputes the stages that depend on it. Keeping one result per
+    stage bounds the memory a session can hold.
+
+    Cached results are shared between reruns; stages must not modify them.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, tuple] = {}
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    def get(self, stage: str, key: Hashable) -> Optional[Any]:
+        """Cached result of stage for key, or None"""
+        entry = self._stages.get(stage)
+        if entry is not None and entry[0] == key:
+            self.hits[stage] += 1
+            return entry[1]
+        self.misses[stage] += 1
+        return None
+
+    def put(self, stage: str, key: Hashable, value: Any):
+        """Store value as the result of stage for key"""
+        self._stages[stage] = (key, value)
+
+    def get_or_compute(self, stage: str, key: Hashable, compute: Callable[[], T]) -> T:
+        """
+        Result of stage for key, computing and storing it if it isn't cached
+
+        Args:
+            stage: Stage name, e.g. 'merged'
+            key: Everything the stage's result depends on
+            compute: Builds the result on a miss
+        """
+        entry = self._stages.get(stage)
+        if entry is not None and entry[0] == key:
+            self.hits[stage] += 1
+            return entry[1]
+        self.misses[stage] += 1
+        logger.info(f"Computing analysis stage '{stage}'")
+        value = compute()
+        self.put(stage, key, value)
+        return value
+
+    def clear(self):
+        self._stages.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            stage: {'hits': self.hits[stage], 'misses': self.misses[stage]}
+            for stage in sorted(set(self.hits) | set(self.misses))
+        }
+
+def get_analysis_cache(name: str) -> AnalysisCache:
+    """The current session's analysis cache called name"""
+    key = f"{name}_cache"
+    if key not in st.session_state:
+        st.session_state[key] = AnalysisCache()
+    return st.session_state[key]
@@ -0,0 +1,125 @@
+"""
+Chunked columnar encoding for dataset payloads stored in Supabase
+
+A DataFrame is split into row groups and every column of every row group is
+stored as its own compressed Arrow IPC chunk. A manifest describing the row
+groups and columns is kept on the file_uploads row, so readers can fetch just
+the chunks they need. Uploads of identical content share one set of chunks.
+
+Supabase tables used:
+    file_uploads: id, file_name, file_type, upload_date, data (legacy JSON), manifest (jsonb),
+                  checksum (text, see storage.dataset_checksum),
+                  content_id (record holding the chunks when the content was uploaded before)
+    file_chunks:  file_id, row_group, column_name, payload (base64 text)
+"""
+import pandas as pd
+import pyarrow as pa
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from utils.storage import ROW_GROUP_SIZE, dataset_checksum, make_arrow_safe
+
+MANIFEST_VERSION = 1
+_WRITE_OPTIONS = pa.ipc.IpcWriteOptions(compression='zstd')
+
+def _encode_column(table: pa.Table) -> str:
+    """Serialize a single-column table as a compressed IPC stream"""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=_WRITE_OPTIONS) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode('ascii')
+
+def _decode_column(payload: str) -> pa.Table:
+    """Inverse of _encode_column"""
+    return pa.ipc.open_stream(pa.py_buffer(base64.b64decode(payload))).read_all()
+
+def encode_payload(file_data: pd.DataFrame,
+                   rows_per_chunk: int = ROW_GROUP_SIZE) -> Tuple[Dict, List[Dict]]:
+    """
+    Split a DataFrame into per-column, per-row-group chunks
+
+    Returns:
+        (manifest, chunks) where each chunk is a dict with row_group,
+        column_name and payload keys
+    """
+    safe_data = make_arrow_safe(file_data)
+    table = pa.Table.from_pandas(safe_data, preserve_index=False)
+    row_groups = []
+    chunks = []
+
+    for group, start in enumerate(range(0, max(table.num_rows, 1), rows_per_chunk)):
+        group_table = table.slice(start, rows_per_chunk)
+        row_groups.append({'index': group, 'start': start, 'rows': group_table.num_rows})
+        for column_name in table.column_names:
+            chunks.append({
+                'row_group': group,
+                'column_name': column_name,
+                'payload': _encode_column(group_table.select([column_name]))
+            })
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'row_count': table.num_rows,
+        'checksum': dataset_checksum(safe_data),
+        'rows_per_chunk': rows_per_chunk,
+        'columns': table.column_names,
+        'row_groups': row_groups,
+        # Restores the pandas dtypes (categoricals, datetimes) on decode
+        'pandas_metadata': table.schema.metadata[b'pandas'].decode('utf-8')
+    }
+    return manifest, chunks
+
+def select_row_groups(manifest: Dict, rows: Optional[Tuple[int, int]] = None) -> List[int]:
+    """Return the row groups overlapping the half-open row range [start, stop)"""
+    if rows is None:
+        return [group['index'] for group in manifest['row_groups']]
+    start, stop = rows
+    return [
+        group['index'] for group in manifest['row_groups']
+        if group['start'] < stop and group['start'] + group['rows'] > start
+    ]
+
+def decode_payload(manifest: Dict,
+                   chunks: List[Dict],
+                   columns: Optional[List[str]] = None,
+                   rows: Optional[Tuple[int, int]] = None,
+                   max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Rebuild a DataFrame from fetched chunks
+
+    Args:
+        manifest: Manifest produced by encode_payload
+        chunks: Chunks covering the requested columns and row groups
+        columns: Columns to return, in order. Defaults to all columns.
+        rows: Optional half-open row range [start, stop)
+        max_workers: Threads used to decompress chunks in parallel
+    """
+    columns = columns or manifest['columns']
+    groups = select_row_groups(manifest, rows)
+
+    # Arrow releases the GIL while decompressing, so threads decode in parallel
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        decoded = dict(zip(
+            ((chunk['row_group'], chunk['column_name']) for chunk in chunks),
+            executor.map(_decode_column, (chunk['payload'] for chunk in chunks))
+        ))
+
+    tables = []
+    for group in groups:
+        arrays = [decoded[(group, column)].column(0) for column in columns]
+        tables.append(pa.Table.from_arrays(arrays, names=columns))
+
+    if tables:
+        table = pa.concat_tables(tables)
+    else:
+        table = pa.table({column: pa.array([], type=pa.null()) for column in columns})
+
+    if rows is not None and groups:
+        offset = manifest['row_groups'][groups[0]]['start']
+        start, stop = rows
+        table = table.slice(max(start - offset, 0), max(stop - max(start, offset), 0))
+
+    metadata = manifest.get('pandas_metadata')
+    if metadata:
+        table = table.replace_schema_metadata({b'pandas': metadata.encode('utf-8')})
+    return table.to_pandas()
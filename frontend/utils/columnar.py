@@ -0,0 +1,86 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+from utils.storage import make_arrow_safe
+from utils.verified_csv import EXPORT_CSV_ENCODING, EXPORT_CSV_FORMAT, manifest_path
+
+logger = logging.getLogger(__name__)
+
+# 'arrow' files are uncompressed so reloads map them without decoding;
+# 'parquet' files are zstd-compressed for the smallest footprint
+COLUMNAR_FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+OUTPUT_FORMATS = ['csv'] + list(COLUMNAR_FORMATS)
+
+def _unique_names(columns) -> List[str]:
+    """Column names made unique the way read_csv does ('a', 'a.1', ...)"""
+    names = []
+    seen: Dict[str, int] = {}
+    for col in map(str, columns):
+        name = col
+        while name in seen:
+            seen[col] += 1
+            name = f"{col}.{seen[col]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+def write_columnar(df: pd.DataFrame, output_path: str, output_format: str) -> Dict:
+    """
+    Write a DataFrame as an Arrow or Parquet file, keeping its dtypes
+
+    Records a manifest next to the file like write_verified_csv does.
+
+    Returns:
+        The manifest: rows, columns, bytes, sha256, format and written_at
+
+    Raises:
+        ValueError: If the format is unknown or the frame has no rows or columns
+    """
+    if output_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format: {output_format}")
+    if df.empty or len(df.columns) == 0:
+        raise ValueError("Output verification failed: DataFrame is empty")
+
+    df = make_arrow_safe(df)
+    df.columns = _unique_names(df.columns)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if output_format == 'arrow':
+        feather.write_feather(table, output_path, compression='uncompressed')
+    else:
+        pq.write_table(table, output_path, compression='zstd')
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(output_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+            size += len(block)
+    manifest = {
+        'rows': table.num_rows,
+        'columns': table.num_columns,
+        'bytes': size,
+        'sha256': digest.hexdigest(),
+        'format': output_format,
+        'written_at': datetime.now().isoformat()
+    }
+    with open(manifest_path(output_path), 'w') as f:
+        json.dump(manifest, f)
+    return manifest
+
+def read_columnar(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Memory-mapped read of a file written by write_columnar"""
+    if path.endswith(COLUMNAR_FORMATS['parquet']):
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+def export_csv_bytes(df: pd.DataFrame) -> bytes:
+    """CSV for download, in the same dialect as converted CSV files"""
+    return df.to_csv(index=False, **EXPORT_CSV_FORMAT).encode(EXPORT_CSV_ENCODING)
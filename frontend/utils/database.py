@@ -1,19 +1,48 @@
-from supabase import create_client
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 import json
+import io
 import streamlit as st
 from dotenv import load_dotenv, find_dotenv
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import time
 import logging
 
+# The shared data-access package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from data_access.sync import get_sync_client, verify_credentials
+from utils.storage import (
+    HISTORY_COLUMNS, StorageBackend, LocalStorageBackend, dataset_checksum, filter_history, make_arrow_safe,
+    page_with_cursor
+)
+from utils.chunked_payload import encode_payload, decode_payload, select_row_groups
+from utils.session_cache import SessionDataCache
+from utils.dataset_cache import DatasetFileCache
+from utils.write_behind import (
+    CHUNK_BATCH_SIZE, WriteBehindQueue, delete_remote_file, find_remote_content,
+    get_write_behind_queue, insert_chunks
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prefix for IDs of uploads that have not reached Supabase yet
+LOCAL_ID_PREFIX = 'local:'
+
+# Cursor position of a history source with no rows left
+HISTORY_SOURCE_DONE = 'done'
+
+# Seconds a history row count is reused before it is queried again
+HISTORY_COUNT_TTL = 60
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, storage: Optional[StorageBackend] = None,
+                 session_cache: Optional[SessionDataCache] = None,
+                 dataset_cache: Optional[DatasetFileCache] = None):
         # Load environment variables
         env_path = Path(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) / '.env'
         if env_path.exists():
@@ -28,12 +57,30 @@ class DatabaseManager:
         # Try to initialize connection
         if self.supabase_url and self.supabase_key:
             try:
-                self.client = create_client(self.supabase_url, self.supabase_key)
+                # Pooled client shared by every session in this process
+                self.client = get_sync_client(self.supabase_url, self.supabase_key)
                 st.success("✅ Successfully connected to Supabase!")
             except Exception as e:
                 st.error(f"⚠️ Failed to connect to Supabase: {str(e)}")
         else:
-            st.warning("⚠️ Supabase credentials not found. Using session storage only.")
+            st.warning("⚠️ Supabase credentials not found. Using local storage only.")
+
+        # Local copy of every upload, and the only store when offline
+        self.storage = storage or LocalStorageBackend()
+        
+        # Bounded in-memory copies of the datasets each session is working with
+        self.session_cache = session_cache or SessionDataCache()
+        
+        # Versioned on-disk copies of datasets downloaded from Supabase
+        self.dataset_cache = dataset_cache or DatasetFileCache()
+        
+        # Background uploads to Supabase once the local copy is saved
+        self.write_queue: Optional[WriteBehindQueue] = None
+        if self.client and isinstance(self.storage, LocalStorageBackend):
+            self.write_queue = get_write_behind_queue(self.client, self.storage, self.supabase_url)
+
+        # (name_filter, file_type) -> (queried_at, count)
+        self._history_counts = {}
 
     def test_connection(self) -> bool:
         """Test the current Supabase connection"""
@@ -50,59 +97,93 @@ class DatabaseManager:
 
     def verify_credentials(self, url: str, key: str) -> bool:
         """Verify if the provided credentials are valid"""
-        # First check format
-        if not is_valid_supabase_url(url):
-            raise ValueError("Invalid Supabase URL format")
-        if not is_valid_supabase_key(key):
-            raise ValueError("Invalid Supabase key format")
-        
-        try:
-            # Try to create a temporary client
-            temp_client = create_client(url.strip(), key.strip())
-            # Test the connection
-            result = temp_client.table('file_uploads').select('id').limit(1).execute()
-            return True
-        except Exception as e:
-            logger.error(f"Credential verification failed: {str(e)}")
-            return False
+        # Raises ValueError for a malformed URL or key
+        return verify_credentials(url.strip(), key.strip())
 
     def save_uploaded_file(self, file_data: pd.DataFrame, file_name: str, file_type: str) -> str:
         """
-        Save uploaded file data to Supabase and session state
+        Save uploaded file data to local storage and queue it for Supabase
         Returns the record ID
         """
-        # Create record
-        record = {
-            'id': len(st.session_state["uploaded_files"]),
-            'file_name': file_name,
-            'file_type': file_type,
-            'upload_date': datetime.now().isoformat(),
-            'data': file_data.to_dict()
-        }
+        upload_date = datetime.now().isoformat()
         
-        # Always save to session state first
-        st.session_state["uploaded_files"].append(record)
+        # Always save to local storage first; this is the durable copy
+        queued = self.write_queue is not None
+        if queued:
+            local_id = self.storage.save_file(
+                file_data, file_name, file_type, upload_date, pending_sync=True
+            )
+            self.write_queue.notify()
+            file_id = f"{LOCAL_ID_PREFIX}{local_id}"
+        else:
+            local_id = self.storage.save_file(file_data, file_name, file_type, upload_date)
+            file_id = local_id
         
-        # Try to save to Supabase if available
-        if self.client:
+        # Without a local queue, save to Supabase directly if available
+        if self.client and not queued:
             try:
-                # Convert DataFrame to JSON for storage
-                data_json = file_data.to_json(date_format='iso')
-                
-                # Create record in uploads table
-                supabase_record = {
-                    'file_name': file_name,
-                    'file_type': file_type,
-                    'upload_date': record['upload_date'],
-                    'data': data_json
-                }
-                
-                result = self.client.table('file_uploads').insert(supabase_record).execute()
-                return result.data[0]['id']
+                checksum = dataset_checksum(make_arrow_safe(file_data))
+                owner = find_remote_content(self.client, [checksum]).get(checksum)
+                if owner is not None:
+                    # Identical content is already stored; only add a record referencing it
+                    result = self.client.table('file_uploads').insert({
+                        'file_name': file_name,
+                        'file_type': file_type,
+                        'upload_date': upload_date,
+                        'manifest': owner['manifest'],
+                        'checksum': checksum,
+                        'content_id': owner['id']
+                    }).execute()
+                    file_id = result.data[0]['id']
+                else:
+                    manifest, chunks = encode_payload(file_data)
+                    result = self.client.table('file_uploads').insert({
+                        'file_name': file_name,
+                        'file_type': file_type,
+                        'upload_date': upload_date,
+                        'manifest': manifest,
+                        'checksum': manifest['checksum']
+                    }).execute()
+                    file_id = result.data[0]['id']
+                    insert_chunks(self.client, file_id, chunks)
             except Exception as e:
-                st.warning(f"Could not save to Supabase: {str(e)}. File saved in session only.")
+                st.warning(f"Could not save to Supabase: {str(e)}. File saved locally only.")
         
-        return str(record['id'])
+        self.session_cache.put(file_id, file_data)
+        self._history_counts.clear()
+        return file_id
+
+    def _local_id(self, file_id: str) -> Optional[str]:
+        """Resolve a file ID shown in the UI to the ID of its local copy, if any"""
+        file_id = str(file_id)
+        if file_id.startswith(LOCAL_ID_PREFIX):
+            return file_id[len(LOCAL_ID_PREFIX):]
+        if self.write_queue is not None:
+            return self.storage.find_by_remote_id(file_id)
+        if self.client:
+            return None
+        return file_id
+
+    def _fetch_chunks(self, file_id: str, row_groups: List[int], columns: List[str]) -> List[dict]:
+        """Fetch only the chunks for the requested row groups and columns"""
+        chunks = []
+        offset = 0
+        while True:
+            result = self.client.table('file_chunks').select(
+                'row_group',
+                'column_name',
+                'payload'
+            ).eq('file_id', file_id).in_(
+                'row_group', row_groups
+            ).in_(
+                'column_name', columns
+            ).order('row_group').order('column_name').range(
+                offset, offset + CHUNK_BATCH_SIZE - 1
+            ).execute()
+            chunks.extend(result.data)
+            if len(result.data) < CHUNK_BATCH_SIZE:
+                return chunks
+            offset += CHUNK_BATCH_SIZE
 
     def get_file_history(self) -> pd.DataFrame:
         """
@@ -119,50 +200,278 @@ class DatabaseManager:
                     'upload_date'
                 ).order('upload_date', desc=True).execute()
                 
-                return pd.DataFrame(result.data)
+                history = pd.DataFrame(result.data)
+                if self.write_queue is not None:
+                    # Uploads still waiting in the write-behind queue
+                    unsynced = self.storage.get_unsynced_history()
+                    if not unsynced.empty:
+                        unsynced['id'] = LOCAL_ID_PREFIX + unsynced['id']
+                        history = pd.concat([unsynced, history], ignore_index=True).sort_values(
+                            'upload_date', ascending=False, ignore_index=True
+                        )
+                return history
             except Exception as e:
-                st.warning(f"Could not fetch from Supabase: {str(e)}. Using session data.")
-        
-        # Return session state data if no Supabase or if Supabase fails
-        return pd.DataFrame([
-            {
-                'id': str(f['id']),
-                'file_name': f['file_name'],
-                'file_type': f['file_type'],
-                'upload_date': f['upload_date']
-            }
-            for f in st.session_state["uploaded_files"]
-        ])
-
-    def get_file_data(self, file_id: str) -> pd.DataFrame:
-        """
-        Retrieve file data by ID
-        Returns DataFrame
+                st.warning(f"Could not fetch from Supabase: {str(e)}. Using local data.")
+        
+        # Return local data if no Supabase or if Supabase fails
+        history = self.storage.get_file_history()
+        if self.write_queue is not None:
+            remote_ids = self.storage.remote_id_map()
+            history['id'] = [
+                remote_ids.get(local_id, f"{LOCAL_ID_PREFIX}{local_id}") for local_id in history['id']
+            ]
+        return history
+
+    def _remote_history_page(self, page_size: int, cursor: Optional[Dict],
+                             name_filter: Optional[str],
+                             file_type: Optional[str]) -> Tuple[pd.DataFrame, Optional[Dict]]:
+        """One keyset page of the Supabase history"""
+        query = self.client.table('file_uploads').select(
+            'id',
+            'file_name',
+            'file_type',
+            'upload_date'
+        )
+        if name_filter:
+            query = query.ilike('file_name', f"%{name_filter}%")
+        if file_type:
+            query = query.eq('file_type', file_type)
+        if cursor is not None:
+            # Keyset condition on (upload_date, id) so deep pages cost the same as the first
+            query = query.or_(
+                f'upload_date.lt."{cursor["upload_date"]}",'
+                f'and(upload_date.eq."{cursor["upload_date"]}",id.lt.{cursor["id"]})'
+            )
+        result = query.order('upload_date', desc=True).order(
+            'id', desc=True
+        ).limit(page_size + 1).execute()
+        
+        return page_with_cursor(
+            pd.DataFrame(result.data, columns=['id', 'file_name', 'file_type', 'upload_date']),
+            page_size
+        )
+
+    def _merged_history_page(self, page_size: int, cursor: Optional[Dict],
+                             name_filter: Optional[str],
+                             file_type: Optional[str]) -> Tuple[pd.DataFrame, Optional[Dict]]:
+        """
+        One page of Supabase history merged with uploads still in the write-behind queue
+
+        Each source is paged by its own keyset cursor and the two pages are
+        merged newest first, so pages never exceed page_size and every row
+        appears exactly once. The returned cursor holds both positions;
+        'done' marks a source with no rows left.
+        """
+        cursor = cursor or {'remote': None, 'local': None}
+        pages = {}
+        for source in ('remote', 'local'):
+            source_cursor = cursor.get(source)
+            if source_cursor == HISTORY_SOURCE_DONE:
+                continue
+            if source == 'remote':
+                page, next_cursor = self._remote_history_page(page_size, source_cursor, name_filter, file_type)
+            else:
+                page, next_cursor = self.storage.get_history_page(
+                    page_size, source_cursor, name_filter, file_type, unsynced_only=True
+                )
+            pages[source] = (page.assign(source=source), next_cursor)
+        
+        if not pages:
+            return pd.DataFrame(columns=HISTORY_COLUMNS), None
+        # Both pages are already newest first; a stable sort merges them
+        merged = pd.concat([page for page, _ in pages.values()], ignore_index=True).sort_values(
+            'upload_date', ascending=False, kind='stable', ignore_index=True
+        ).iloc[:page_size]
+        
+        next_cursor = {}
+        for source in ('remote', 'local'):
+            if source not in pages:
+                next_cursor[source] = HISTORY_SOURCE_DONE
+                continue
+            page, source_next = pages[source]
+            taken = merged[merged['source'] == source]
+            if len(taken) == len(page) and source_next is None:
+                next_cursor[source] = HISTORY_SOURCE_DONE
+            elif taken.empty:
+                next_cursor[source] = cursor.get(source)
+            else:
+                last = taken.iloc[-1]
+                next_cursor[source] = {'upload_date': last['upload_date'], 'id': last['id']}
+        
+        history = merged.drop(columns='source')
+        is_local = merged['source'] == 'local'
+        history.loc[is_local, 'id'] = LOCAL_ID_PREFIX + history.loc[is_local, 'id'].astype(str)
+        if all(position == HISTORY_SOURCE_DONE for position in next_cursor.values()):
+            return history, None
+        return history, next_cursor
+
+    def get_history_page(self, page_size: int = 20, cursor: Optional[Dict] = None,
+                         name_filter: Optional[str] = None,
+                         file_type: Optional[str] = None) -> Tuple[pd.DataFrame, Optional[Dict]]:
+        """
+        Get one page of file metadata, newest first
+        Returns the page and the cursor for the next page (None on the last page)
         """
-        # Try Supabase first if available
         if self.client:
             try:
+                if self.write_queue is not None:
+                    # Uploads still waiting in the write-behind queue are merged in by date
+                    return self._merged_history_page(page_size, cursor, name_filter, file_type)
+                return self._remote_history_page(page_size, cursor, name_filter, file_type)
+            except Exception as e:
+                st.warning(f"Could not fetch from Supabase: {str(e)}. Using local data.")
+        
+        # Page through the local copy if no Supabase or if Supabase fails
+        if cursor is not None and 'local' in cursor:
+            # A merged cursor doesn't translate to the full local history
+            cursor = None
+        history, next_cursor = self.storage.get_history_page(page_size, cursor, name_filter, file_type)
+        if self.write_queue is not None:
+            remote_ids = self.storage.remote_id_map()
+            history['id'] = [
+                remote_ids.get(local_id, f"{LOCAL_ID_PREFIX}{local_id}") for local_id in history['id']
+            ]
+        return history, next_cursor
+
+    def count_files(self, name_filter: Optional[str] = None,
+                    file_type: Optional[str] = None) -> int:
+        """
+        Count the files matching the history filters
+        Counts are cached for HISTORY_COUNT_TTL seconds since they only label the pager
+        """
+        key = (name_filter or None, file_type or None)
+        cached = self._history_counts.get(key)
+        if cached is not None and time.time() - cached[0] < HISTORY_COUNT_TTL:
+            return cached[1]
+        
+        count = None
+        if self.client:
+            try:
+                query = self.client.table('file_uploads').select('id', count='exact')
+                if name_filter:
+                    query = query.ilike('file_name', f"%{name_filter}%")
+                if file_type:
+                    query = query.eq('file_type', file_type)
+                count = query.limit(1).execute().count
+                if self.write_queue is not None:
+                    count += len(filter_history(self.storage.get_unsynced_history(), name_filter, file_type))
+            except Exception as e:
+                logger.warning(f"Could not count files in Supabase: {str(e)}")
+                count = None
+        if count is None:
+            count = self.storage.count_files(name_filter, file_type)
+        
+        self._history_counts[key] = (time.time(), count)
+        return count
+
+    def get_file_data(self, file_id: str, columns: Optional[List[str]] = None,
+                      rows: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """
+        Retrieve file data by ID, optionally only some columns and the
+        half-open row range [start, stop)
+        Returns DataFrame
+        """
+        # Full datasets this session already holds are served from memory
+        if columns is None and rows is None:
+            file_data = self.session_cache.get(file_id)
+            if file_data is not None:
+                return file_data
+            file_data = self._load_file_data(file_id)
+            if file_data is not None:
+                self.session_cache.put(file_id, file_data)
+            return file_data
+        return self._load_file_data(file_id, columns, rows)
+
+    def get_file_info(self, file_id: str) -> Optional[dict]:
+        """
+        Row count and column names of a dataset without loading its rows
+        Returns None if the file is unknown
+        """
+        local_id = self._local_id(file_id)
+        if local_id is not None:
+            info = self.storage.get_file_info(local_id) if isinstance(self.storage, LocalStorageBackend) else None
+            if info is not None:
+                return info
+        
+        if self.client and not str(file_id).startswith(LOCAL_ID_PREFIX):
+            try:
+                result = self.client.table('file_uploads').select(
+                    'manifest'
+                ).eq('id', file_id).limit(1).execute()
+                if result.data and result.data[0].get('manifest'):
+                    manifest = result.data[0]['manifest']
+                    return {'row_count': manifest['row_count'], 'columns': manifest['columns']}
+            except Exception as e:
+                logger.warning(f"Could not fetch file info from Supabase: {str(e)}")
+        
+        # Legacy uploads and other backends: fall back to the full dataset
+        file_data = self.get_file_data(file_id)
+        if file_data is None:
+            return None
+        return {'row_count': len(file_data), 'columns': [str(col) for col in file_data.columns]}
+
+    def _load_file_data(self, file_id: str, columns: Optional[List[str]] = None,
+                        rows: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """Read file data from the local copy, falling back to Supabase"""
+        # Try local storage first; uploads from this host are always there
+        local_id = self._local_id(file_id)
+        if local_id is not None:
+            try:
+                file_data = self.storage.get_file_data(local_id, columns, rows)
+                if file_data is not None:
+                    return file_data
+            except Exception as e:
+                st.error(f"Error retrieving file from local storage: {str(e)}")
+        
+        # Fetch from Supabase if available
+        if self.client and not str(file_id).startswith(LOCAL_ID_PREFIX):
+            try:
+                # Cheap metadata query to validate the cached copy, if any
                 result = self.client.table('file_uploads').select(
-                    'data'
+                    'checksum',
+                    'upload_date'
                 ).eq('id', file_id).single().execute()
+                version = result.data.get('checksum') or result.data.get('upload_date')
+                
+                file_data = self.dataset_cache.get(file_id, version, columns, rows)
+                if file_data is not None:
+                    return file_data
                 
-                if result.data:
-                    return pd.read_json(result.data['data'])
+                file_data = self._download_file_data(file_id, columns, rows)
+                if file_data is not None and columns is None and rows is None:
+                    self.dataset_cache.put(file_id, version, file_data)
+                return file_data
             except Exception as e:
-                st.warning(f"Could not fetch from Supabase: {str(e)}. Trying session storage.")
+                st.warning(f"Could not fetch from Supabase: {str(e)}")
         
-        # Try to get from session state
-        try:
-            file_id = int(file_id)
-            file_data = next(
-                (f['data'] for f in st.session_state["uploaded_files"] if f['id'] == file_id),
-                None
-            )
-            if file_data:
-                return pd.DataFrame(file_data)
-        except Exception as e:
-            st.error(f"Error retrieving file from session: {str(e)}")
+        return None
+
+    def _download_file_data(self, file_id: str, columns: Optional[List[str]] = None,
+                            rows: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """Download and decode file data from Supabase"""
+        result = self.client.table('file_uploads').select(
+            'manifest',
+            'data',
+            'content_id'
+        ).eq('id', file_id).single().execute()
         
+        if result.data and result.data.get('manifest'):
+            manifest = result.data['manifest']
+            # Duplicate uploads read the chunks of the record that first stored the content
+            chunks = self._fetch_chunks(
+                result.data.get('content_id') or file_id,
+                select_row_groups(manifest, rows),
+                columns or manifest['columns']
+            )
+            return decode_payload(manifest, chunks, columns, rows)
+        if result.data and result.data.get('data'):
+            # Uploads saved before chunked storage hold a single JSON blob
+            file_data = pd.read_json(io.StringIO(result.data['data']))
+            if columns:
+                file_data = file_data[columns]
+            if rows:
+                file_data = file_data.iloc[rows[0]:rows[1]]
+            return file_data
         return None
 
     def delete_file(self, file_id: str) -> bool:
@@ -171,27 +480,52 @@ class DatabaseManager:
         Returns success status
         """
         success = False
+        self.session_cache.discard(file_id)
+        self.dataset_cache.discard(file_id)
+        self._history_counts.clear()
+        local_id = self._local_id(file_id)
         
         # Try to delete from Supabase if available
-        if self.client:
+        if self.client and not str(file_id).startswith(LOCAL_ID_PREFIX):
             try:
-                self.client.table('file_uploads').delete().eq('id', file_id).execute()
+                delete_remote_file(self.client, file_id)
                 success = True
             except Exception as e:
                 st.warning(f"Could not delete from Supabase: {str(e)}")
         
-        # Always try to delete from session state
-        try:
-            file_id = int(file_id)
-            st.session_state["uploaded_files"] = [
-                f for f in st.session_state["uploaded_files"] if f['id'] != file_id
-            ]
-            success = True
-        except Exception as e:
-            st.error(f"Error deleting file from session: {str(e)}")
+        # Delete the local copy; a queued upload is dropped with it
+        if local_id is not None:
+            try:
+                if self.storage.delete_file(local_id):
+                    success = True
+            except Exception as e:
+                st.error(f"Error deleting file from local storage: {str(e)}")
         
         return success
 
-# Initialize session state
-if "uploaded_files" not in st.session_state:
-    st.session_state["uploaded_files"] = [] 
\ No newline at end of file
+    def get_storage_report(self) -> dict:
+        """
+        Storage growth and deduplication savings of the local store, plus
+        record and payload counts in Supabase when connected
+        """
+        report = {'local': None, 'remote': None}
+        if isinstance(self.storage, LocalStorageBackend):
+            report['local'] = self.storage.storage_report()
+        if self.client:
+            try:
+                records = self.client.table('file_uploads').select(
+                    'id', count='exact'
+                ).limit(1).execute().count
+                payloads = self.client.table('file_uploads').select(
+                    'id', count='exact'
+                ).is_('content_id', 'null').limit(1).execute().count
+                report['remote'] = {'records': records, 'stored_payloads': payloads}
+            except Exception as e:
+                logger.warning(f"Could not build Supabase storage report: {str(e)}")
+        return report
+
+    def get_sync_status(self) -> Optional[dict]:
+        """Write-behind queue status, or None when uploads are not queued"""
+        if self.write_queue is None:
+            return None
+        return self.write_queue.status()
@@ -0,0 +1,125 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+from utils.storage import default_storage_dir, make_arrow_safe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATASET_CACHE_MB = 2048
+
+def safe_file_name(value: str) -> str:
+    """File-name-safe form of a file ID or version; never '.', '..' or hidden"""
+    return re.sub(r'^\.|[^A-Za-z0-9_.-]', '_', str(value))
+
+class DatasetFileCache:
+    """
+    Read-through disk cache of datasets downloaded from Supabase
+
+    Each entry is an uncompressed Arrow file named after the file ID and its
+    content version (checksum), so a repeat load only needs a metadata query
+    to confirm the version and is then memory-mapped from local disk. The
+    least recently read entries are removed once the cache exceeds its budget.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_mb: Optional[float] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_storage_dir() / 'dataset_cache'
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        max_mb = max_mb or float(os.getenv('DATASET_CACHE_MB', DEFAULT_DATASET_CACHE_MB))
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, file_id: str, version: str) -> Path:
+        return self.cache_dir / f"{safe_file_name(file_id)}--{safe_file_name(version)}.arrow"
+
+    def _entries(self, file_id: str) -> List[Path]:
+        return list(self.cache_dir.glob(f"{safe_file_name(file_id)}--*.arrow"))
+
+    def get(self, file_id: str, version: str, columns: Optional[List[str]] = None,
+            rows: Optional[Tuple[int, int]] = None) -> Optional[pd.DataFrame]:
+        """
+        Return the cached dataset if its version matches, optionally only some
+        columns and the half-open row range [start, stop)
+        """
+        path = self._path(file_id, version)
+        try:
+            # Memory-mapped: only the requested columns and rows are paged in
+            table = feather.read_table(path, columns=columns, memory_map=True)
+        except (OSError, pa.ArrowInvalid):
+            self.misses += 1
+            return None
+        if rows is not None:
+            table = table.slice(rows[0], max(rows[1] - rows[0], 0))
+        try:
+            # Modification time is the recency used for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return table.to_pandas()
+
+    def put(self, file_id: str, version: str, file_data: pd.DataFrame):
+        """Store a dataset under its version, replacing older versions of the file"""
+        path = self._path(file_id, version)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            # Uncompressed so the file can be memory-mapped on read
+            feather.write_feather(make_arrow_safe(file_data), temp_path, compression='uncompressed')
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not cache dataset {file_id}: {str(e)}")
+            temp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            for stale in self._entries(file_id):
+                if stale != path:
+                    self._remove(stale)
+            self._enforce_budget()
+
+    def discard(self, file_id: str):
+        """Remove every cached version of a file, e.g. after it is deleted"""
+        with self._lock:
+            for path in self._entries(file_id):
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            # Still memory-mapped by a reader (Windows); removed on a later pass
+            logger.warning(f"Could not remove cached dataset {path}")
+
+    def _enforce_budget(self):
+        entries = []
+        for path in self.cache_dir.glob('*.arrow'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def stats(self) -> Dict:
+        """Disk usage and hit counts, for the settings page"""
+        sizes = [path.stat().st_size for path in self.cache_dir.glob('*.arrow')]
+        return {
+            'cached_datasets': len(sizes),
+            'cache_bytes': sum(sizes),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
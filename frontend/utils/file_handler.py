@@ -1,20 +1,31 @@
 import pandas as pd
 import os
-from typing import Union, Tuple, Dict, List, Callable
+import sys
+from typing import Union, Tuple, Dict, List, Callable, Optional
 import tempfile
+import multiprocessing
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import time
 import logging
-import csv
 import numpy as np
 
+# The shared scratch-space package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scratch_space import ScratchJob, get_scratch_space
+from utils.columnar import COLUMNAR_FORMATS, OUTPUT_FORMATS, write_columnar
+from utils.verified_csv import EXPORT_CSV_ENCODING, EXPORT_CSV_FORMAT, write_verified_csv, write_verified_csv_chunks
+from utils.workbook import Workbook, open_workbook
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def get_excel_sheets(file) -> List[str]:
-    """Get list of sheet names from Excel file"""
-    return pd.ExcelFile(file).sheet_names
+    """Get list of sheet names from Excel file, reading only the workbook metadata"""
+    with open_workbook(file) as workbook:
+        return workbook.sheet_names
 
 def convert_to_csv(file, filename: str, sheet_name: str = None, progress_callback: Callable = None) -> Tuple[str, str]:
     """
@@ -47,34 +58,143 @@ def convert_to_csv(file, filename: str, sheet_name: str = None, progress_callbac
     
     return csv_path, csv_filename
 
-def convert_single_sheet(file, sheet_name, temp_dir, base_name, log_and_update):
-    """Convert a single Excel sheet to CSV with enhanced error handling and validation"""
+# CSV uploads larger than this are cleaned in chunks instead of in memory
+CSV_STREAMING_THRESHOLD_MB = int(os.getenv('CSV_STREAMING_THRESHOLD_MB', 256))
+CSV_STREAMING_CHUNK_ROWS = int(os.getenv('CSV_STREAMING_CHUNK_ROWS', 100_000))
+
+# Worker processes for converting every sheet of a workbook; 0 uses the CPU
+# count. Opt-in: starting workers costs more than small workbooks take.
+CONVERSION_WORKERS = int(os.getenv('CONVERSION_WORKERS', 1))
+
+# Rows scanned when looking for the header of a messy sheet
+HEADER_SCAN_ROWS = 30
+
+# How much a later row must outscore the first plausible header to replace it
+HEADER_MARGIN = 1.5
+
+def _is_text(frame: pd.DataFrame) -> np.ndarray:
+    """Mask of string cells, checked column by column"""
+    mask = np.zeros(frame.shape, dtype=bool)
+    for position, (_, column) in enumerate(frame.items()):
+        if pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column):
+            # .str yields NaN for every non-string value in a mixed column
+            mask[:, position] = column.str.len().notna().to_numpy()
+    return mask
+
+def detect_header_row(raw: pd.DataFrame, scan_rows: int = HEADER_SCAN_ROWS) -> Optional[int]:
+    """
+    Find the header row of a sheet read with header=None
+
+    The first filled row is the header, as with read_excel's header=0,
+    unless it cannot be one or a later row is clearly better. Each of the
+    first scan_rows rows is scored on how much of the sheet's width it
+    fills, the share of its cells that look like headers and how many of
+    its values are distinct. Text cells look like headers, and so do
+    numbers and dates above a mostly numeric column (years or months over
+    amounts). Titles and notes above a table fill one or two cells, so they
+    are skipped.
+
+    Returns:
+        Position of the header row, or None if the sheet has no filled rows
+    """
+    # Rows below the candidates show whether each column holds numbers
+    sample = raw.iloc[:scan_rows * 2]
+    filled = sample.notna().to_numpy()
+    counts = filled[:scan_rows].sum(axis=1)
+    if not counts.any():
+        return None
+    width = max(int(raw.notna().any().sum()), 1)
+    
+    is_text = _is_text(sample)
+    is_number = sample.apply(pd.to_numeric, errors='coerce').notna().to_numpy() & ~is_text
+    # Cells after each candidate row, per column: reversed cumulative sums
+    # shifted by one, so a row only counts the rows below it
+    candidates = len(counts)
+    def below(mask: np.ndarray) -> np.ndarray:
+        totals = np.cumsum(mask[::-1], axis=0)[::-1]
+        return np.vstack([totals, np.zeros((1, mask.shape[1]), dtype=int)])[1:candidates + 1]
+    numeric_below = below(is_number) * 2 > below(filled)
+    
+    header_like = is_text[:candidates] | (filled[:candidates] & numeric_below)
+    density = counts / width
+    header_ratio = np.divide(header_like.sum(axis=1), counts, out=np.zeros(len(counts)), where=counts > 0)
+    uniqueness = np.divide(sample.iloc[:candidates].nunique(axis=1).to_numpy(), counts,
+                           out=np.zeros(len(counts)), where=counts > 0)
+    
+    # A header must be mostly header-like and span at least half of the used columns
+    scores = np.where((header_ratio >= 0.5) & (density >= 0.5), density * header_ratio * uniqueness, 0.0)
+    if not scores.any():
+        # Nothing looks like a header: fall back to the first filled row
+        return int(np.flatnonzero(counts)[0])
+    first = int(np.flatnonzero(scores)[0])
+    # argmax returns the first of equally good rows
+    best = int(np.argmax(scores))
+    return best if scores[best] >= scores[first] * HEADER_MARGIN else first
+
+def split_header(raw: pd.DataFrame, header_row: Optional[int]) -> pd.DataFrame:
+    """
+    Slice the header and body of a sheet read with header=None
+
+    Column names follow read_excel: blank header cells become 'Unnamed: i'
+    and repeated names get '.1', '.2' suffixes. Without a header row the
+    columns keep their positions as names.
+    """
+    if header_row is None:
+        return raw.infer_objects()
+    
+    names = []
+    seen: Dict[str, int] = {}
+    for position, value in enumerate(raw.iloc[header_row]):
+        if pd.isna(value):
+            name = f"Unnamed: {position}"
+        elif isinstance(value, float) and value.is_integer():
+            name = str(int(value))
+        else:
+            name = str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    
+    body = raw.iloc[header_row + 1:].reset_index(drop=True)
+    body.columns = names
+    # Columns read together with their text header are object dtype until re-inferred
+    return body.infer_objects()
+
+def output_filename(base_name: str, sheet_name: Optional[str], output_format: str = 'csv') -> str:
+    """File name of a converted sheet, e.g. budget_Jan.csv or budget_Jan.arrow"""
+    extension = COLUMNAR_FORMATS.get(output_format, '.csv')
+    return f"{base_name}_{sheet_name}{extension}" if sheet_name else f"{base_name}{extension}"
+
+def convert_single_sheet(workbook: Workbook, sheet_name, temp_dir, base_name, log_and_update,
+                         output_format: str = 'csv'):
+    """
+    Convert a single Excel sheet to CSV with enhanced error handling and validation
+
+    With output_format 'arrow' or 'parquet' the sheet is written as a
+    columnar file instead, keeping its dtypes.
+    """
     try:
         log_and_update(0.4, f"Converting sheet: {sheet_name}")
         
-        # Try reading with openpyxl engine first
-        df = pd.read_excel(file, sheet_name=sheet_name, engine='openpyxl')
+        # The sheet's dimension tells us it is empty without reading any cells
+        if workbook.sheet_info(sheet_name)['rows'] == 0:
+            raise ValueError(f"Sheet '{sheet_name}' is empty")
+        
+        # Parse the cells once; the header is found in, and sliced from, the same frame
+        raw = workbook.read_sheet(sheet_name, header=None)
         
         # Validate DataFrame is not empty
-        if df.empty:
+        if raw.empty:
             raise ValueError(f"Sheet '{sheet_name}' is empty")
             
         # Validate DataFrame has columns
-        if len(df.columns) == 0:
+        if len(raw.columns) == 0:
             raise ValueError(f"No columns found in sheet '{sheet_name}'")
             
-        # Try to detect if we need to skip rows to find the real header
-        if all(str(col).startswith('Unnamed: ') for col in df.columns):
-            # Try to find the first non-empty row
-            for i in range(len(df)):
-                if not df.iloc[i].isna().all():
-                    # Re-read the Excel file with the correct header row
-                    df = pd.read_excel(file, sheet_name=sheet_name, header=i, engine='openpyxl')
-                    break
-                    
-        # If still no named columns, try reading without headers
-        if all(str(col).startswith('Unnamed: ') for col in df.columns):
-            df = pd.read_excel(file, sheet_name=sheet_name, header=None, engine='openpyxl')
+        df = split_header(raw, detect_header_row(raw))
             
         log_and_update(0.6, "Cleaning data...")
         # Clean up the DataFrame
@@ -86,27 +206,17 @@ def convert_single_sheet(file, sheet_name, temp_dir, base_name, log_and_update):
         if len(df.columns) == 0:
             raise ValueError(f"No valid columns found in sheet '{sheet_name}' after cleaning")
             
-        # Save to CSV
-        log_and_update(0.8, "Saving to CSV...")
-        new_filename = f"{base_name}_{sheet_name}.csv"
+        new_filename = output_filename(base_name, sheet_name, output_format)
         output_path = os.path.join(temp_dir, new_filename)
         
-        # Save with UTF-8 encoding and proper quoting
-        df.to_csv(
-            output_path,
-            index=False,
-            encoding='utf-8-sig',
-            quoting=csv.QUOTE_NONNUMERIC,
-            escapechar='\\'
-        )
-        
-        # Verify the CSV was written correctly
-        try:
-            test_df = pd.read_csv(output_path)
-            if test_df.empty or len(test_df.columns) == 0:
-                raise ValueError("CSV verification failed: File appears to be empty or invalid")
-        except Exception as e:
-            raise ValueError(f"CSV verification failed: {str(e)}")
+        if output_format in COLUMNAR_FORMATS:
+            log_and_update(0.8, f"Saving as {output_format}...")
+            manifest = write_columnar(df, output_path, output_format)
+        else:
+            # Save to CSV with UTF-8 encoding and proper quoting, verified while streaming
+            log_and_update(0.8, "Saving to CSV...")
+            manifest = write_verified_csv(df, output_path, encoding=EXPORT_CSV_ENCODING, **EXPORT_CSV_FORMAT)
+        logger.info(f"Wrote {manifest['rows']} rows x {manifest['columns']} columns to {output_path}")
             
         log_and_update(1.0, "Conversion complete!")
         return output_path, new_filename
@@ -118,7 +228,11 @@ def convert_to_csv(
     file_obj: Union[str, bytes], 
     filename: str, 
     sheet_name: str = None,
-    progress_callback: Callable[[float, str], None] = None
+    progress_callback: Callable[[float, str], None] = None,
+    max_workers: Optional[int] = CONVERSION_WORKERS,
+    streaming: Optional[bool] = None,
+    scratch_job: Optional[ScratchJob] = None,
+    output_format: str = 'csv'
 ) -> Union[Tuple[str, str], Dict[str, Tuple[str, str]]]:
     """
     Converts an uploaded file (Excel or CSV) to CSV format.
@@ -129,6 +243,17 @@ def convert_to_csv(
         filename: Original filename
         sheet_name: Specific sheet to convert (optional)
         progress_callback: Callback function to report progress (optional)
+        max_workers: Worker processes for multi-sheet conversion. None or 0 uses
+                     the CPU count, 1 converts the sheets one by one in this
+                     process. Defaults to CONVERSION_WORKERS.
+        streaming: Clean CSV files in chunks with bounded memory. None streams
+                   files larger than CSV_STREAMING_THRESHOLD_MB.
+        scratch_job: Scratch job to write into; the caller releases it when
+                     done with the outputs. Without one the outputs go to a
+                     detached job that is swept after SCRATCH_JOB_TTL_HOURS.
+        output_format: 'csv', or 'arrow'/'parquet' to write Excel sheets as
+                       columnar files that reload with their dtypes
+                       (see utils.columnar.read_columnar)
         
     Returns:
         If sheet_name specified: Tuple[str, str]: (Path to the converted CSV file, new filename)
@@ -140,50 +265,74 @@ def convert_to_csv(
         if progress_callback:
             progress_callback(progress, message)
 
+    base_name = Path(filename).stem
+    owns_job = scratch_job is None
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
     try:
         log_and_update(0.1, "Creating temporary directory...")
-        temp_dir = tempfile.mkdtemp()
-        base_name = Path(filename).stem
+        if owns_job:
+            scratch_job = get_scratch_space().job(f"convert-{base_name}", detached=True)
+        temp_dir = str(scratch_job.path)
+        # The outputs are at least about as large as the input
+        scratch_job.reserve(_file_size(file_obj))
         
         if filename.endswith('.xlsx'):
             log_and_update(0.2, "Reading Excel file...")
-            if sheet_name:
-                # Single sheet conversion
-                return convert_single_sheet(file_obj, sheet_name, temp_dir, base_name, log_and_update)
-            else:
-                # Multi-sheet conversion
-                excel_file = pd.ExcelFile(file_obj)
-                return convert_multiple_sheets(excel_file, temp_dir, base_name, log_and_update)
+            # One workbook handle serves every read of every sheet
+            with open_workbook(file_obj) as workbook:
+                if sheet_name:
+                    # Single sheet conversion
+                    return convert_single_sheet(workbook, sheet_name, temp_dir, base_name, log_and_update,
+                                                output_format=output_format)
+                else:
+                    # Multi-sheet conversion
+                    return convert_multiple_sheets(workbook, temp_dir, base_name, log_and_update,
+                                                   max_workers=max_workers, output_format=output_format)
                 
         elif filename.endswith('.csv'):
+            if streaming is None:
+                streaming = _file_size(file_obj) > CSV_STREAMING_THRESHOLD_MB * 1024 * 1024
+            if streaming:
+                return convert_csv_file_streaming(file_obj, temp_dir, base_name, log_and_update)
             return convert_csv_file(file_obj, temp_dir, base_name, log_and_update)
         else:
             raise ValueError(f"Unsupported file format: {filename}")
             
     except Exception as e:
         logger.error(f"Error in convert_to_csv: {str(e)}")
+        if owns_job and scratch_job is not None:
+            scratch_job.cleanup()
         if progress_callback:
             progress_callback(1.0, f"Error: {str(e)}")
         raise Exception(f"Error converting file to CSV: {str(e)}")
 
-def convert_multiple_sheets(excel_file: pd.ExcelFile, temp_dir: str, base_name: str, 
-                          log_and_update: Callable) -> Dict[str, Tuple[str, str]]:
-    """Helper function to convert multiple sheets"""
+def convert_multiple_sheets(workbook: Workbook, temp_dir: str, base_name: str, 
+                          log_and_update: Callable,
+                          max_workers: Optional[int] = CONVERSION_WORKERS,
+                          output_format: str = 'csv') -> Dict[str, Tuple[str, str]]:
+    """Helper function to convert multiple sheets, optionally in worker processes"""
     sheet_files = {}
-    total_sheets = len(excel_file.sheet_names)
+    total_sheets = len(workbook.sheet_names)
     
-    for idx, sheet in enumerate(excel_file.sheet_names, 1):
-        progress = 0.2 + (0.6 * (idx / total_sheets))
-        log_and_update(progress, f"Converting sheet {idx}/{total_sheets}: {sheet}")
-        
-        try:
-            output_path, new_filename = convert_single_sheet(excel_file, sheet, temp_dir, base_name, 
-                        lambda p, m: log_and_update(progress + (p * 0.6 / total_sheets), m))
-            sheet_files[sheet] = (output_path, new_filename)
-            logger.info(f"Successfully converted sheet {sheet}")
-        except Exception as e:
-            logger.error(f"Error converting sheet {sheet}: {str(e)}")
-            continue
+    workers = min(max_workers or os.cpu_count() or 1, total_sheets)
+    if workers == 1:
+        for idx, sheet in enumerate(workbook.sheet_names, 1):
+            progress = 0.2 + (0.6 * (idx / total_sheets))
+            log_and_update(progress, f"Converting sheet {idx}/{total_sheets}: {sheet}")
+            
+            try:
+                output_path, new_filename = convert_single_sheet(workbook, sheet, temp_dir, base_name, 
+                            lambda p, m: log_and_update(progress + (p * 0.6 / total_sheets), m),
+                            output_format=output_format)
+                sheet_files[sheet] = (output_path, new_filename)
+                logger.info(f"Successfully converted sheet {sheet}")
+            except Exception as e:
+                logger.error(f"Error converting sheet {sheet}: {str(e)}")
+                continue
+    else:
+        sheet_files = _convert_sheets_in_processes(workbook, temp_dir, base_name, log_and_update, workers,
+                                                   output_format)
     
     if not sheet_files:
         error_msg = "No valid data found in any sheet"
@@ -193,12 +342,95 @@ def convert_multiple_sheets(excel_file: pd.ExcelFile, temp_dir: str, base_name:
     log_and_update(1.0, "All sheets converted!")
     return sheet_files
 
+# Each worker process opens the shared workbook file once and reuses it for
+# every sheet it is given
+_worker_workbook: Optional[Workbook] = None
+
+def _open_worker_workbook(workbook_path: str):
+    global _worker_workbook
+    _worker_workbook = open_workbook(workbook_path)
+
+def _convert_sheet_in_worker(sheet_name: str, temp_dir: str, base_name: str, output_format: str) -> Dict:
+    """
+    Convert one sheet inside a worker process
+
+    Failures are returned rather than raised so one bad sheet never affects the others.
+    """
+    try:
+        output_path, new_filename = convert_single_sheet(
+            _worker_workbook, sheet_name, temp_dir, base_name, lambda p, m: logger.info(m),
+            output_format=output_format
+        )
+        return {'sheet': sheet_name, 'status': 'success', 'path': output_path, 'filename': new_filename}
+    except Exception as e:
+        return {'sheet': sheet_name, 'status': 'error', 'message': str(e)}
+
+def _convert_sheets_in_processes(workbook: Workbook, temp_dir: str, base_name: str,
+                                 log_and_update: Callable, max_workers: int,
+                                 output_format: str = 'csv') -> Dict[str, Tuple[str, str]]:
+    """Convert every sheet in a process pool, reporting progress as each sheet finishes"""
+    sheet_names = workbook.sheet_names
+    total_sheets = len(sheet_names)
+    
+    # Workers need a file to open: use the original path, or spill the upload once
+    if isinstance(workbook.file, (str, os.PathLike)):
+        workbook_path, spilled = os.fspath(workbook.file), False
+    else:
+        workbook_path, spilled = os.path.join(temp_dir, f".{base_name}.source.xlsx"), True
+        workbook.file.seek(0)
+        with open(workbook_path, 'wb') as f:
+            shutil.copyfileobj(workbook.file, f)
+    
+    # Largest sheets first so one big sheet doesn't start last and hold up the batch
+    by_size = sorted(sheet_names, key=lambda name: workbook.sheet_info(name)['rows'] or 0, reverse=True)
+    results = {}
+    try:
+        log_and_update(0.2, f"Converting {total_sheets} sheets in parallel...")
+        # Spawned workers: forking a process that runs Streamlit's threads is unsafe
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_open_worker_workbook,
+                                 initargs=(workbook_path,)) as executor:
+            futures = {
+                executor.submit(_convert_sheet_in_worker, sheet, temp_dir, base_name, output_format): sheet
+                for sheet in by_size
+            }
+            for completed, future in enumerate(as_completed(futures), 1):
+                sheet = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Worker crashed or the result could not be pickled
+                    result = {'sheet': sheet, 'status': 'error', 'message': str(e)}
+                results[sheet] = result
+                
+                if result['status'] == 'success':
+                    logger.info(f"Successfully converted sheet {sheet}")
+                    status = "converted"
+                else:
+                    logger.error(f"Error converting sheet {sheet}: {result['message']}")
+                    status = "failed"
+                log_and_update(0.2 + 0.7 * completed / total_sheets,
+                               f"Sheet {sheet} {status} ({completed}/{total_sheets})")
+    finally:
+        if spilled:
+            os.remove(workbook_path)
+    
+    # Keep workbook order in the result
+    return {
+        sheet: (results[sheet]['path'], results[sheet]['filename'])
+        for sheet in sheet_names
+        if results.get(sheet, {}).get('status') == 'success'
+    }
+
 def convert_csv_file(file_obj: Union[str, bytes], temp_dir: str, base_name: str, 
                     log_and_update: Callable) -> Tuple[str, str]:
     """Helper function to convert CSV file"""
     try:
         log_and_update(0.3, "Reading CSV file...")
-        df = pd.read_csv(file_obj)
+        # Cells are kept as text, as in convert_csv_file_streaming, so the
+        # output does not depend on which path a file's size picks
+        df = pd.read_csv(file_obj, dtype=str)
         logger.info(f"Successfully read CSV with shape: {df.shape}")
         
         log_and_update(0.6, "Cleaning data...")
@@ -209,7 +441,7 @@ def convert_csv_file(file_obj: Union[str, bytes], temp_dir: str, base_name: str,
         output_path = os.path.join(temp_dir, new_filename)
         
         log_and_update(0.8, "Saving processed CSV...")
-        df.to_csv(output_path, index=False)
+        write_verified_csv(df, output_path)
         logger.info(f"Successfully saved processed CSV to: {output_path}")
         
         log_and_update(1.0, "Processing complete!")
@@ -219,6 +451,71 @@ def convert_csv_file(file_obj: Union[str, bytes], temp_dir: str, base_name: str,
         logger.error(f"Error in convert_csv_file: {str(e)}")
         raise
 
+def _file_size(file_obj) -> int:
+    """Size in bytes of a path or seekable file object"""
+    if isinstance(file_obj, (str, os.PathLike)):
+        return os.path.getsize(file_obj)
+    if hasattr(file_obj, 'size'):
+        return file_obj.size
+    position = file_obj.tell()
+    size = file_obj.seek(0, os.SEEK_END)
+    file_obj.seek(position)
+    return size
+
+def _read_csv_chunks(file_obj, chunk_rows: int, **kwargs):
+    """Chunked reader over a path or a seekable file, from the start"""
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+    # Cells are kept as text so every chunk writes back exactly what it read
+    return pd.read_csv(file_obj, chunksize=chunk_rows, dtype=str, **kwargs)
+
+def convert_csv_file_streaming(file_obj: Union[str, bytes], temp_dir: str, base_name: str,
+                               log_and_update: Callable,
+                               chunk_rows: int = CSV_STREAMING_CHUNK_ROWS) -> Tuple[str, str]:
+    """
+    Clean a CSV file in two chunked passes, holding at most chunk_rows rows
+
+    The first pass only records which columns hold any value. The second
+    reads just those columns, drops empty rows, strips the header names and
+    streams the result out. Cells stay text on both paths, so the file
+    written matches convert_csv_file's byte for byte, with memory bounded
+    by the chunk size.
+    """
+    try:
+        log_and_update(0.3, "Scanning CSV for empty columns...")
+        columns = None
+        filled = None
+        for chunk in _read_csv_chunks(file_obj, chunk_rows):
+            if columns is None:
+                columns = list(chunk.columns)
+                filled = np.zeros(len(columns), dtype=bool)
+            filled |= chunk.notna().any().to_numpy()
+        if columns is None:
+            raise ValueError("CSV file has no header row")
+        
+        keep = np.flatnonzero(filled).tolist()
+        logger.info(f"Keeping {len(keep)} of {len(columns)} columns")
+        
+        def cleaned_chunks():
+            for chunk in _read_csv_chunks(file_obj, chunk_rows, usecols=keep):
+                chunk = chunk.dropna(how='all')
+                chunk.columns = [str(col).strip() for col in chunk.columns]
+                yield chunk
+        
+        new_filename = f"{base_name}.csv"
+        output_path = os.path.join(temp_dir, new_filename)
+        
+        log_and_update(0.6, "Cleaning and saving CSV in chunks...")
+        manifest = write_verified_csv_chunks(cleaned_chunks(), output_path, index=False)
+        logger.info(f"Streamed {manifest['rows']} rows x {manifest['columns']} columns to: {output_path}")
+        
+        log_and_update(1.0, "Processing complete!")
+        return output_path, new_filename
+        
+    except Exception as e:
+        logger.error(f"Error in convert_csv_file_streaming: {str(e)}")
+        raise
+
 def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """Clean and prepare DataFrame"""
     # Remove empty rows and columns
@@ -0,0 +1,161 @@
+import sys
+import streamlit as st
+import pandas as pd
+import hashlib
+import io
+import os
+import pyarrow as pa
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+from utils.file_handler import convert_to_csv, output_filename
+from utils.columnar import read_columnar
+from utils.workbook import inspect_workbook
+
+# The shared scratch-space package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scratch_space import get_scratch_space
+
+logger = logging.getLogger(__name__)
+
+# Parsed uploads kept across reruns and sessions, bounded by their in-memory
+# size and age; workbook metadata is small and bounded by entry count
+PARSE_CACHE_MB = float(os.getenv('PARSE_CACHE_MB', 512))
+PARSE_CACHE_TTL_SECONDS = int(os.getenv('PARSE_CACHE_TTL_SECONDS', 3600))
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv('PARSE_CACHE_MAX_ENTRIES', 16))
+
+class ParsedFrameCache:
+    """
+    Parsed frames shared by every session, bounded by total memory and age
+
+    Least recently used frames are dropped once their combined
+    memory_usage(deep=True) exceeds the budget; a frame larger than the
+    whole budget is not kept. Frames are shared, not copied, so callers
+    must treat them as read-only.
+    """
+
+    def __init__(self, budget_mb: float = PARSE_CACHE_MB, ttl_seconds: float = PARSE_CACHE_TTL_SECONDS):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (value, bytes, stored_at), most recently used last
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[2] > self.ttl_seconds:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, df: pd.DataFrame):
+        """Keep value, sized by the frame it holds"""
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.budget:
+                logger.info(f"Parsed frame of {size / 1024 / 1024:.1f} MB exceeds the parse cache; not kept")
+                return
+            self._entries[key] = (value, size, time.time())
+            self._bytes += size
+            while self._bytes > self.budget:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'budget_bytes': self.budget}
+
+_parsed_frames = ParsedFrameCache()
+
+def upload_hash(uploaded_file) -> str:
+    """
+    SHA-256 of an uploaded file's content
+
+    Memoized per upload in the session so reruns don't re-hash the bytes.
+    Streamlit releases without UploadedFile.file_id can't tell two uploads
+    of the same name and size apart, so those are hashed every time.
+    """
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is None:
+        return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    memo = st.session_state.setdefault('upload_hashes', {})
+    upload_key = (uploaded_file.name, uploaded_file.size, file_id)
+    if upload_key not in memo:
+        memo[upload_key] = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    return memo[upload_key]
+
+@st.cache_data(max_entries=PARSE_CACHE_MAX_ENTRIES, ttl=PARSE_CACHE_TTL_SECONDS, show_spinner=False)
+def cached_workbook_sheets(content_hash: str, _content: bytes) -> List[Dict]:
+    """Sheet names, sizes and header rows of a workbook, keyed by content hash"""
+    return inspect_workbook(io.BytesIO(_content))
+
+def cached_sheet_conversion(content_hash: str,
+                            filename: str,
+                            sheet_name: Optional[str],
+                            _content: bytes,
+                            _progress_callback: Optional[Callable[[float, str], None]] = None
+                            ) -> Tuple[pd.DataFrame, str]:
+    """
+    Convert one sheet and load it, keyed by content hash and sheet
+
+    Loaded sheets are kept in the byte-bounded ParsedFrameCache. Sheets are converted to Arrow files kept as scratch intermediates, so
+    after this cache expires a sheet reloads with a memory-mapped read and
+    keeps its dtypes. The progress callback only runs when a sheet has to be
+    converted. CSV is produced on download (utils.columnar.export_csv_bytes).
+
+    Returns:
+        (DataFrame, CSV file name for downloads)
+    """
+    cache_key = ('sheet', content_hash, sheet_name)
+    cached = _parsed_frames.get(cache_key)
+    if cached is not None:
+        return cached
+
+    csv_filename = output_filename(Path(filename).stem, sheet_name)
+    scratch = get_scratch_space()
+    sheet_key = hashlib.sha256(str(sheet_name).encode('utf-8')).hexdigest()[:16]
+    key = f"sheet-{content_hash}-{sheet_key}.arrow"
+
+    cached_path = scratch.get_intermediate(key)
+    if cached_path:
+        try:
+            df = read_columnar(cached_path)
+            logger.info(f"Reloaded {filename} [{sheet_name}] from {cached_path}")
+            _parsed_frames.put(cache_key, (df, csv_filename), df)
+            return df, csv_filename
+        except (FileNotFoundError, pa.ArrowInvalid):
+            # Evicted or unreadable; convert again
+            pass
+
+    # The scratch job directory is removed when the block exits
+    with scratch.job('parse') as job:
+        arrow_path, _ = convert_to_csv(
+            io.BytesIO(_content), filename, sheet_name=sheet_name,
+            progress_callback=_progress_callback, scratch_job=job, output_format='arrow'
+        )
+        df = read_columnar(arrow_path)
+        scratch.put_intermediate(key, arrow_path)
+    logger.info(f"Parsed {filename} [{sheet_name}] into cache entry {content_hash[:12]}")
+    _parsed_frames.put(cache_key, (df, csv_filename), df)
+    return df, csv_filename
+
+def cached_csv_frame(content_hash: str, _content: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV, keyed by content hash and kept in the ParsedFrameCache"""
+    cache_key = ('csv', content_hash)
+    df = _parsed_frames.get(cache_key)
+    if df is None:
+        df = pd.read_csv(io.BytesIO(_content))
+        _parsed_frames.put(cache_key, df, df)
+    return df
@@ -0,0 +1,274 @@
+import pandas as pd
+import pyarrow.feather as feather
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+from utils.dataset_cache import safe_file_name
+from utils.storage import default_storage_dir, make_arrow_safe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_BUDGET_MB = 256
+DEFAULT_GLOBAL_BUDGET_MB = 1024
+
+# Sessions unused for this long are released and their spill files removed
+SESSION_IDLE_SECONDS = int(os.getenv('SESSION_CACHE_IDLE_SECONDS', 6 * 60 * 60))
+
+# How often put/get look for idle sessions
+PRUNE_INTERVAL_SECONDS = 600
+
+def get_session_id() -> str:
+    """Return the current Streamlit session ID, or 'default' outside a script run"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return 'default'
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce the in-memory footprint of a frame without changing its values
+
+    Integers are downcast and repetitive string columns become categoricals.
+    Floats are left alone to keep full precision on amounts.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif series.dtype == object and len(series) > 0:
+            if series.nunique(dropna=True) <= len(series) // 2:
+                df[col] = series.astype('category')
+    return df
+
+def restore_dtypes(df: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+    """Undo compact_frame (and Arrow round trips) by casting columns back to dtypes"""
+    changed = {col: dtype for col, dtype in dtypes.items()
+               if col in df.columns and df[col].dtype != dtype}
+    if not changed:
+        return df
+    df = df.copy()
+    for col, dtype in changed.items():
+        try:
+            df[col] = df[col].astype(dtype)
+        except (TypeError, ValueError):
+            logger.warning(f"Could not restore dtype {dtype} of column {col}")
+    return df
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+class SessionDataCache:
+    """
+    Bounded dataset cache shared by all Streamlit sessions on the host
+
+    Each session keeps its recently used datasets in memory, keyed by file ID.
+    When a session exceeds its budget, or all sessions together exceed the
+    global budget, the least recently used frames are spilled to Arrow files
+    on local disk and memory-mapped back on the next access. Frames are
+    stored compacted and returned with the dtypes they were cached with.
+
+    Sessions idle for longer than idle_seconds are released, at most every
+    PRUNE_INTERVAL_SECONDS, on the next put or get from any session.
+    """
+
+    def __init__(self,
+                 spill_dir: Optional[Path] = None,
+                 session_budget_mb: Optional[float] = None,
+                 global_budget_mb: Optional[float] = None,
+                 idle_seconds: float = SESSION_IDLE_SECONDS):
+        self.spill_dir = Path(spill_dir) if spill_dir else default_storage_dir() / 'session_spill'
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        session_budget_mb = session_budget_mb or float(
+            os.getenv('SESSION_CACHE_MB', DEFAULT_SESSION_BUDGET_MB)
+        )
+        global_budget_mb = global_budget_mb or float(
+            os.getenv('GLOBAL_CACHE_MB', DEFAULT_GLOBAL_BUDGET_MB)
+        )
+        self.session_budget = int(session_budget_mb * 1024 * 1024)
+        self.global_budget = int(global_budget_mb * 1024 * 1024)
+        self.idle_seconds = idle_seconds
+
+        self._lock = threading.RLock()
+        # (session_id, file_id) -> frame, most recently used last
+        self._memory = OrderedDict()
+        self._sizes = {}
+        self._session_bytes = {}
+        self._spilled = {}
+        self._last_seen = {}
+        self._dtypes = {}
+        self._last_prune = 0.0
+
+    @staticmethod
+    def _spill_name(value: str) -> str:
+        """
+        File name for a session or file ID. IDs such as 'local:12' are not
+        valid file names everywhere and must not reach outside spill_dir; the
+        hash keeps IDs that sanitize alike, e.g. 'local:12' and 'local_12', apart.
+        """
+        digest = hashlib.sha1(str(value).encode('utf-8')).hexdigest()[:8]
+        return f"{safe_file_name(value)}-{digest}"
+
+    def _session_dir(self, session_id: str) -> Path:
+        return self.spill_dir / self._spill_name(session_id)
+
+    def _spill_path(self, session_id: str, file_id: str) -> Path:
+        return self._session_dir(session_id) / f"{self._spill_name(file_id)}.arrow"
+
+    def _evict(self, key):
+        """Move one in-memory frame to disk"""
+        session_id, file_id = key
+        df = self._memory.pop(key)
+        size = self._sizes.pop(key)
+        self._session_bytes[session_id] -= size
+
+        # A frame reloaded from disk is unchanged, so its spill file is still valid
+        if key not in self._spilled:
+            path = self._spill_path(session_id, file_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Uncompressed so the file can be memory-mapped on reload
+            feather.write_feather(make_arrow_safe(df), path, compression='uncompressed')
+            self._spilled[key] = path
+        logger.info(f"Spilled dataset {file_id} of session {session_id} ({size / 1024 / 1024:.1f} MB)")
+
+    def _enforce_budgets(self, session_id: str):
+        session_keys = [key for key in self._memory if key[0] == session_id]
+        while self._session_bytes.get(session_id, 0) > self.session_budget and len(session_keys) > 1:
+            self._evict(session_keys.pop(0))
+        while sum(self._session_bytes.values()) > self.global_budget and len(self._memory) > 1:
+            self._evict(next(iter(self._memory)))
+
+    def put(self, file_id: str, df: pd.DataFrame, session_id: Optional[str] = None):
+        """Cache a dataset for a session, spilling older datasets if over budget"""
+        session_id = session_id or get_session_id()
+        key = (session_id, str(file_id))
+        dtypes = df.dtypes
+        df = compact_frame(df)
+        size = frame_nbytes(df)
+
+        with self._lock:
+            self._discard_key(key)
+            self._dtypes[key] = dtypes
+            self._admit(key, df, size)
+        self._maybe_prune()
+
+    def _admit(self, key, df: pd.DataFrame, size: int):
+        session_id = key[0]
+        self._memory[key] = df
+        self._sizes[key] = size
+        self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + size
+        self._last_seen[session_id] = time.time()
+        self._enforce_budgets(session_id)
+
+    def get(self, file_id: str, session_id: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Return a cached dataset, reloading it from disk if it was spilled"""
+        session_id = session_id or get_session_id()
+        key = (session_id, str(file_id))
+        self._maybe_prune()
+
+        with self._lock:
+            self._last_seen[session_id] = time.time()
+            dtypes = self._dtypes.get(key)
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return restore_dtypes(self._memory[key], dtypes)
+            path = self._spilled.get(key)
+
+        if path is None or not path.exists():
+            return None
+        df = feather.read_table(path, memory_map=True).to_pandas()
+        with self._lock:
+            if key not in self._memory:
+                self._admit(key, df, frame_nbytes(df))
+        return restore_dtypes(df, dtypes)
+
+    def _discard_key(self, key):
+        self._dtypes.pop(key, None)
+        if key in self._memory:
+            self._memory.pop(key)
+            self._session_bytes[key[0]] -= self._sizes.pop(key)
+        path = self._spilled.pop(key, None)
+        if path is not None and path.exists():
+            try:
+                path.unlink()
+            except OSError:
+                # Still memory-mapped by a reader (Windows); left for release_session
+                logger.warning(f"Could not remove spill file {path}")
+
+    def discard(self, file_id: str):
+        """Drop a dataset from every session, e.g. after it is deleted"""
+        with self._lock:
+            for key in [k for k in list(self._memory) + list(self._spilled) if k[1] == str(file_id)]:
+                self._discard_key(key)
+
+    def release_session(self, session_id: str):
+        """Drop everything held for a session"""
+        with self._lock:
+            for key in [k for k in list(self._memory) + list(self._spilled) if k[0] == session_id]:
+                self._discard_key(key)
+            self._session_bytes.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+        shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+
+    def prune_sessions(self, max_idle_seconds: Optional[float] = None) -> int:
+        """
+        Release sessions idle for longer than max_idle_seconds
+
+        Also removes stale spill folders of sessions this cache doesn't
+        know, e.g. left by a previous server process.
+
+        Args:
+            max_idle_seconds: Defaults to the cache's idle_seconds
+        """
+        if max_idle_seconds is None:
+            max_idle_seconds = self.idle_seconds
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            self._last_prune = time.time()
+            idle = [sid for sid, seen in self._last_seen.items() if seen < cutoff]
+            known = {self._session_dir(sid).name for sid in self._last_seen}
+        for session_id in idle:
+            self.release_session(session_id)
+
+        for folder in self.spill_dir.iterdir():
+            try:
+                if folder.is_dir() and folder.name not in known and folder.stat().st_mtime < cutoff:
+                    shutil.rmtree(folder, ignore_errors=True)
+            except OSError:
+                continue
+        if idle:
+            logger.info(f"Released {len(idle)} idle session(s) from the dataset cache")
+        return len(idle)
+
+    def _maybe_prune(self):
+        """Prune idle sessions if the last prune is older than PRUNE_INTERVAL_SECONDS"""
+        if time.time() - self._last_prune < PRUNE_INTERVAL_SECONDS:
+            return
+        try:
+            self.prune_sessions()
+        except Exception as e:
+            logger.warning(f"Could not prune idle sessions: {str(e)}")
+
+    def stats(self) -> Dict:
+        """Memory and spill usage, overall and per session"""
+        with self._lock:
+            spilled_bytes = sum(p.stat().st_size for p in self._spilled.values() if p.exists())
+            return {
+                'memory_bytes': sum(self._session_bytes.values()),
+                'spilled_bytes': spilled_bytes,
+                'datasets_in_memory': len(self._memory),
+                'datasets_spilled': len(self._spilled),
+                'session_budget_bytes': self.session_budget,
+                'global_budget_bytes': self.global_budget,
+                'sessions': dict(self._session_bytes)
+            }
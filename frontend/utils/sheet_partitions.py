@@ -0,0 +1,51 @@
+import pandas as pd
+import pyarrow as pa
+import sys
+from pathlib import Path
+from typing import Tuple
+import logging
+from utils.columnar import read_columnar, write_columnar
+from utils.workbook import Workbook
+
+# The shared scratch-space package lives at the project root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scratch_space import get_scratch_space
+
+logger = logging.getLogger(__name__)
+
+def read_sheet_partition(workbook: Workbook, sheet_name: str) -> Tuple[pd.DataFrame, bool]:
+    """
+    Parsed sheet, reused from an earlier upload when the sheet is unchanged
+
+    Parsed sheets are kept as Arrow files in the scratch intermediate cache,
+    keyed by Workbook.sheet_fingerprint. Re-uploading a workbook with one
+    edited sheet therefore parses only that sheet; the rest are
+    memory-mapped from their cached partitions.
+
+    Returns:
+        (DataFrame, True if it came from the cache)
+    """
+    scratch = get_scratch_space()
+    key = f"partition-{workbook.sheet_fingerprint(sheet_name)}.arrow"
+
+    cached_path = scratch.get_intermediate(key)
+    if cached_path:
+        try:
+            return read_columnar(cached_path), True
+        except (FileNotFoundError, pa.ArrowInvalid):
+            # Evicted or unreadable; parse again
+            pass
+
+    df = workbook.read_sheet(sheet_name)
+    if df.empty or len(df.columns) == 0:
+        return df, False
+    try:
+        with scratch.job('partition') as job:
+            partition_path = job.file(key)
+            write_columnar(df, partition_path, 'arrow')
+            # Hand back the stored form so cache hits and misses look the same
+            df = read_columnar(partition_path)
+            scratch.put_intermediate(key, partition_path)
+    except Exception as e:
+        logger.warning(f"Could not cache sheet '{sheet_name}': {str(e)}")
+    return df, False
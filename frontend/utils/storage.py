@@ -0,0 +1,549 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import hashlib
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLUMNS = ['id', 'file_name', 'file_type', 'upload_date']
+UNSYNCED_STATUSES = ('pending', 'syncing', 'failed')
+ROW_GROUP_SIZE = 50_000
+
+class StorageBackend(ABC):
+    """Interface for the storage behind DatabaseManager"""
+
+    @abstractmethod
+    def save_file(self, file_data: pd.DataFrame, file_name: str, file_type: str,
+                  upload_date: Optional[str] = None) -> str:
+        """Persist a dataset and return its record ID"""
+
+    @abstractmethod
+    def get_file_history(self) -> pd.DataFrame:
+        """Return file metadata, newest first"""
+
+    @abstractmethod
+    def get_file_data(self, file_id: str, columns: Optional[List[str]] = None,
+                      rows: Optional[Tuple[int, int]] = None) -> Optional[pd.DataFrame]:
+        """
+        Return the dataset for a record, optionally only some columns and
+        the half-open row range [start, stop)
+        """
+
+    @abstractmethod
+    def delete_file(self, file_id: str) -> bool:
+        """Delete a record and its data"""
+
+    def get_history_page(self, page_size: int, cursor: Optional[Dict] = None,
+                         name_filter: Optional[str] = None,
+                         file_type: Optional[str] = None) -> Tuple[pd.DataFrame, Optional[Dict]]:
+        """
+        Return one page of file metadata, newest first, and the cursor for
+        the next page (None on the last page)
+
+        The cursor is the (upload_date, id) of the last row returned. This
+        default filters the full history; backends with an index override it.
+        """
+        history = filter_history(self.get_file_history(), name_filter, file_type)
+        if cursor is not None:
+            after = (history['upload_date'] < cursor['upload_date']) | (
+                (history['upload_date'] == cursor['upload_date'])
+                & (history['id'].astype(str) < str(cursor['id']))
+            )
+            history = history[after]
+        return page_with_cursor(history.reset_index(drop=True), page_size)
+
+    def count_files(self, name_filter: Optional[str] = None,
+                    file_type: Optional[str] = None) -> int:
+        """Number of records matching the filters"""
+        return len(filter_history(self.get_file_history(), name_filter, file_type))
+
+def filter_history(history: pd.DataFrame, name_filter: Optional[str] = None,
+                   file_type: Optional[str] = None) -> pd.DataFrame:
+    """Apply the history tab's name (substring, case-insensitive) and type filters"""
+    if name_filter:
+        history = history[history['file_name'].str.contains(name_filter, case=False, regex=False)]
+    if file_type:
+        history = history[history['file_type'] == file_type]
+    return history
+
+def page_with_cursor(rows: pd.DataFrame, page_size: int) -> Tuple[pd.DataFrame, Optional[Dict]]:
+    """Split a page_size + 1 row result into the page and the next-page cursor"""
+    page = rows.iloc[:page_size]
+    if len(rows) <= page_size or page.empty:
+        return page, None
+    last = page.iloc[-1]
+    return page, {'upload_date': last['upload_date'], 'id': last['id']}
+
+def make_arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepare a DataFrame for columnar storage
+
+    Column names must be strings and object columns must hold a single type.
+    Mixed-type columns (common in messy Excel sheets) are stored as strings.
+    """
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def dataset_checksum(df: pd.DataFrame) -> str:
+    """
+    Content checksum of a dataset: column names, dtypes and values
+
+    Identical frames give the same checksum wherever they are saved, so it
+    doubles as a version for cached copies.
+    """
+    digest = hashlib.sha256()
+    digest.update('\x1f'.join(f"{col}:{dtype}" for col, dtype in df.dtypes.items()).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def read_parquet_rows(path: Path, rows: Tuple[int, int],
+                      columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read rows [start, stop) of a Parquet file, decoding only the row groups involved"""
+    start, stop = rows
+    parquet_file = pq.ParquetFile(path)
+    groups = []
+    offset = first_offset = 0
+    for index in range(parquet_file.num_row_groups):
+        group_rows = parquet_file.metadata.row_group(index).num_rows
+        if offset < stop and offset + group_rows > start:
+            if not groups:
+                first_offset = offset
+            groups.append(index)
+        offset += group_rows
+
+    table = parquet_file.read_row_groups(groups, columns=columns, use_pandas_metadata=True)
+    table = table.slice(max(start - first_offset, 0), max(stop - max(start, first_offset), 0))
+    return table.to_pandas()
+
+def default_storage_dir() -> Path:
+    """Local storage location, configurable through LOCAL_STORAGE_DIR"""
+    configured = os.getenv('LOCAL_STORAGE_DIR', '').strip()
+    if configured:
+        return Path(configured)
+    return Path(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) / 'data' / 'local_storage'
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Embedded storage: SQLite for metadata, one Parquet file per distinct dataset
+
+    Used when Supabase is not configured and as the local copy of every upload.
+    Data survives restarts and is shared by all browser sessions on the host.
+    """
+
+    def __init__(self, root_dir: Optional[Path] = None):
+        self.root_dir = Path(root_dir) if root_dir else default_storage_dir()
+        self.data_dir = self.root_dir / 'datasets'
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root_dir / 'metadata.db'
+        self._init_schema()
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection; Streamlit sessions run on separate threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_schema(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_uploads (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_name TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    upload_date TEXT NOT NULL,
+                    row_count INTEGER,
+                    column_count INTEGER,
+                    size_bytes INTEGER,
+                    data_path TEXT
+                )
+            """)
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_file_uploads_date ON file_uploads (upload_date DESC, id DESC)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_file_uploads_name ON file_uploads (file_name)'
+            )
+            self._ensure_columns(conn, {
+                'remote_id': 'TEXT',
+                'sync_status': "TEXT DEFAULT 'local'",
+                'sync_attempts': 'INTEGER DEFAULT 0',
+                'next_attempt_at': 'REAL',
+                'sync_claim': 'TEXT',
+                'claimed_at': 'REAL',
+                'last_error': 'TEXT',
+                'last_attempt_at': 'REAL',
+                'checksum': 'TEXT'
+            })
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_file_uploads_sync ON file_uploads (sync_status, next_attempt_at)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_file_uploads_remote ON file_uploads (remote_id)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_file_uploads_checksum ON file_uploads (checksum)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_file_uploads_data_path ON file_uploads (data_path)'
+            )
+
+    @staticmethod
+    def _ensure_columns(conn, columns: Dict[str, str]):
+        """Add columns missing from stores created by older versions"""
+        existing = {row['name'] for row in conn.execute('PRAGMA table_info(file_uploads)')}
+        for name, definition in columns.items():
+            if name not in existing:
+                conn.execute(f'ALTER TABLE file_uploads ADD COLUMN {name} {definition}')
+
+    def save_file(self, file_data: pd.DataFrame, file_name: str, file_type: str,
+                  upload_date: Optional[str] = None, pending_sync: bool = False) -> str:
+        """
+        Persist a dataset locally. With pending_sync the record is also queued
+        for upload by the write-behind worker.
+
+        Data files are named by content checksum, so saving a dataset that is
+        already stored only inserts a metadata row pointing at the existing file.
+        """
+        upload_date = upload_date or datetime.now().isoformat()
+        safe_data = make_arrow_safe(file_data)
+        checksum = dataset_checksum(safe_data)
+        data_path = self.data_dir / f"{checksum}.parquet"
+
+        # Write new content before taking the lock; duplicates skip the write
+        temp_path = None
+        if self._stored_content(checksum) is None:
+            temp_path = self._write_temp(safe_data, data_path)
+
+        try:
+            with self._connect() as conn:
+                # Serialized with delete_file so shared data files are never removed while referenced
+                conn.execute('BEGIN IMMEDIATE')
+                stored = self._stored_content(checksum, conn)
+                if stored is None:
+                    if temp_path is None:
+                        temp_path = self._write_temp(safe_data, data_path)
+                    os.replace(temp_path, data_path)
+                    temp_path = None
+                    stored = (data_path.name, data_path.stat().st_size)
+                cursor = conn.execute(
+                    'INSERT INTO file_uploads (file_name, file_type, upload_date, row_count, column_count, '
+                    'size_bytes, data_path, sync_status, checksum) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (file_name, file_type, upload_date, len(file_data), len(file_data.columns),
+                     stored[1], stored[0], 'pending' if pending_sync else 'local', checksum)
+                )
+                file_id = cursor.lastrowid
+        finally:
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+
+        logger.info(f"Saved {file_name} locally as record {file_id}")
+        return str(file_id)
+
+    @staticmethod
+    def _write_temp(safe_data: pd.DataFrame, data_path: Path) -> Path:
+        temp_path = data_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        safe_data.to_parquet(
+            temp_path, index=False, compression='zstd', row_group_size=ROW_GROUP_SIZE
+        )
+        return temp_path
+
+    def _stored_content(self, checksum: str, conn=None) -> Optional[Tuple[str, int]]:
+        """(data_path, size_bytes) of an existing data file with this checksum, if any"""
+        if conn is None:
+            with self._connect() as conn:
+                return self._stored_content(checksum, conn)
+        rows = conn.execute(
+            'SELECT DISTINCT data_path, size_bytes FROM file_uploads '
+            'WHERE checksum = ? AND data_path IS NOT NULL',
+            (checksum,)
+        ).fetchall()
+        for row in rows:
+            if (self.data_dir / row['data_path']).exists():
+                return row['data_path'], row['size_bytes']
+        return None
+
+    def get_file_history(self) -> pd.DataFrame:
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id, file_name, file_type, upload_date FROM file_uploads '
+                'WHERE data_path IS NOT NULL ORDER BY upload_date DESC, id DESC'
+            ).fetchall()
+        history = pd.DataFrame([dict(row) for row in rows], columns=HISTORY_COLUMNS)
+        history['id'] = history['id'].astype(str)
+        return history
+
+    @staticmethod
+    def _history_filters(cursor: Optional[Dict], name_filter: Optional[str],
+                         file_type: Optional[str]) -> Tuple[str, list]:
+        """SQL conditions for a keyset-paginated, filtered history query"""
+        conditions = ['data_path IS NOT NULL']
+        params = []
+        if name_filter:
+            conditions.append("file_name LIKE ? ESCAPE '\\'")
+            escaped = name_filter.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if file_type:
+            conditions.append('file_type = ?')
+            params.append(file_type)
+        if cursor is not None:
+            conditions.append('(upload_date < ? OR (upload_date = ? AND id < ?))')
+            params.extend([cursor['upload_date'], cursor['upload_date'], int(cursor['id'])])
+        return ' AND '.join(conditions), params
+
+    def get_history_page(self, page_size: int, cursor: Optional[Dict] = None,
+                         name_filter: Optional[str] = None, file_type: Optional[str] = None,
+                         unsynced_only: bool = False) -> Tuple[pd.DataFrame, Optional[Dict]]:
+        where, params = self._history_filters(cursor, name_filter, file_type)
+        if unsynced_only:
+            where += f" AND sync_status IN {UNSYNCED_STATUSES}"
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT id, file_name, file_type, upload_date FROM file_uploads WHERE {where} '
+                'ORDER BY upload_date DESC, id DESC LIMIT ?',
+                (*params, page_size + 1)
+            ).fetchall()
+        history = pd.DataFrame([dict(row) for row in rows], columns=HISTORY_COLUMNS)
+        history['id'] = history['id'].astype(str)
+        return page_with_cursor(history, page_size)
+
+    def count_files(self, name_filter: Optional[str] = None,
+                    file_type: Optional[str] = None) -> int:
+        where, params = self._history_filters(None, name_filter, file_type)
+        with self._connect() as conn:
+            return conn.execute(
+                f'SELECT COUNT(*) AS count FROM file_uploads WHERE {where}', params
+            ).fetchone()['count']
+
+    @staticmethod
+    def _record_id(file_id: str) -> Optional[int]:
+        """Local IDs are integers; anything else (e.g. a Supabase UUID) is unknown here"""
+        try:
+            return int(file_id)
+        except (TypeError, ValueError):
+            return None
+
+    def _data_path(self, file_id: str) -> Optional[Path]:
+        record_id = self._record_id(file_id)
+        if record_id is None:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT data_path FROM file_uploads WHERE id = ?', (record_id,)
+            ).fetchone()
+        if row is None or row['data_path'] is None:
+            return None
+        return self.data_dir / row['data_path']
+
+    def get_file_data(self, file_id: str, columns: Optional[List[str]] = None,
+                      rows: Optional[Tuple[int, int]] = None) -> Optional[pd.DataFrame]:
+        data_path = self._data_path(file_id)
+        if data_path is None or not data_path.exists():
+            return None
+        if rows is None:
+            return pd.read_parquet(data_path, columns=columns)
+        return read_parquet_rows(data_path, rows, columns)
+
+    def get_file_info(self, file_id: str) -> Optional[Dict]:
+        """Row count and column names of a stored dataset, read from the file footer"""
+        data_path = self._data_path(file_id)
+        if data_path is None or not data_path.exists():
+            return None
+        parquet_file = pq.ParquetFile(data_path)
+        return {
+            'row_count': parquet_file.metadata.num_rows,
+            'columns': [
+                name for name in parquet_file.schema_arrow.names if not name.startswith('__index_level_')
+            ]
+        }
+
+    def delete_file(self, file_id: str) -> bool:
+        record_id = self._record_id(file_id)
+        if record_id is None:
+            return False
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT data_path FROM file_uploads WHERE id = ?', (record_id,)
+            ).fetchone()
+            deleted = conn.execute(
+                'DELETE FROM file_uploads WHERE id = ?', (record_id,)
+            ).rowcount
+            # Data files are shared by every upload of the same content
+            if row is not None and row['data_path'] is not None:
+                references = conn.execute(
+                    'SELECT COUNT(*) AS count FROM file_uploads WHERE data_path = ?', (row['data_path'],)
+                ).fetchone()['count']
+                data_path = self.data_dir / row['data_path']
+                if references == 0 and data_path.exists():
+                    data_path.unlink()
+        return deleted > 0
+
+    # Write-behind sync bookkeeping
+
+    def claim_pending(self, limit: int, claim: str, claim_timeout: float = 600.0) -> List[Dict]:
+        """
+        Atomically claim up to `limit` records that are due for upload
+
+        Claims older than claim_timeout (e.g. from a crashed worker) are released first.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE file_uploads SET sync_status = 'pending', sync_claim = NULL "
+                "WHERE sync_status = 'syncing' AND claimed_at < ?",
+                (now - claim_timeout,)
+            )
+            conn.execute(
+                "UPDATE file_uploads SET sync_status = 'syncing', sync_claim = ?, claimed_at = ? "
+                "WHERE id IN ("
+                "  SELECT id FROM file_uploads WHERE sync_status = 'pending' AND data_path IS NOT NULL "
+                "  AND (next_attempt_at IS NULL OR next_attempt_at <= ?) "
+                "  ORDER BY upload_date, id LIMIT ?"
+                ")",
+                (claim, now, now, limit)
+            )
+            rows = conn.execute(
+                'SELECT id, file_name, file_type, upload_date, sync_attempts, checksum FROM file_uploads '
+                'WHERE sync_claim = ? ORDER BY upload_date, id',
+                (claim,)
+            ).fetchall()
+        return [dict(row, id=str(row['id'])) for row in rows]
+
+    def mark_synced(self, file_id: str, remote_id: str) -> bool:
+        """Record the remote ID of an uploaded record. False if it was deleted meanwhile."""
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE file_uploads SET sync_status = 'synced', remote_id = ?, sync_claim = NULL, "
+                "last_error = NULL, last_attempt_at = ? WHERE id = ?",
+                (str(remote_id), time.time(), int(file_id))
+            ).rowcount
+        return updated > 0
+
+    def mark_sync_failed(self, file_id: str, error: str, next_attempt_at: Optional[float]):
+        """Release a claim after a failed upload; no next attempt means give up"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE file_uploads SET sync_status = ?, sync_attempts = sync_attempts + 1, "
+                "next_attempt_at = ?, last_error = ?, last_attempt_at = ?, sync_claim = NULL WHERE id = ?",
+                ('pending' if next_attempt_at is not None else 'failed',
+                 next_attempt_at, error, time.time(), int(file_id))
+            )
+
+    def retry_failed_syncs(self) -> int:
+        """Put records that exhausted their retries back in the queue"""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE file_uploads SET sync_status = 'pending', sync_attempts = 0, "
+                "next_attempt_at = NULL WHERE sync_status = 'failed'"
+            ).rowcount
+
+    def find_by_remote_id(self, remote_id: str) -> Optional[str]:
+        """Return the local ID of a record uploaded as remote_id"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id FROM file_uploads WHERE remote_id = ?', (str(remote_id),)
+            ).fetchone()
+        return str(row['id']) if row else None
+
+    def remote_id_map(self) -> Dict[str, str]:
+        """Local ID to remote ID for every uploaded record"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id, remote_id FROM file_uploads WHERE remote_id IS NOT NULL'
+            ).fetchall()
+        return {str(row['id']): row['remote_id'] for row in rows}
+
+    def get_unsynced_history(self) -> pd.DataFrame:
+        """Metadata for records that have not reached Supabase yet"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id, file_name, file_type, upload_date FROM file_uploads '
+                f"WHERE data_path IS NOT NULL AND sync_status IN {UNSYNCED_STATUSES} "
+                'ORDER BY upload_date DESC, id DESC'
+            ).fetchall()
+        history = pd.DataFrame([dict(row) for row in rows], columns=HISTORY_COLUMNS)
+        history['id'] = history['id'].astype(str)
+        return history
+
+    def storage_report(self) -> Dict:
+        """
+        Logical vs stored bytes, overall and per upload month
+
+        Logical bytes count every upload at full size; stored bytes count each
+        distinct data file once, in the month it was first uploaded.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT upload_date, data_path, size_bytes FROM file_uploads '
+                'WHERE data_path IS NOT NULL ORDER BY id'
+            ).fetchall()
+        uploads = pd.DataFrame([dict(row) for row in rows], columns=['upload_date', 'data_path', 'size_bytes'])
+        uploads['size_bytes'] = uploads['size_bytes'].fillna(0).astype('int64')
+        uploads['stored_bytes'] = uploads['size_bytes'].where(~uploads['data_path'].duplicated(), 0)
+        uploads['month'] = uploads['upload_date'].str[:7]
+
+        monthly = uploads.groupby('month').agg(
+            uploads=('size_bytes', 'size'),
+            logical_bytes=('size_bytes', 'sum'),
+            stored_bytes=('stored_bytes', 'sum')
+        )
+        monthly['saved_bytes'] = monthly['logical_bytes'] - monthly['stored_bytes']
+        monthly['total_stored_bytes'] = monthly['stored_bytes'].cumsum()
+
+        logical = int(uploads['size_bytes'].sum())
+        stored = int(uploads['stored_bytes'].sum())
+        return {
+            'uploads': len(uploads),
+            'distinct_datasets': int(uploads['data_path'].nunique()),
+            'logical_bytes': logical,
+            'stored_bytes': stored,
+            'saved_bytes': logical - stored,
+            'monthly': monthly.reset_index()
+        }
+
+    def sync_summary(self) -> Dict:
+        """Counts per sync status plus the most recent error"""
+        with self._connect() as conn:
+            counts = {
+                row['sync_status']: row['count'] for row in conn.execute(
+                    'SELECT sync_status, COUNT(*) AS count FROM file_uploads GROUP BY sync_status'
+                )
+            }
+            oldest = conn.execute(
+                "SELECT MIN(upload_date) AS oldest FROM file_uploads "
+                "WHERE sync_status IN ('pending', 'syncing')"
+            ).fetchone()['oldest']
+            error = conn.execute(
+                'SELECT last_error FROM file_uploads WHERE last_error IS NOT NULL '
+                'ORDER BY last_attempt_at DESC, id DESC LIMIT 1'
+            ).fetchone()
+        return {
+            'pending': counts.get('pending', 0),
+            'syncing': counts.get('syncing', 0),
+            'failed': counts.get('failed', 0),
+            'synced': counts.get('synced', 0),
+            'oldest_pending': oldest,
+            'last_error': error['last_error'] if error else None
+        }
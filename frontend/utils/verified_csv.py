@@ -0,0 +1,116 @@
+import pandas as pd
+import csv
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = '.manifest.json'
+CSV_CHUNK_ROWS = 50_000
+
+# Dialect of converted and downloaded CSV files
+EXPORT_CSV_ENCODING = 'utf-8-sig'
+EXPORT_CSV_FORMAT = {'quoting': csv.QUOTE_NONNUMERIC, 'escapechar': '\\'}
+
+def manifest_path(csv_path: str) -> str:
+    return csv_path + MANIFEST_SUFFIX
+
+def write_verified_csv(df: pd.DataFrame,
+                       output_path: str,
+                       chunk_rows: int = CSV_CHUNK_ROWS,
+                       encoding: str = 'utf-8',
+                       **to_csv_kwargs) -> Dict:
+    """
+    Write a DataFrame as CSV in row chunks, verifying it as it is written
+
+    Rows and columns are counted and the bytes hashed while streaming, so the
+    file never has to be read back. The counts and SHA-256 are saved next to
+    the CSV (see read_csv_manifest) for later cache validation.
+
+    Args:
+        df: DataFrame to write
+        output_path: Destination CSV path
+        chunk_rows: Rows formatted per chunk
+        encoding: Text encoding; 'utf-8-sig' writes a byte order mark
+        **to_csv_kwargs: Passed to DataFrame.to_csv (quoting, escapechar, ...)
+
+    Returns:
+        The manifest: rows, columns, bytes, sha256 and written_at
+
+    Raises:
+        ValueError: If the output has no rows or columns
+    """
+    return write_verified_csv_chunks(
+        (df.iloc[start:start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows)),
+        output_path, encoding=encoding, **to_csv_kwargs
+    )
+
+def write_verified_csv_chunks(chunks: Iterable[pd.DataFrame],
+                              output_path: str,
+                              encoding: str = 'utf-8',
+                              **to_csv_kwargs) -> Dict:
+    """
+    write_verified_csv for a stream of DataFrames with the same columns
+
+    The header comes from the first chunk.
+    """
+    to_csv_kwargs.setdefault('index', False)
+    digest = hashlib.sha256()
+    rows = 0
+    columns = None
+    size = 0
+
+    with open(output_path, 'wb') as f:
+        def emit(data: bytes):
+            nonlocal size
+            digest.update(data)
+            f.write(data)
+            size += len(data)
+
+        if encoding.lower().replace('_', '-') == 'utf-8-sig':
+            emit('\ufeff'.encode('utf-8'))
+            encoding = 'utf-8'
+
+        for chunk in chunks:
+            if columns is None:
+                columns = len(chunk.columns)
+                emit(chunk.iloc[:0].to_csv(header=True, **to_csv_kwargs).encode(encoding))
+            elif len(chunk.columns) != columns:
+                raise ValueError(f"CSV verification failed: chunk has {len(chunk.columns)} columns, expected {columns}")
+            if len(chunk):
+                emit(chunk.to_csv(header=False, **to_csv_kwargs).encode(encoding))
+                rows += len(chunk)
+
+    if not rows or not columns:
+        raise ValueError("CSV verification failed: File appears to be empty or invalid")
+
+    manifest = {
+        'rows': rows,
+        'columns': columns,
+        'bytes': size,
+        'sha256': digest.hexdigest(),
+        'written_at': datetime.now().isoformat()
+    }
+    with open(manifest_path(output_path), 'w') as f:
+        json.dump(manifest, f)
+    return manifest
+
+def read_csv_manifest(csv_path: str) -> Optional[Dict]:
+    """
+    Manifest recorded by write_verified_csv, or None if missing or stale
+
+    A manifest is stale when the CSV's size no longer matches it.
+    """
+    try:
+        with open(manifest_path(csv_path)) as f:
+            manifest = json.load(f)
+        if os.path.getsize(csv_path) != manifest['bytes']:
+            logger.warning(f"CSV {csv_path} changed since it was written")
+            return None
+        return manifest
+    except (OSError, ValueError, KeyError):
+        return None
@@ -0,0 +1,351 @@
+import pandas as pd
+import hashlib
+import posixpath
+import re
+import zipfile
+from typing import Dict, List, Optional
+import logging
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+_OFFICE_DOCUMENT_REL = '/officeDocument'
+_CELL_REF = re.compile(r'^([A-Z]+)(\d+)$')
+# Cells and their attributes, matched on the raw sheet XML; content is None
+# for self-closing (styled blank) cells such as <c r="A2" s="1"/>
+_CELL = re.compile(rb'<(?:\w+:)?c\b([^>]*?)(?:/>|>(.*?)</(?:\w+:)?c>)', re.DOTALL)
+_CELL_ATTR = re.compile(rb'\b([rst])="([^"]*)"')
+_CELL_VALUE = re.compile(rb'<(?:\w+:)?v>([^<]*)<')
+
+def _local(tag: str) -> str:
+    """Tag name without its namespace (transitional and strict OOXML differ)"""
+    return tag.rsplit('}', 1)[-1]
+
+def _attr(element, name: str) -> Optional[str]:
+    """Attribute by local name, e.g. the namespaced r:id"""
+    for key, value in element.attrib.items():
+        if _local(key) == name:
+            return value
+    return None
+
+def column_index(letters: str) -> int:
+    """Zero-based column index of a column reference such as 'A' or 'AB'"""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+def _parse_ref(ref: str):
+    match = _CELL_REF.match(ref.replace('$', ''))
+    if not match:
+        return None
+    return column_index(match.group(1)), int(match.group(2))
+
+def _string_item_text(item) -> str:
+    """Text of a shared string item, skipping phonetic (rPh) annotations"""
+    parts = []
+    for child in item:
+        tag = _local(child.tag)
+        if tag == 't':
+            parts.append(child.text or '')
+        elif tag == 'r':
+            parts.extend(t.text or '' for t in child if _local(t.tag) == 't')
+    return ''.join(parts)
+
+def _rewind(file):
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return file
+
+class Workbook:
+    """
+    An open .xlsx workbook
+
+    Sheet names, dimensions and header rows come straight from the workbook's
+    XML parts without reading any cell data. Sheet reads go through a single
+    pd.ExcelFile that is created on first use and shared by every read, so the
+    archive is opened and parsed once.
+
+    Usage:
+        with Workbook(uploaded_file) as workbook:
+            for sheet in workbook.sheets():
+                df = workbook.read_sheet(sheet['name'])
+    """
+
+    def __init__(self, file):
+        """
+        Args:
+            file: Path or binary file-like object of an .xlsx workbook
+        """
+        self.file = file
+        try:
+            self._zip = zipfile.ZipFile(_rewind(file))
+        except zipfile.BadZipFile:
+            raise ValueError("File is not a valid .xlsx workbook")
+        self._excel_file = None
+        self._shared_strings: List[str] = []
+        self._shared_strings_done = False
+        self._shared_strings_iter = None
+        self._shared_strings_file = None
+        self._workbook_path = self._find_workbook_path()
+        self._sheet_entries = self._read_sheet_entries()
+        self._sheet_info: Dict[str, Dict] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._excel_file is not None:
+            self._excel_file.close()
+            self._excel_file = None
+        self._shared_strings_iter = None
+        if self._shared_strings_file is not None:
+            self._shared_strings_file.close()
+            self._shared_strings_file = None
+        self._zip.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return [entry['name'] for entry in self._sheet_entries]
+
+    @property
+    def excel_file(self) -> pd.ExcelFile:
+        """The shared pd.ExcelFile, opened on first use"""
+        if self._excel_file is None:
+            self._excel_file = pd.ExcelFile(_rewind(self.file), engine='openpyxl')
+        return self._excel_file
+
+    def read_sheet(self, sheet_name: str, **kwargs) -> pd.DataFrame:
+        """pd.read_excel on the shared workbook handle"""
+        return pd.read_excel(self.excel_file, sheet_name=sheet_name, **kwargs)
+
+    def sheets(self) -> List[Dict]:
+        """sheet_info for every sheet, in workbook order"""
+        return [self.sheet_info(name) for name in self.sheet_names]
+
+    def sheet_info(self, sheet_name: str) -> Dict:
+        """
+        Size and header of a sheet without loading its data
+
+        Returns:
+            Dict with name, state ('visible', 'hidden', ...), rows and columns
+            of the used range (None if unknown, e.g. chart sheets), and header,
+            the values of the first row
+        """
+        if sheet_name not in self._sheet_info:
+            entry = next((e for e in self._sheet_entries if e['name'] == sheet_name), None)
+            if entry is None:
+                raise ValueError(f"Worksheet named '{sheet_name}' not found")
+            info = {'name': sheet_name, 'state': entry['state'], 'rows': None, 'columns': None, 'header': []}
+            if entry['path'] in self._zip.namelist():
+                info.update(self._scan_sheet(entry['path']))
+            self._sheet_info[sheet_name] = info
+        return self._sheet_info[sheet_name]
+
+    def sheet_fingerprint(self, sheet_name: str) -> str:
+        """
+        Fingerprint of everything that determines a sheet's parsed values
+
+        Hashes each cell of the sheet's XML part with shared strings resolved
+        to their text and style indices resolved to their number format, so
+        editing one sheet leaves the other sheets' fingerprints unchanged even
+        though saving renumbers the workbook-wide string and style tables.
+        """
+        entry = next((e for e in self._sheet_entries if e['name'] == sheet_name), None)
+        if entry is None:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        digest = hashlib.sha256(b'1904' if self._date1904 else b'1900')
+        if entry['path'] not in self._zip.namelist():
+            digest.update(sheet_name.encode('utf-8'))
+            return digest.hexdigest()
+
+        with self._zip.open(entry['path']) as f:
+            xml = f.read()
+        formats = self._cell_number_formats()
+        # Only cell content counts: views, column widths and the row/style
+        # numbering that a re-save renumbers do not change the parsed data
+        for match in _CELL.finditer(xml):
+            attrs = dict(_CELL_ATTR.findall(match.group(1)))
+            content = match.group(2) or b''
+            if attrs.get(b't') == b's':
+                value = _CELL_VALUE.search(content)
+                content = (self._shared_string(int(value.group(1))) or '').encode('utf-8') if value else b''
+            style = int(attrs.get(b's', b'0'))
+            number_format = formats[style] if style < len(formats) else ''
+            digest.update(b'\x1e'.join((
+                attrs.get(b'r', b''), attrs.get(b't', b'n'), number_format.encode('utf-8'), content
+            )) + b'\x1f')
+        return digest.hexdigest()
+
+    def _cell_number_formats(self) -> List[str]:
+        """Number format of each cell style (cellXfs entry), which decides dates vs numbers"""
+        if self._number_formats is None:
+            self._number_formats = []
+            if self._styles_path and self._styles_path in self._zip.namelist():
+                with self._zip.open(self._styles_path) as f:
+                    root = ET.parse(f).getroot()
+                custom = {
+                    element.get('numFmtId'): element.get('formatCode')
+                    for element in root.iter() if _local(element.tag) == 'numFmt'
+                }
+                for section in root:
+                    if _local(section.tag) == 'cellXfs':
+                        self._number_formats = [
+                            custom.get(xf.get('numFmtId', '0'), f"builtin:{xf.get('numFmtId', '0')}")
+                            for xf in section if _local(xf.tag) == 'xf'
+                        ]
+        return self._number_formats
+
+    def _find_workbook_path(self) -> str:
+        try:
+            with self._zip.open('_rels/.rels') as f:
+                for rel in ET.parse(f).getroot():
+                    if (_attr(rel, 'Type') or '').endswith(_OFFICE_DOCUMENT_REL):
+                        return rel.get('Target').lstrip('/')
+        except KeyError:
+            pass
+        return 'xl/workbook.xml'
+
+    def _resolve(self, target: str) -> str:
+        if target.startswith('/'):
+            return target.lstrip('/')
+        return posixpath.normpath(posixpath.join(posixpath.dirname(self._workbook_path), target))
+
+    def _relationships(self) -> Dict[str, Dict]:
+        rels_path = posixpath.join(posixpath.dirname(self._workbook_path), '_rels',
+                                   posixpath.basename(self._workbook_path) + '.rels')
+        with self._zip.open(rels_path) as f:
+            return {
+                rel.get('Id'): {'type': rel.get('Type', ''), 'path': self._resolve(rel.get('Target'))}
+                for rel in ET.parse(f).getroot()
+            }
+
+    def _read_sheet_entries(self) -> List[Dict]:
+        try:
+            relationships = self._relationships()
+            with self._zip.open(self._workbook_path) as f:
+                root = ET.parse(f).getroot()
+        except KeyError as e:
+            raise ValueError(f"File is not a valid .xlsx workbook: missing {str(e)}")
+
+        self._shared_strings_path = next(
+            (rel['path'] for rel in relationships.values() if rel['type'].endswith('/sharedStrings')), None
+        )
+        self._styles_path = next(
+            (rel['path'] for rel in relationships.values() if rel['type'].endswith('/styles')), None
+        )
+        self._date1904 = any(
+            _local(element.tag) == 'workbookPr' and element.get('date1904') in ('1', 'true')
+            for element in root.iter()
+        )
+        self._number_formats = None
+        entries = []
+        for element in root.iter():
+            if _local(element.tag) != 'sheet':
+                continue
+            rel = relationships.get(_attr(element, 'id'), {})
+            entries.append({
+                'name': element.get('name'),
+                'state': element.get('state', 'visible'),
+                'path': rel.get('path')
+            })
+        return entries
+
+    def _scan_sheet(self, path: str) -> Dict:
+        """Dimension and first row of a worksheet, stopping as soon as both are known"""
+        dimension = None
+        header: List = []
+        row_count = 0
+        last_row = 0
+        max_column = 0
+        with self._zip.open(path) as f:
+            for _, element in ET.iterparse(f, events=('end',)):
+                tag = _local(element.tag)
+                if tag == 'dimension':
+                    dimension = element.get('ref')
+                elif tag == 'row':
+                    cells = [c for c in element if _local(c.tag) == 'c']
+                    if cells and not header:
+                        header = self._row_values(cells)
+                    if dimension and header:
+                        break
+                    # No <dimension>: count rows while streaming, without reading values
+                    if cells:
+                        row_count += 1
+                        last_row = int(element.get('r') or last_row + 1)
+                        ref = _parse_ref(cells[-1].get('r') or '')
+                        max_column = max(max_column, ref[0] + 1 if ref else len(cells))
+                    element.clear()
+                elif tag == 'sheetData':
+                    break
+
+        if dimension:
+            bounds = [_parse_ref(ref) for ref in dimension.split(':')]
+            if not header or None in bounds:
+                return {'rows': 0 if not header else None, 'columns': 0 if not header else None, 'header': header}
+            (first_col, first_row), (last_col, last_row) = bounds[0], bounds[-1]
+            return {'rows': last_row - first_row + 1, 'columns': last_col - first_col + 1, 'header': header}
+        return {'rows': last_row if row_count else 0, 'columns': max_column, 'header': header}
+
+    def _row_values(self, cells) -> List:
+        values: Dict[int, object] = {}
+        for position, cell in enumerate(cells):
+            ref = _parse_ref(cell.get('r') or '')
+            values[ref[0] if ref else position] = self._cell_value(cell)
+        if not values:
+            return []
+        first = min(values)
+        return [values.get(i) for i in range(first, max(values) + 1)]
+
+    def _cell_value(self, cell):
+        cell_type = cell.get('t', 'n')
+        value = None
+        for child in cell:
+            tag = _local(child.tag)
+            if tag == 'v':
+                value = child.text
+            elif tag == 'is':
+                value = ''.join(t.text or '' for t in child.iter() if _local(t.tag) == 't')
+        if value is None:
+            return None
+        if cell_type == 's':
+            return self._shared_string(int(value))
+        if cell_type == 'b':
+            return value == '1'
+        if cell_type == 'n':
+            number = float(value)
+            return int(number) if number.is_integer() else number
+        return value
+
+    def _shared_string(self, index: int) -> Optional[str]:
+        """Shared string by index, reading the table only as far as needed"""
+        if self._shared_strings_path is None:
+            return None
+        if self._shared_strings_iter is None and not self._shared_strings_done:
+            self._shared_strings_file = self._zip.open(self._shared_strings_path)
+            self._shared_strings_iter = ET.iterparse(self._shared_strings_file, events=('end',))
+        while index >= len(self._shared_strings) and not self._shared_strings_done:
+            try:
+                _, element = next(self._shared_strings_iter)
+            except StopIteration:
+                self._shared_strings_done = True
+                self._shared_strings_iter = None
+                self._shared_strings_file.close()
+                self._shared_strings_file = None
+                break
+            if _local(element.tag) == 'si':
+                self._shared_strings.append(_string_item_text(element))
+                element.clear()
+        return self._shared_strings[index] if index < len(self._shared_strings) else None
+
+def open_workbook(file) -> Workbook:
+    """Open an .xlsx workbook for inspection and repeated sheet reads"""
+    return Workbook(file)
+
+def inspect_workbook(file) -> List[Dict]:
+    """Names, sizes and header rows of every sheet, without loading sheet data"""
+    with open_workbook(file) as workbook:
+        return workbook.sheets()
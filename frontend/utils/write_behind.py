@@ -0,0 +1,281 @@
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+from utils.storage import LocalStorageBackend
+from utils.chunked_payload import encode_payload
+
+logger = logging.getLogger(__name__)
+
+# Rows per request when writing or reading file_chunks (PostgREST caps responses)
+CHUNK_BATCH_SIZE = 500
+
+def insert_chunks(client, file_id: str, chunks: List[dict]):
+    """
+    Insert payload chunks in batches, removing the upload record on failure
+
+    The record is marked chunks_complete after the last batch; until then
+    other uploads of the same content don't reference it.
+    """
+    try:
+        for start in range(0, len(chunks), CHUNK_BATCH_SIZE):
+            batch = [
+                {'file_id': file_id, **chunk}
+                for chunk in chunks[start:start + CHUNK_BATCH_SIZE]
+            ]
+            client.table('file_chunks').insert(batch).execute()
+        client.table('file_uploads').update({'chunks_complete': True}).eq('id', file_id).execute()
+    except Exception:
+        delete_remote_file(client, file_id)
+        raise
+
+def find_remote_content(client, checksums: List[str]) -> Dict[str, Dict]:
+    """
+    Map checksums to the Supabase records holding chunks for that content
+
+    Records that reference another record's chunks (content_id set) are
+    skipped, as are records whose chunks are still being written.
+    """
+    checksums = sorted({checksum for checksum in checksums if checksum})
+    if not checksums:
+        return {}
+    result = client.table('file_uploads').select(
+        'id',
+        'checksum',
+        'manifest',
+        'content_id',
+        'chunks_complete'
+    ).in_('checksum', checksums).order('id').execute()
+    owners = {}
+    for record in result.data:
+        if record.get('content_id') is None and record.get('manifest') and record.get('chunks_complete'):
+            owners.setdefault(record['checksum'], record)
+    return owners
+
+def delete_remote_file(client, file_id: str):
+    """
+    Delete an upload record from Supabase
+
+    Chunks shared with duplicate uploads are handed to the oldest duplicate
+    instead of being deleted. Duplicates only reference records whose
+    chunks are complete, so the heir always receives a full set.
+    """
+    duplicates = client.table('file_uploads').select('id').eq(
+        'content_id', file_id
+    ).order('id').execute().data
+    if duplicates:
+        heir = duplicates[0]['id']
+        client.table('file_chunks').update({'file_id': heir}).eq('file_id', file_id).execute()
+        client.table('file_uploads').update({'content_id': heir}).eq('content_id', file_id).execute()
+        client.table('file_uploads').update(
+            {'content_id': None, 'chunks_complete': True}
+        ).eq('id', heir).execute()
+    else:
+        client.table('file_chunks').delete().eq('file_id', file_id).execute()
+    client.table('file_uploads').delete().eq('id', file_id).execute()
+
+class WriteBehindQueue:
+    """
+    Background uploader for records saved to local storage
+
+    Saves only need the local copy to be durable. A worker thread claims due
+    records from the local store, inserts their file_uploads rows in batches,
+    writes the chunks, and records the remote ID against the local record.
+    Content already in Supabase is not uploaded again: the new row references
+    the existing chunks through content_id.
+    Failed uploads are retried with exponential backoff and jitter until
+    max_retries, after which they stay 'failed' until retried manually.
+
+    `client` only needs the table() query builder subset of the Supabase
+    client; the tests run the queue against an in-memory stub of it.
+    """
+
+    def __init__(self,
+                 client,
+                 storage: LocalStorageBackend,
+                 batch_size: int = 10,
+                 max_retries: int = 8,
+                 base_delay: float = 2.0,
+                 max_delay: float = 300.0,
+                 poll_interval: float = 5.0):
+        self.client = client
+        self.storage = storage
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_batch_at = None
+        self.last_success_at = None
+        self.uploaded_count = 0
+
+    def start(self):
+        """Start the worker thread if it is not running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def notify(self):
+        """Wake the worker after a new record was queued"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Write-behind batch failed: {str(e)}")
+                processed = 0
+            if processed == 0:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _backoff(self, attempts: int) -> Optional[float]:
+        """Next attempt time after `attempts` failures, or None to give up"""
+        if attempts >= self.max_retries:
+            return None
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return time.time() + delay * (0.5 + random.random() / 2)
+
+    def _fail(self, row: Dict, error: Exception):
+        attempts = row['sync_attempts'] + 1
+        logger.warning(f"Upload of {row['file_name']} failed (attempt {attempts}): {str(error)}")
+        self.storage.mark_sync_failed(row['id'], str(error), self._backoff(attempts))
+
+    def run_once(self) -> int:
+        """
+        Upload one batch of due records
+
+        Returns:
+            Number of records claimed
+        """
+        rows = self.storage.claim_pending(self.batch_size, uuid.uuid4().hex)
+        if not rows:
+            return 0
+        self.last_batch_at = datetime.now().isoformat()
+
+        # Content already in Supabase only needs a metadata row pointing at it
+        owners = find_remote_content(self.client, [row.get('checksum') for row in rows])
+        payloads = []
+        batch_content = {}
+        for row in rows:
+            try:
+                checksum = row.get('checksum')
+                if checksum in owners:
+                    payloads.append((row, owners[checksum]['manifest'], None, owners[checksum]['id']))
+                elif checksum in batch_content:
+                    # Same content earlier in this batch; linked once that record has an ID
+                    payloads.append((row, batch_content[checksum], None, None))
+                else:
+                    file_data = self.storage.get_file_data(row['id'])
+                    if file_data is None:
+                        raise ValueError("Local data file is missing")
+                    manifest, chunks = encode_payload(file_data)
+                    payloads.append((row, manifest, chunks, None))
+                    if checksum:
+                        batch_content[checksum] = manifest
+            except Exception as e:
+                self._fail(row, e)
+        if not payloads:
+            return len(rows)
+
+        try:
+            result = self.client.table('file_uploads').insert([
+                {
+                    'file_name': row['file_name'],
+                    'file_type': row['file_type'],
+                    'upload_date': row['upload_date'],
+                    'manifest': manifest,
+                    # Checksum of the data as saved, before the local round trip
+                    'checksum': row.get('checksum') or manifest['checksum'],
+                    'content_id': content_id
+                }
+                for row, manifest, _, content_id in payloads
+            ]).execute()
+        except Exception as e:
+            for row, _, _, _ in payloads:
+                self._fail(row, e)
+            return len(rows)
+
+        batch_owners = {}
+        for (row, _, chunks, content_id), record in zip(payloads, result.data):
+            remote_id = record['id']
+            try:
+                if chunks is not None:
+                    insert_chunks(self.client, remote_id, chunks)
+                    batch_owners[row.get('checksum')] = remote_id
+                elif content_id is None:
+                    owner_id = batch_owners.get(row.get('checksum'))
+                    if owner_id is None:
+                        raise ValueError("Upload of the matching content failed")
+                    self.client.table('file_uploads').update(
+                        {'content_id': owner_id}
+                    ).eq('id', remote_id).execute()
+            except Exception as e:
+                if chunks is None:
+                    self.client.table('file_uploads').delete().eq('id', remote_id).execute()
+                self._fail(row, e)
+                continue
+
+            if self.storage.mark_synced(row['id'], remote_id):
+                self.uploaded_count += 1
+                self.last_success_at = datetime.now().isoformat()
+                logger.info(f"Uploaded {row['file_name']} as {remote_id}")
+            else:
+                # Deleted locally while the upload was in flight
+                delete_remote_file(self.client, remote_id)
+
+        return len(rows)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Upload everything currently due; True if the queue drained in time"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.run_once() == 0:
+                return True
+        return False
+
+    def retry_failed(self) -> int:
+        """Re-queue records that exhausted their retries"""
+        count = self.storage.retry_failed_syncs()
+        self.notify()
+        return count
+
+    def status(self) -> Dict:
+        """Queue counts plus worker state, for the settings page"""
+        return {
+            **self.storage.sync_summary(),
+            'worker_running': self._thread is not None and self._thread.is_alive(),
+            'uploaded_this_session': self.uploaded_count,
+            'last_batch_at': self.last_batch_at,
+            'last_success_at': self.last_success_at
+        }
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+def get_write_behind_queue(client, storage: LocalStorageBackend, supabase_url: str) -> WriteBehindQueue:
+    """Return the running queue for this store and project, starting it if needed"""
+    key = (str(storage.db_path), supabase_url)
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = WriteBehindQueue(client, storage)
+            _queues[key] = queue
+        queue.start()
+        return queue
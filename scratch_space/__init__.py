@@ -0,0 +1,18 @@
+"""
+Scratch space for intermediate files, shared by the backend and frontend
+"""
+from scratch_space.manager import (
+    ScratchJob,
+    ScratchQuotaExceeded,
+    ScratchSpace,
+    default_scratch_dir,
+    get_scratch_space
+)
+
+__all__ = [
+    'ScratchJob',
+    'ScratchQuotaExceeded',
+    'ScratchSpace',
+    'default_scratch_dir',
+    'get_scratch_space'
+]
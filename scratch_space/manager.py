@@ -0,0 +1,322 @@
+"""
+Managed scratch space for intermediate files
+
+Conversions write into per-job directories that are removed when the last
+holder releases them, within a per-job and an overall quota. Intermediates
+worth reusing across jobs live in a shared, size-bounded cache.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+SWEEP_INTERVAL_SECONDS = 600
+
+def _env_mb(name: str, default: int) -> int:
+    return int(os.getenv(name, default)) * MB
+
+def default_scratch_dir() -> Path:
+    """Scratch location, configurable through SCRATCH_DIR"""
+    configured = os.getenv('SCRATCH_DIR', '').strip()
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / 'financial-analysis-scratch'
+
+def _tree_usage(path: Path) -> Dict:
+    files = 0
+    size = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                size += os.path.getsize(os.path.join(root, name))
+                files += 1
+            except OSError:
+                # Removed while we were walking
+                pass
+    return {'bytes': size, 'files': files}
+
+class ScratchQuotaExceeded(OSError):
+    """A job would grow past its quota or the scratch space's"""
+
+class ScratchJob:
+    """
+    A per-job scratch directory
+
+    The directory lives while it is held. `with space.job(...) as job` holds
+    it for the block; acquire()/release() let work that outlives the block
+    (a background task, a worker) keep it alive. Detached jobs, whose owner
+    does not release them, are removed by the age sweep instead.
+    """
+
+    def __init__(self, space: 'ScratchSpace', name: str, path: Path, quota_bytes: int, detached: bool):
+        self.space = space
+        self.name = name
+        self.path = path
+        self.quota_bytes = quota_bytes
+        self.detached = detached
+        self.created_at = datetime.now()
+        self.refs = 0 if detached else 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __fspath__(self):
+        return str(self.path)
+
+    def file(self, name: str) -> str:
+        """Path for a file inside the job directory"""
+        return str(self.path / name)
+
+    def usage(self) -> int:
+        return _tree_usage(self.path)['bytes'] if self.path.exists() else 0
+
+    def reserve(self, nbytes: int):
+        """
+        Check that nbytes more fit before writing them
+
+        Makes room by evicting cached intermediates if the scratch space as a
+        whole is full.
+
+        Raises:
+            ScratchQuotaExceeded: If the job or the scratch space has no room
+        """
+        used = self.usage()
+        if used + nbytes > self.quota_bytes:
+            raise ScratchQuotaExceeded(
+                f"Scratch job '{self.name}' needs {(used + nbytes) / MB:.1f} MB, quota is {self.quota_bytes / MB:.0f} MB"
+            )
+        self.space._make_room(nbytes)
+
+    def acquire(self) -> 'ScratchJob':
+        with self.space._lock:
+            self.refs += 1
+        return self
+
+    def release(self):
+        """Drop one hold; the directory is removed with the last one"""
+        with self.space._lock:
+            self.refs = max(self.refs - 1, 0)
+            last = self.refs == 0 and not self.detached
+        if last:
+            self.space._remove_job(self)
+
+    def cleanup(self):
+        """Remove the directory now, whoever holds it"""
+        self.space._remove_job(self)
+
+class ScratchSpace:
+    """
+    Scratch directories for conversion jobs plus a cache of reusable intermediates
+
+    Layout under root_dir:
+        jobs/<name>-<id>/   one directory per job
+        cache/<key>         intermediates shared between jobs
+
+    The cache is bounded in bytes. When it is full, the entries that cost
+    the most to keep (size times time since last use) are evicted first, so
+    one large stale file goes before many small recent ones.
+    """
+
+    def __init__(self,
+                 root_dir: Optional[Union[str, Path]] = None,
+                 quota_mb: Optional[int] = None,
+                 job_quota_mb: Optional[int] = None,
+                 cache_mb: Optional[int] = None,
+                 job_ttl_hours: Optional[float] = None):
+        """
+        Args:
+            root_dir: Scratch root. Defaults to SCRATCH_DIR or a folder in the system temp dir.
+            quota_mb: Total size of jobs and cache (SCRATCH_QUOTA_MB, default 10240)
+            job_quota_mb: Size limit of one job (SCRATCH_JOB_QUOTA_MB, default 4096)
+            cache_mb: Size limit of the intermediate cache (SCRATCH_CACHE_MB, default 2048)
+            job_ttl_hours: Age after which unreleased job directories are swept
+                           (SCRATCH_JOB_TTL_HOURS, default 24)
+        """
+        self.root_dir = Path(root_dir) if root_dir else default_scratch_dir()
+        self.jobs_dir = self.root_dir / 'jobs'
+        self.cache_dir = self.root_dir / 'cache'
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.quota_bytes = quota_mb * MB if quota_mb is not None else _env_mb('SCRATCH_QUOTA_MB', 10240)
+        self.job_quota_bytes = job_quota_mb * MB if job_quota_mb is not None else _env_mb('SCRATCH_JOB_QUOTA_MB', 4096)
+        self.cache_bytes = cache_mb * MB if cache_mb is not None else _env_mb('SCRATCH_CACHE_MB', 2048)
+        self.job_ttl_seconds = 3600 * (
+            job_ttl_hours if job_ttl_hours is not None else float(os.getenv('SCRATCH_JOB_TTL_HOURS', 24))
+        )
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ScratchJob] = {}
+        self._last_sweep = 0.0
+        self.sweep()
+
+    def job(self, name: str = 'job', quota_mb: Optional[int] = None, detached: bool = False) -> ScratchJob:
+        """
+        Create a job directory
+
+        Args:
+            name: Label used in the directory name and in usage reports
+            quota_mb: Per-job limit, defaults to the space's job quota
+            detached: The caller hands the files off and never releases the
+                      job; it is removed by the age sweep
+        """
+        # Long-running hosts sweep as they go rather than only at startup
+        if time.time() - self._last_sweep > SWEEP_INTERVAL_SECONDS:
+            self.sweep()
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)[:40] or 'job'
+        path = self.jobs_dir / f"{safe_name}-{uuid.uuid4().hex[:12]}"
+        path.mkdir(parents=True)
+        job = ScratchJob(self, name, path,
+                         quota_mb * MB if quota_mb is not None else self.job_quota_bytes, detached)
+        with self._lock:
+            self._jobs[path.name] = job
+        return job
+
+    def _remove_job(self, job: ScratchJob):
+        with self._lock:
+            self._jobs.pop(job.path.name, None)
+        shutil.rmtree(job.path, ignore_errors=True)
+        logger.info(f"Removed scratch job {job.path.name}")
+
+    def sweep(self) -> int:
+        """
+        Remove job directories nobody holds that are older than the TTL
+
+        Covers detached jobs and directories left by processes that exited
+        without releasing their jobs.
+
+        Returns:
+            Number of directories removed
+        """
+        self._last_sweep = time.time()
+        cutoff = self._last_sweep - self.job_ttl_seconds
+        removed = 0
+        for path in self.jobs_dir.iterdir():
+            with self._lock:
+                job = self._jobs.get(path.name)
+                held = job is not None and job.refs > 0
+            if held:
+                continue
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+            except OSError:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            with self._lock:
+                self._jobs.pop(path.name, None)
+            removed += 1
+        if removed:
+            logger.info(f"Swept {removed} stale scratch job directories")
+        return removed
+
+    def _cache_entries(self) -> List[Dict]:
+        entries = []
+        for path in self.cache_dir.iterdir():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append({'path': path, 'bytes': stat.st_size, 'last_used': stat.st_mtime})
+        return entries
+
+    def _evict(self, entries: List[Dict], bytes_to_free: int) -> int:
+        now = time.time()
+        freed = 0
+        # Big entries that have gone unused longest cost the most to keep
+        for entry in sorted(entries, key=lambda e: e['bytes'] * (now - e['last_used'] + 1), reverse=True):
+            if freed >= bytes_to_free:
+                break
+            try:
+                entry['path'].unlink()
+                freed += entry['bytes']
+                logger.info(f"Evicted scratch intermediate {entry['path'].name}")
+            except OSError:
+                pass
+        return freed
+
+    def _make_room(self, nbytes: int):
+        """Evict intermediates until nbytes fit in the overall quota"""
+        used = self.usage()['total_bytes']
+        if used + nbytes <= self.quota_bytes:
+            return
+        self._evict(self._cache_entries(), used + nbytes - self.quota_bytes)
+        if self.usage()['total_bytes'] + nbytes > self.quota_bytes:
+            raise ScratchQuotaExceeded(
+                f"Scratch space is full ({self.quota_bytes / MB:.0f} MB quota)"
+            )
+
+    def put_intermediate(self, key: str, source_path: Union[str, Path]) -> Optional[str]:
+        """
+        Move a file into the intermediate cache under key
+
+        Files larger than a quarter of the cache are not kept.
+
+        Returns:
+            The cached path, or None if the file was not cached
+        """
+        size = os.path.getsize(source_path)
+        if size > self.cache_bytes // 4:
+            return None
+        target = self.cache_dir / key
+        used = sum(e['bytes'] for e in self._cache_entries() if e['path'] != target)
+        if used + size > self.cache_bytes:
+            self._evict([e for e in self._cache_entries() if e['path'] != target], used + size - self.cache_bytes)
+        os.replace(source_path, target)
+        return str(target)
+
+    def get_intermediate(self, key: str) -> Optional[str]:
+        """Path of a cached intermediate, marking it as recently used"""
+        path = self.cache_dir / key
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return str(path)
+
+    def usage(self) -> Dict:
+        """Disk usage of the cache and of every job directory, largest first"""
+        jobs = []
+        for path in self.jobs_dir.iterdir():
+            with self._lock:
+                job = self._jobs.get(path.name)
+            jobs.append({
+                'job': path.name,
+                'name': job.name if job else None,
+                'refs': job.refs if job else 0,
+                'detached': job.detached if job else None,
+                **_tree_usage(path)
+            })
+        jobs.sort(key=lambda j: j['bytes'], reverse=True)
+        cache = self._cache_entries()
+        cache_bytes = sum(e['bytes'] for e in cache)
+        return {
+            'jobs': jobs,
+            'cache_entries': len(cache),
+            'cache_bytes': cache_bytes,
+            'total_bytes': cache_bytes + sum(j['bytes'] for j in jobs),
+            'quota_bytes': self.quota_bytes
+        }
+
+_space: Optional[ScratchSpace] = None
+_space_lock = threading.Lock()
+
+def get_scratch_space() -> ScratchSpace:
+    """The process-wide scratch space"""
+    global _space
+    with _space_lock:
+        if _space is None:
+            _space = ScratchSpace()
+        return _space